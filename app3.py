@@ -9,6 +9,10 @@ import time
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
 from src.utils.data_loader import CSVDataLoader
+from src.utils.catalog_index import CatalogIndex
+from src.utils.catalog_watcher import start_catalog_watcher
+from src.utils.metrics import start_metrics_server
+import config
 from src.vector_store.chroma_manager import ChromaDBManager
 from src.chatbot.groq_chatbot import PersonalCareChatbot
 
@@ -116,6 +120,10 @@ class StreamlitApp:
             st.session_state.system_initialized = False
         if "current_user_id" not in st.session_state:
             st.session_state.current_user_id = f"user_{int(time.time())}"
+        if "chat_window" not in st.session_state:
+            st.session_state.chat_window = config.CHAT_WINDOW_SIZE
+        if "saved_history" not in st.session_state:
+            st.session_state.saved_history = None  # None = not loaded / stale
 
         # local references restored from session_state when available
         self.data_loader = CSVDataLoader()
@@ -149,10 +157,16 @@ class StreamlitApp:
                 st.session_state.system_initialized = True
                 return True
 
+            catalog_index = CatalogIndex.from_products(products)
+            catalog_index.save()
+
             vector_store = ChromaDBManager()
             vector_store.add_products(products)
+            vector_store.delete_products(list(self.data_loader.merged_ids))
 
-            chatbot = PersonalCareChatbot()
+            chatbot = PersonalCareChatbot(vector_store=vector_store, catalog_index=catalog_index)
+            if config.CATALOG_WATCH_ENABLED:
+                start_catalog_watcher(chatbot.vector_store, catalog_index, on_change=chatbot.on_catalog_change)
 
             st.session_state.vector_store = vector_store
             st.session_state.chatbot = chatbot
@@ -173,6 +187,23 @@ class StreamlitApp:
                 pass
             return False
 
+    def visible_messages(self):
+        """Last ``chat_window`` messages and how many older ones are hidden"""
+        messages = st.session_state.messages
+        hidden = max(0, len(messages) - st.session_state.chat_window)
+        return messages[hidden:], hidden
+
+    def saved_conversations(self):
+        """Saved turns for this user, fetched once and cached until this session stores a new turn"""
+        if st.session_state.saved_history is None and self.chatbot:
+            try:
+                st.session_state.saved_history = self.chatbot.get_conversation_history(
+                    st.session_state.current_user_id, limit=6
+                )
+            except Exception:
+                return []
+        return st.session_state.saved_history or []
+
     def display_layout(self):
         left_col, main_col, right_col = st.columns([1.2, 6, 2])
 
@@ -184,6 +215,14 @@ class StreamlitApp:
                 if st.session_state.get("system_initialized", False):
                     st.success("✅ System Ready")
                     st.markdown('<div class="small-muted">Auto-initialized. Chat directly below.</div>', unsafe_allow_html=True)
+                    catalog_index = getattr(self.chatbot, "catalog_index", None)
+                    if catalog_index and len(catalog_index):
+                        stats = catalog_index.summary()
+                        st.markdown(
+                            f'<div class="small-muted">{stats["total_products"]} products · '
+                            f'{stats["brand_count"]} brands · {stats["category_count"]} categories</div>',
+                            unsafe_allow_html=True,
+                        )
                 else:
                     st.info("Initializing... Please wait a moment on first load.")
                 st.markdown("---")
@@ -198,13 +237,21 @@ class StreamlitApp:
             st.markdown('<div class="main-header">💄 Personal Care Chatbot</div>', unsafe_allow_html=True)
             st.markdown('<div class="sub-header">Ask about products, benefits, or recommendations</div>', unsafe_allow_html=True)
 
-            st.markdown('<div class="chat-container" id="chat-container">', unsafe_allow_html=True)
-            for message in st.session_state.messages:
-                if message["role"] == "user":
-                    st.markdown(f'<div class="user-message">👤 {message["content"]}</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="bot-message">🤖 {message["content"]}</div>', unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            visible, hidden = self.visible_messages()
+            if hidden and st.button(f"⬆️ Load older messages ({hidden} hidden)", key="load_older"):
+                st.session_state.chat_window += config.CHAT_WINDOW_SIZE
+                st.rerun()
+
+            # one markdown element for the whole window instead of one per message
+            bubbles = [
+                f'<div class="user-message">👤 {m["content"]}</div>' if m["role"] == "user"
+                else f'<div class="bot-message">🤖 {m["content"]}</div>'
+                for m in visible
+            ]
+            st.markdown(
+                '<div class="chat-container" id="chat-container">' + "".join(bubbles) + "</div>",
+                unsafe_allow_html=True,
+            )
 
             # Chat input form (clears automatically after submit)
             with st.form(key="chat_form", clear_on_submit=True):
@@ -246,14 +293,15 @@ class StreamlitApp:
                         except Exception as e:
                             response = f"Sorry, I couldn't generate a response: {e}"
 
-                    # Append bot response and rerun to refresh
+                    # Append bot response, invalidate the saved-history cache and rerun to refresh
                     st.session_state.messages.append({"role": "assistant", "content": response})
+                    st.session_state.saved_history = None
                     st.rerun()
 
         # Right: history panel
         with right_col:
             st.markdown("### 🕘 Chat History")
-            msgs = list(reversed(st.session_state.messages))
+            msgs = list(reversed(visible))
             if msgs:
                 for i, m in enumerate(msgs, 1):
                     role = "You" if m["role"] == "user" else "Bot"
@@ -264,21 +312,17 @@ class StreamlitApp:
                 st.write("_No messages yet_")
 
             st.markdown("---")
-            if self.chatbot:
-                try:
-                    conv = self.chatbot.get_conversation_history(
-                        st.session_state.current_user_id, limit=6
-                    )
-                    if conv:
-                        st.markdown("#### Saved Conversations")
-                        for idx, (user_msg, bot_resp, ts) in enumerate(reversed(conv), 1):
-                            with st.expander(f"{ts} ({idx})", expanded=False):
-                                st.markdown(f"**You:** {user_msg}")
-                                st.markdown(f"**Bot:** {bot_resp}")
-                except Exception:
-                    pass
+            conv = self.saved_conversations()
+            if conv:
+                st.markdown("#### Saved Conversations")
+                for idx, (user_msg, bot_resp, ts) in enumerate(reversed(conv), 1):
+                    with st.expander(f"{ts} ({idx})", expanded=False):
+                        st.markdown(f"**You:** {user_msg}")
+                        st.markdown(f"**Bot:** {bot_resp}")
 
     def run(self):
+        if config.METRICS_ENABLED:
+            start_metrics_server()
         if not st.session_state.get("system_initialized", False):
             self.initialize_system()
 
@@ -0,0 +1,202 @@
+"""
+async_scraping.py
+
+Concurrent asyncio Playwright scraper for several Myntra listing categories.
+ - crawls a list of category URLs with a bounded pool of browser contexts
+ - lightweight mode: images, fonts, media, CSS and trackers are aborted
+ - per-host politeness rate limit (still honors robots.txt per category)
+ - adaptive backoff: slows a host down on failures / 429s, recovers on success
+ - appends new/changed records to the output after every page and checkpoints
+   completed pages, so re-runs skip pages already fetched; pages that fail every
+   retry are logged and recorded in the checkpoint
+ - each listing page gets its own tab, so XHRs are credited to the page that made them;
+   a page is complete only once its listing response bodies have been read
+"""
+
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from scraping import (
+    BASE_URL, MAX_PAGES, OUTPUT_CSV, HEADLESS, USER_AGENT,
+    LIGHTWEIGHT_MODE, allowed_by_robots, iter_items_from_json, normalize_product_dict,
+    paged_url, breadcrumbs_for_url, is_product_json_response, should_block,
+)
+from scrape_checkpoint import CHECKPOINT_DB, ScrapeCheckpoint, open_sink
+
+# -------- CONFIG --------
+CATEGORY_URLS = [
+    BASE_URL,
+    "https://www.myntra.com/personal-care?f=Categories%3ALip%20Balm",
+    "https://www.myntra.com/personal-care?f=Categories%3AFace%20Wash",
+    "https://www.myntra.com/personal-care?f=Categories%3AShampoo",
+]
+MAX_CONTEXTS = 3           # concurrent browser contexts
+MIN_HOST_INTERVAL = 2.0    # seconds between requests to the same host
+MAX_HOST_INTERVAL = 60.0   # backoff ceiling
+MAX_RETRIES = 3
+
+
+# -------- politeness --------
+class HostRateLimiter:
+    """Spaces requests to each host by an interval that grows on failures and decays on success"""
+
+    def __init__(self, min_interval=MIN_HOST_INTERVAL, max_interval=MAX_HOST_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._locks = {}
+        self._last = {}
+        self._interval = {}
+
+    async def wait(self, host):
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            interval = self._interval.get(host, self.min_interval)
+            delay = self._last.get(host, 0.0) + interval * random.uniform(0.8, 1.2) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last[host] = time.monotonic()
+
+    def penalize(self, host):
+        self._interval[host] = min(self.max_interval, self._interval.get(host, self.min_interval) * 2)
+        print(f"[!] Backing off {host}: {self._interval[host]:.1f}s between requests")
+
+    def reward(self, host):
+        self._interval[host] = max(self.min_interval, self._interval.get(host, self.min_interval) * 0.75)
+
+
+# -------- scraper --------
+async def scrape_category(contexts, base_url, max_pages, limiter, sink, checkpoint):
+    if not await asyncio.to_thread(allowed_by_robots, base_url):
+        print(f"[!] robots.txt disallows {base_url} (or couldn't be read). Skipping.")
+        return 0
+
+    host = urlparse(base_url).netloc
+    breadcrumbs = breadcrumbs_for_url(base_url)
+    pages = [pnum for pnum in range(1, max_pages + 1) if not checkpoint.is_page_done(breadcrumbs, pnum)]
+    if not pages:
+        print(f"[+] {breadcrumbs}: all pages already scraped (checkpoint).")
+        return 0
+    page_records = {}  # listing page number -> records from that page's XHRs
+    listings_read = {}  # listing page number -> listing responses whose body was read
+
+    def response_handler(pnum, tasks):
+        async def read(response):
+            try:
+                body = await response.json()
+            except Exception:
+                return
+            listings_read[pnum] = listings_read.get(pnum, 0) + 1
+            for raw in iter_items_from_json(body):
+                rec = normalize_product_dict(raw, breadcrumbs)
+                if rec.get("product_name"):
+                    page_records.setdefault(pnum, []).append(rec)
+
+        def on_response(response):
+            if is_product_json_response(response):
+                # kept so the page isn't closed (cancelling the body read) before the read finishes
+                tasks.append(asyncio.ensure_future(read(response)))
+        return on_response
+
+    context = await contexts.get()
+    total = 0
+    try:
+        for pnum in pages:
+            url = paged_url(base_url, pnum)
+            loaded = False
+            error = None
+            page = await context.new_page()
+            tasks = []
+            page.on("response", response_handler(pnum, tasks))
+            try:
+                for attempt in range(1, MAX_RETRIES + 1):
+                    await limiter.wait(host)
+                    try:
+                        print(f"[+] Visiting {breadcrumbs} page {pnum}: {url}")
+                        response = await page.goto(url, timeout=60000)
+                        if response is not None and response.status in (429, 503):
+                            raise RuntimeError(f"HTTP {response.status}")
+                        await page.wait_for_load_state("networkidle", timeout=15000)
+                        await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=15)
+                        if not listings_read.get(pnum):
+                            raise RuntimeError("no listing response")
+                        limiter.reward(host)
+                        loaded = True
+                        break
+                    except Exception as e:
+                        error = e
+                        print(f"[!] {url} failed (attempt {attempt}/{MAX_RETRIES}): {e}")
+                        limiter.penalize(host)
+            finally:
+                # only reads of a failed page can still be running; they are dropped with it
+                await page.close()
+
+            fresh = checkpoint.new_or_changed(page_records.pop(pnum, []))
+            try:
+                sink.write(fresh)
+            except Exception:
+                checkpoint.rollback()
+                raise
+            listings_read.pop(pnum, None)
+            if loaded:
+                checkpoint.complete_page(breadcrumbs, pnum)
+            else:
+                checkpoint.commit()
+                checkpoint.record_failure(breadcrumbs, pnum, error, attempts=MAX_RETRIES)
+                print(f"[!] Giving up on {breadcrumbs} page {pnum} after {MAX_RETRIES} attempts: {error}")
+            total += len(fresh)
+            print(f"[+] {breadcrumbs} page {pnum}: {len(fresh)} new or changed products")
+    finally:
+        contexts.put_nowait(context)
+    return total
+
+
+async def block_non_essential(route):
+    if should_block(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def scrape_categories(category_urls=CATEGORY_URLS, max_pages=MAX_PAGES, output=OUTPUT_CSV,
+                            max_contexts=MAX_CONTEXTS, checkpoint_path=CHECKPOINT_DB, limiter=None):
+    sink = open_sink(output)
+    checkpoint = ScrapeCheckpoint(checkpoint_path)
+    limiter = limiter or HostRateLimiter()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=HEADLESS)
+        contexts = asyncio.Queue()
+        for _ in range(max(1, min(max_contexts, len(category_urls)))):
+            context = await browser.new_context(user_agent=USER_AGENT, locale="en-US")
+            if LIGHTWEIGHT_MODE:
+                await context.route("**/*", block_non_essential)
+            contexts.put_nowait(context)
+
+        results = await asyncio.gather(
+            *(scrape_category(contexts, url, max_pages, limiter, sink, checkpoint) for url in category_urls),
+            return_exceptions=True,
+        )
+        for url, result in zip(category_urls, results):
+            if isinstance(result, Exception):
+                print(f"[!] Category {url} failed: {result}")
+
+        while not contexts.empty():
+            await contexts.get_nowait().close()
+        await browser.close()
+    for category, pnum, attempts, error in checkpoint.failed_pages():
+        print(f"[!] Still failing: {category} page {pnum} ({attempts} attempts, last error: {error})")
+    checkpoint.close()
+
+    print(f"[+] Saved {sink.written} new or changed products to {output}")
+    return sink.written
+
+
+# -------- main --------
+if __name__ == "__main__":
+    print(f"[*] Starting async scraper for {len(CATEGORY_URLS)} categories")
+    asyncio.run(scrape_categories())
+    print("[*] Done.")
@@ -0,0 +1,198 @@
+"""
+Shared helpers for the benchmark and load-test scripts: synthetic catalogs shaped like
+data/personal_care_products_large_dataset.csv, a stub LLM and a SQLite stand-in for
+the PostgreSQL conversation store.
+"""
+
+import csv
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+BRANDS = ["Maybelline", "L'Oreal", "Nivea", "Himalaya", "Lakme", "Fogg", "Dove", "Mamaearth",
+          "Charlotte Tilbury", "MAC", "Biotique", "Plum", "Neutrogena", "Garnier", "Wild Stone"]
+ADJECTIVES = ["Glow", "Hydra", "Intense", "Matte", "Natural", "Pure", "Ultra"]
+# shade / variant names so synthetic products are distinguishable, as real listings are
+SHADES = ["Ruby Red", "Nude Beige", "Coral Crush", "Berry Bliss", "Rose Petal", "Mocha", "Peach Glow", "Plum Wine",
+          "Classic", "Fresh Mint", "Ocean Breeze", "Vanilla", "Lavender", "Charcoal", "Aloe", "Citrus"]
+CATEGORIES = ["Lipstick", "Lip Balm", "Mascara", "Foundation", "Face Wash",
+              "Perfume", "Shampoo", "Conditioner", "Body Lotion", "Deodorant"]
+DESCRIPTIONS = [
+    "Enriched with natural extracts for everyday use.",
+    "Hydrating and gentle on skin with rich texture.",
+    "Infused with essential oils and organic ingredients for a refreshing experience.",
+    "Long-lasting formula with smooth application.",
+    "Smudge-proof, waterproof, and lightweight formula.",
+    "Tested by dermatologists and suitable for all skin types.",
+]
+CSV_HEADER = ["Product_ID", "product_name", "brand", "price", "Original_Price", "Discount_Percentage", "Rating",
+              "Number_of_Ratings", "Shades_Available", "Breadcrumbs", "Product_URL", "Description"]
+
+# question mix, seeded from main.demo_chatbot
+DEMO_QUERIES = [
+    "What personal care products do you have?",
+    "Can you recommend skincare products?",
+    "What are the benefits of using moisturizer?",
+    "Do you have any anti-aging creams?",
+    "What brands of shampoo do you carry?",
+    "I want to know about current offers and discounts",
+    "How can I return a product I purchased?",
+    "What's your shipping policy?",
+    "Can you help me track my order?",
+    "Do you have any coupon codes?",
+    "What's the price range for your products?",
+    "Tell me about your brand products",
+]
+
+
+def make_catalog_rows(n, seed=42):
+    """Yield CSV rows with the bundled dataset's columns and value distributions"""
+    rng = random.Random(seed)
+    for i in range(1, n + 1):
+        brand = rng.choice(BRANDS)
+        category = rng.choice(CATEGORIES)
+        original = rng.randint(150, 6000)
+        discount = round(rng.uniform(0, 40), 1)
+        slug = category.lower().replace(" ", "-")
+        yield {
+            "Product_ID": f"PROD{i:07d}",
+            "product_name": f"{brand} {rng.choice(ADJECTIVES)} {category} {rng.choice(SHADES)} {rng.randint(1, 99999):05d}",
+            "brand": brand,
+            "price": max(149, int(original * (1 - discount / 100))),
+            "Original_Price": original,
+            "Discount_Percentage": discount,
+            "Rating": round(rng.uniform(3.0, 5.0), 1),
+            "Number_of_Ratings": rng.randint(0, 10000),
+            "Shades_Available": rng.choice(["", 1, 2, 3, 5, 8]),
+            "Breadcrumbs": f"Home/Personal Care/{category}",
+            "Product_URL": f"https://www.myntra.com/personal-care/{slug}/PROD{i:07d}",
+            "Description": rng.choice(DESCRIPTIONS),
+        }
+
+
+def write_catalog_csv(folder, n, seed=42):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"synthetic_{n}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADER)
+        writer.writeheader()
+        writer.writerows(make_catalog_rows(n, seed))
+    return path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(values):
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+class StubLLM:
+    """Stands in for ChatGroq: sleeps for a sampled latency and echoes a canned answer.
+
+    ``latency`` is a callable returning seconds, e.g. ``lognormal_latency(0.4, 0.5)``.
+    """
+
+    def __init__(self, latency=None, failure_rate=0.0, seed=None):
+        self.latency = latency or (lambda: 0.0)
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            delay = self.latency()
+            fail = self._rng.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError("stub LLM failure")
+        question = messages[-1].content if messages else ""
+        return SimpleNamespace(content=f"Here is some helpful information about: {question}")
+
+    def stream(self, messages):
+        for word in self.invoke(messages).content.split(" "):
+            yield SimpleNamespace(content=word + " ")
+
+
+def lognormal_latency(median, sigma, seed=None):
+    rng = random.Random(seed)
+    mu = math.log(median) if median > 0 else 0.0
+    return (lambda: rng.lognormvariate(mu, sigma)) if median > 0 else (lambda: 0.0)
+
+
+class SQLiteConversationStore:
+    """Same interface as PostgreSQLManager for store_conversation / history, backed by SQLite"""
+
+    def __init__(self, path=":memory:"):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.busy_seconds = 0.0
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS user_conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                user_message TEXT NOT NULL,
+                bot_response TEXT NOT NULL,
+                intent TEXT,
+                requires_human_assistance BOOLEAN DEFAULT 0,
+                contact_provided TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                trace_id TEXT
+            )
+        """)
+        self.connection.commit()
+
+    def store_conversation(self, user_id, user_message, bot_response, intent=None, requires_human=False, contact=None, trace_id=None):
+        start = time.perf_counter()
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO user_conversations (user_id, user_message, bot_response, intent, "
+                "requires_human_assistance, contact_provided, created_at, trace_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, user_message, bot_response, intent, requires_human, contact, datetime.now(), trace_id),
+            )
+            self.connection.commit()
+            self.writes += 1
+            self.busy_seconds += time.perf_counter() - start
+        return True
+
+    def store_conversations_bulk(self, rows):
+        rows = [(*row[:6], datetime.now(), row[6]) for row in rows]
+        start = time.perf_counter()
+        with self._lock:
+            self.connection.executemany(
+                "INSERT INTO user_conversations (user_id, user_message, bot_response, intent, "
+                "requires_human_assistance, contact_provided, created_at, trace_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.connection.commit()
+            self.writes += len(rows)
+            self.busy_seconds += time.perf_counter() - start
+        return len(rows)
+
+    def get_conversation_history(self, user_id="default_user", limit=10, include_archive=False):
+        # nothing is archived from the benchmark store
+        with self._lock:
+            return self.connection.execute(
+                "SELECT user_message, bot_response, created_at FROM user_conversations "
+                "WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)
+            ).fetchall()
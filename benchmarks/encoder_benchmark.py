@@ -0,0 +1,124 @@
+"""
+Compare text encoder backends (see src/vector_store/encoders.py) on a synthetic catalog.
+
+Each backend runs in its own process so memory numbers are not polluted by the others:
+ - model load time and resident memory added by loading + encoding
+ - single-query latency p50/p99 and batch encoding throughput
+ - cosine similarity to the reference (sentence-transformers) embeddings
+ - retrieval recall@k: overlap of brute-force top-k neighbours with the reference's top-k
+
+Run from the project root (export the ONNX models first for the onnx backends):
+    python -m benchmarks.encoder_benchmark --backends sentence-transformers,onnx,onnx-int8 --docs 5000
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import time
+
+import numpy as np
+
+from benchmarks.common import DEMO_QUERIES, latency_summary, make_catalog_rows
+
+REFERENCE_BACKEND = "sentence-transformers"
+
+
+def rss_mb():
+    """Current resident set size (falls back to peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def catalog_texts(n_docs, n_queries, seed=42):
+    docs = [f"{row['product_name']} {row['brand']} {row['Breadcrumbs']} {row['Description']}"
+            for row in make_catalog_rows(n_docs, seed)]
+    rng = random.Random(seed)
+    queries = list(DEMO_QUERIES) + [doc.split(" Home/")[0] for doc in rng.sample(docs, min(n_queries, len(docs)))]
+    return docs, queries[:max(n_queries, len(DEMO_QUERIES))]
+
+
+def run_backend(backend, docs, queries, k, batch_size):
+    from src.vector_store.encoders import load_encoder
+
+    before = rss_mb()
+    start = time.perf_counter()
+    encoder = load_encoder(backend)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doc_vectors = encoder.encode(docs, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    latencies, query_vectors = [], []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(encoder.encode([query])[0])
+        latencies.append(time.perf_counter() - start)
+    query_vectors = np.vstack(query_vectors)
+
+    scores = query_vectors @ doc_vectors.T
+    top_k = np.argsort(-scores, axis=1)[:, :k]
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "rss_added_mb": rss_mb() - before,
+        "query_latency_seconds": latency_summary(latencies),
+        "batch_texts_per_second": len(docs) / batch_seconds if batch_seconds else None,
+        "_doc_vectors": doc_vectors,
+        "_top_k": top_k,
+    }
+
+
+def run_isolated(backend, docs, queries, k, batch_size):
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_backend, (backend, docs, queries, k, batch_size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark text encoder backends")
+    parser.add_argument("--backends", default="sentence-transformers,onnx,onnx-int8")
+    parser.add_argument("--docs", type=int, default=2000, help="synthetic product documents to encode")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    docs, queries = catalog_texts(args.docs, args.queries)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    results = {}
+    for backend in backends:
+        print(f"⏱️  {backend}...")
+        try:
+            results[backend] = run_isolated(backend, docs, queries, args.k, args.batch_size)
+        except Exception as e:
+            print(f"❌ {backend}: {e}")
+
+    arrays = {backend: (result.pop("_doc_vectors"), result.pop("_top_k")) for backend, result in results.items()}
+    reference = arrays.get(REFERENCE_BACKEND)
+    for backend, result in results.items():
+        doc_vectors, top_k = arrays[backend]
+        if reference is not None:
+            cosines = (doc_vectors * reference[0]).sum(axis=1)
+            result["cosine_to_reference"] = {"mean": float(cosines.mean()), "min": float(cosines.min())}
+            overlap = [len(set(a) & set(b)) / args.k for a, b in zip(top_k, reference[1])]
+            result[f"recall_at_{args.k}"] = float(np.mean(overlap))
+
+    report = list(results.values())
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": report}, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
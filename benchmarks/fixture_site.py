@@ -0,0 +1,154 @@
+"""
+Local stand-in for the Myntra listing site, for scraper tests and the page-weight benchmark.
+
+Serves robots.txt, listing pages (/personal-care?f=Categories%3A<Category>&p=<n>) whose
+product grid is hydrated from a JSON listing API paged by offset (/gateway/v2/search/...?rows=&o=),
+plus the stylesheet, font, images and analytics script a real listing page pulls in.
+Products come from the recorded fixtures/listing_site/products.json.
+
+    with FixtureSite() as site:
+        scrape_myntra(site.url("/personal-care?f=Categories%3ALipstick"), 3, ...)
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, unquote, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "listing_site")
+ROWS = 20
+# deterministic filler so static assets weigh roughly what a real listing page's do
+_ASSET_SIZES = {"app.css": 120_000, "font.woff2": 60_000, "image": 35_000, "beacon.js": 15_000}
+
+
+def _load(name, mode="r"):
+    with open(os.path.join(FIXTURE_DIR, name), mode, encoding=None if "b" in mode else "utf-8") as f:
+        return f.read()
+
+
+class FixtureSite:
+    """Threaded HTTP server on 127.0.0.1 with a random port; use as a context manager.
+
+    ``fail_pages``: listing page numbers answered with 503. ``api_delay``: seconds before
+    each listing API response (to exercise XHRs that land late).
+    """
+
+    def __init__(self, fail_pages=(), api_delay=0.0, rows=ROWS):
+        self.products = json.loads(_load("products.json"))["products"]
+        self.listing_template = Template(_load("listing.html"))
+        self.robots = _load("robots.txt")
+        self.fail_pages = set(fail_pages)
+        self.api_delay = api_delay
+        self.rows = rows
+        self.requests = []
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                site.requests.append(self.path)
+                status, content_type, body = site.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, name="fixture-site", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return self.base_url + path
+
+    def category_products(self, category):
+        return [p for p in self.products if p["category"].lower() == category.lower()]
+
+    @staticmethod
+    def _category(query):
+        value = unquote(query.get("f", ["Categories:Lipstick"])[0])
+        return value.split(":", 1)[1] if ":" in value else value
+
+    def respond(self, path):
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        if parsed.path == "/robots.txt":
+            return 200, "text/plain", self.robots.encode()
+        if parsed.path == "/personal-care":
+            return self._listing_page(query)
+        if parsed.path.startswith("/gateway/v2/search/"):
+            if self.api_delay:
+                time.sleep(self.api_delay)
+            category = self._category(query)
+            rows = int(query.get("rows", [self.rows])[0])
+            offset = int(query.get("o", ["0"])[0])
+            body = {"totalCount": len(self.category_products(category)),
+                    "products": self.category_products(category)[offset:offset + rows]}
+            return 200, "application/json", json.dumps(body).encode()
+        if parsed.path.startswith("/static/img/"):
+            return 200, "image/jpeg", self._filler("image")
+        if parsed.path == "/static/app.css":
+            return 200, "text/css", self._filler("app.css")
+        if parsed.path == "/static/font.woff2":
+            return 200, "font/woff2", self._filler("font.woff2")
+        if parsed.path == "/analytics/beacon.js":
+            return 200, "application/javascript", b"/*" + self._filler("beacon.js") + b"*/"
+        return 404, "text/plain", b"not found"
+
+    @staticmethod
+    def _filler(name):
+        return (name.encode() * (_ASSET_SIZES[name] // len(name) + 1))[:_ASSET_SIZES[name]]
+
+    def _listing_page(self, query):
+        page = int(query.get("p", ["1"])[0])
+        if page in self.fail_pages:
+            return 503, "text/plain", b"service unavailable"
+        category = self._category(query)
+        offset = (page - 1) * self.rows
+        cards = "\n".join(
+            f'    <li class="product-base"><a href="/{p["productId"]}/buy">'
+            f'<img src="{p["searchImage"]}"><h3 class="product-brand">{p["brand"]}</h3>'
+            f'<h4 class="product-product">{p["productName"]}</h4>'
+            f'<span class="product-discountedPrice">Rs. {p["price"]}</span></a></li>'
+            for p in self.category_products(category)[offset:offset + self.rows]
+        )
+        html = self.listing_template.substitute(
+            title=f"{category} - page {page}", cards=cards, filter=f"Categories:{category}",
+            rows=self.rows, offset=offset,
+        )
+        return 200, "text/html; charset=utf-8", html.encode()
+
+
+if __name__ == "__main__":
+    with FixtureSite() as site:
+        print(f"Fixture listing site at {site.url('/personal-care?f=Categories%3ALipstick')} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
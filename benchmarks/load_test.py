@@ -0,0 +1,193 @@
+"""
+Load test: replay a conversation mix against PersonalCareChatbot at a target QPS.
+
+Arrivals are open-loop (Poisson at --qps) across --users simulated user_ids, so latency
+includes queueing when the process can't keep up. The LLM is a stub with a lognormal
+latency distribution; the vector store is the configured ChromaDB (or a synthetic
+catalog with --catalog-size) and turns go to SQLite unless --postgres is given.
+
+Reports throughput, latency percentiles, error rate, and DB / vector-store
+saturation (busy time per second of wall clock and peak concurrency). Run from the
+project root:
+    python -m benchmarks.load_test --qps 20 --duration 60 --users 200 --llm-median 0.4
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from benchmarks.common import (
+    DEMO_QUERIES, StubLLM, SQLiteConversationStore, latency_summary, lognormal_latency, write_catalog_csv,
+)
+from src.utils.metrics import metrics
+
+
+class Saturation:
+    """Wraps an object and records busy time and peak concurrency of selected methods"""
+
+    def __init__(self, target, methods):
+        self._target = target
+        self._methods = set(methods)
+        self._lock = threading.Lock()
+        self.busy_seconds = 0.0
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name not in self._methods:
+            return attr
+
+        def timed(*args, **kwargs):
+            with self._lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.in_flight -= 1
+                    self.busy_seconds += elapsed
+                    self.calls += 1
+        return timed
+
+    def report(self, wall_seconds):
+        return {
+            "calls": self.calls,
+            "busy_seconds_per_second": self.busy_seconds / wall_seconds if wall_seconds else None,
+            "mean_call_seconds": self.busy_seconds / self.calls if self.calls else None,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def load_question_mix(db_manager, limit):
+    """DEMO_QUERIES plus the newest ``limit`` user messages from a PostgreSQLManager's user_conversations"""
+    questions = list(DEMO_QUERIES)
+    if limit:
+        try:
+            with db_manager.cursor() as cursor:
+                cursor.execute("SELECT user_message FROM user_conversations ORDER BY id DESC LIMIT %s", (limit,))
+                questions.extend(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            print(f"⚠️  Could not read past conversations: {e}")
+    return questions
+
+
+def build_vector_store(catalog_size):
+    from src.vector_store.chroma_manager import ChromaDBManager
+    from src.utils.data_loader import CSVDataLoader
+
+    if not catalog_size:
+        return ChromaDBManager()
+    base = tempfile.mkdtemp(prefix="pcc_load_")
+    config.DATA_FOLDER = os.path.join(base, "data")
+    config.CHROMA_PERSIST_DIR = os.path.join(base, "chroma")
+    # synthetic catalogs reuse names/descriptions on purpose; keep every row
+    config.DEDUPE_ENABLED = False
+    write_catalog_csv(config.DATA_FOLDER, catalog_size)
+    vector_store = ChromaDBManager()
+    vector_store.add_products(CSVDataLoader().load_all_products())
+    return vector_store
+
+
+def run_load(chatbot, questions, qps, duration, users, max_workers, seed=0):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    error_text = "technical difficulties"
+    errors_before = metrics.counter_value("errors_total", component="chatbot", stage="generate_response")
+
+    def turn(scheduled_at, question, user_id):
+        nonlocal errors
+        try:
+            response = chatbot.generate_response(question, user_id)
+            failed = error_text in response
+        except Exception:
+            failed = True
+        # measured from the scheduled arrival, so queueing delay counts
+        elapsed = time.perf_counter() - scheduled_at
+        with lock:
+            latencies.append(elapsed)
+            errors += failed
+
+    start = time.perf_counter()
+    next_arrival = start
+    submitted = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while next_arrival - start < duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(turn, next_arrival, rng.choice(questions), f"load_user_{rng.randrange(users)}")
+            submitted += 1
+            next_arrival += rng.expovariate(qps)
+    wall = time.perf_counter() - start
+
+    return {
+        "target_qps": qps,
+        "submitted": submitted,
+        "completed": len(latencies),
+        "wall_seconds": wall,
+        "throughput_qps": len(latencies) / wall if wall else None,
+        "error_rate": errors / len(latencies) if latencies else None,
+        "llm_errors": metrics.counter_value("errors_total", component="chatbot", stage="generate_response") - errors_before,
+        "latency_seconds": latency_summary(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay conversation traffic against PersonalCareChatbot")
+    parser.add_argument("--qps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of arrivals")
+    parser.add_argument("--users", type=int, default=100, help="simulated user_ids")
+    parser.add_argument("--workers", type=int, default=32, help="max concurrent turns in the process")
+    parser.add_argument("--llm-median", type=float, default=0.4, help="stub LLM median latency (s)")
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="stub LLM lognormal sigma")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--catalog-size", type=int, default=0, help="build a synthetic catalog instead of using CHROMA_PERSIST_DIR")
+    parser.add_argument("--postgres", action="store_true", help="store turns in config.DB_CONFIG PostgreSQL")
+    parser.add_argument("--history-questions", type=int, default=200, help="past user_conversations rows to add to the mix")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    from src.chatbot.groq_chatbot import PersonalCareChatbot
+    from src.utils.catalog_index import CatalogIndex
+
+    if args.postgres:
+        from src.database.postgres_setup import PostgreSQLManager
+        db_manager = PostgreSQLManager()
+    else:
+        db_manager = SQLiteConversationStore()
+    questions = load_question_mix(db_manager, args.history_questions if args.postgres else 0)
+
+    db = Saturation(db_manager, ["store_conversation", "get_conversation_history"])
+    vector_store = Saturation(build_vector_store(args.catalog_size), ["search_products"])
+    chatbot = PersonalCareChatbot(
+        llm=StubLLM(lognormal_latency(args.llm_median, args.llm_sigma, seed=1), failure_rate=args.llm_failure_rate, seed=2),
+        vector_store=vector_store, db_manager=db, catalog_index=CatalogIndex.load() or CatalogIndex(),
+    )
+
+    print(f"🚦 {args.qps} QPS for {args.duration}s, {args.users} users, {args.workers} workers, {len(questions)} distinct questions")
+    report = run_load(chatbot, questions, args.qps, args.duration, args.users, args.workers)
+    report["db"] = db.report(report["wall_seconds"])
+    report["vector_store"] = vector_store.report(report["wall_seconds"])
+    report["args"] = vars(args)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
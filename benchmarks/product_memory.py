@@ -0,0 +1,72 @@
+"""
+Memory per product: loader-style dicts vs ProductRecord.
+
+Run from the project root:
+    python -m benchmarks.product_memory [n_products]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from benchmarks.common import BRANDS, CATEGORIES
+from src.utils.product_record import ProductRecord
+
+
+def make_rows(n, seed=42):
+    """Rows shaped like CSV cells: every brand/breadcrumb is a fresh string, as pandas produces"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        brand = rng.choice(BRANDS)
+        category = rng.choice(CATEGORIES)
+        rows.append({
+            'product_id': f"PROD{i:07d}",
+            'product_name': f"{brand} Product {i} {category}",
+            'brand': "".join(brand),
+            'price': str(rng.randint(149, 5999)),
+            'rating': f"{rng.uniform(3.0, 5.0):.1f}",
+            'product_url': f"https://www.myntra.com/personal-care/{category.lower()}/PROD{i:07d}",
+            'breadcrumbs': "/".join(["Home", "Personal Care", category]),
+            'description': "Long-lasting formula with smooth application.",
+        })
+    return rows
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return objects, size
+
+
+def main(n=100_000):
+    rows = make_rows(n)
+
+    def as_dicts():
+        return [{
+            'product_name': r['product_name'],
+            'brand': r['brand'],
+            'price': float(r['price']),
+            'rating': r['rating'],
+            'product_url': r['product_url'],
+            'breadcrumbs': r['breadcrumbs'],
+            'description': r['description'],
+        } for r in rows]
+
+    def as_records():
+        return [ProductRecord.from_dict(r) for r in rows]
+
+    _, dict_bytes = measure(as_dicts)
+    _, record_bytes = measure(as_records)
+
+    print(f"📊 {n} products")
+    print(f"   dict:          {dict_bytes / n:8.1f} bytes/product")
+    print(f"   ProductRecord: {record_bytes / n:8.1f} bytes/product (includes product_id/category fields)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,145 @@
+"""
+Reproducible benchmarks for ingestion, retrieval and chat-turn latency.
+
+For each catalog size a synthetic CSV shaped like data/personal_care_products_large_dataset.csv
+is generated (fixed seed), then we measure:
+ - CSVDataLoader load time
+ - catalog index build time and ChromaDB indexing throughput
+ - search_products p50/p99 latency and recall@k for shopper-style queries (a product's name, lowercased,
+   with one word dropped), so the query never contains the indexed text verbatim
+ - end-to-end generate_response latency with a stub LLM and a SQLite (or local PostgreSQL) store
+
+Results are written as JSON so runs can be diffed across versions. Run from the project root:
+    python -m benchmarks.run_benchmarks --sizes 1000,100000 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import config
+from benchmarks.common import (
+    DEMO_QUERIES, StubLLM, SQLiteConversationStore, latency_summary, lognormal_latency, write_catalog_csv,
+)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def shopper_query(name, rng):
+    """Lowercased product name with one word dropped, like a half-remembered search"""
+    words = name.lower().split()
+    if len(words) > 2:
+        del words[rng.randrange(len(words))]
+    return " ".join(words)
+
+
+def bench_size(n, workdir, n_queries, k, chat_turns, llm_median, use_postgres):
+    from src.utils.data_loader import CSVDataLoader
+    from src.utils.catalog_index import CatalogIndex
+    from src.vector_store.chroma_manager import ChromaDBManager
+    from src.chatbot.groq_chatbot import PersonalCareChatbot
+
+    base = os.path.join(workdir, str(n))
+    config.DATA_FOLDER = os.path.join(base, "data")
+    config.CHROMA_PERSIST_DIR = os.path.join(base, "chroma")
+    config.CATALOG_INDEX_PATH = os.path.join(base, "catalog_index.json")
+    # synthetic catalogs reuse names/descriptions on purpose; keep every row
+    config.DEDUPE_ENABLED = False
+    write_catalog_csv(config.DATA_FOLDER, n)
+    result = {"size": n}
+
+    print(f"\n📦 Catalog of {n} products")
+    start = time.perf_counter()
+    products = CSVDataLoader().load_all_products()
+    elapsed = time.perf_counter() - start
+    result["load"] = {"seconds": elapsed, "products_per_second": len(products) / elapsed}
+
+    start = time.perf_counter()
+    catalog_index = CatalogIndex.from_products(products)
+    result["catalog_index_build_seconds"] = time.perf_counter() - start
+
+    vector_store = ChromaDBManager()
+    start = time.perf_counter()
+    vector_store.add_products(products)
+    elapsed = time.perf_counter() - start
+    result["indexing"] = {"seconds": elapsed, "products_per_second": len(products) / elapsed}
+
+    rng = random.Random(7)
+    sample = rng.sample(products, min(n_queries, len(products)))
+    latencies, hits = [], 0
+    for product in sample:
+        # relevant = the product itself; names shared by other products don't count
+        query = shopper_query(product.product_name, rng)
+        start = time.perf_counter()
+        results = vector_store.search_products(query, n_results=k)
+        latencies.append(time.perf_counter() - start)
+        if any(r["metadata"].get("product_id") == product.product_id for r in results):
+            hits += 1
+    result["search"] = {"k": k, "latency_seconds": latency_summary(latencies),
+                        f"recall_at_{k}": hits / len(sample) if sample else None}
+
+    if chat_turns:
+        if use_postgres:
+            from src.database.postgres_setup import PostgreSQLManager
+            db_manager = PostgreSQLManager()
+        else:
+            db_manager = SQLiteConversationStore()
+        chatbot = PersonalCareChatbot(
+            llm=StubLLM(lognormal_latency(llm_median, 0.3, seed=1)),
+            vector_store=vector_store, db_manager=db_manager, catalog_index=catalog_index,
+        )
+        latencies = []
+        for i in range(chat_turns):
+            start = time.perf_counter()
+            chatbot.generate_response(DEMO_QUERIES[i % len(DEMO_QUERIES)], user_id=f"bench_{i % 10}")
+            latencies.append(time.perf_counter() - start)
+        result["chat_turn"] = {"stub_llm_median_seconds": llm_median, "latency_seconds": latency_summary(latencies)}
+
+    print(json.dumps(result, indent=2))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000", help="comma-separated catalog sizes, e.g. 1000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200, help="search queries per size")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--chat-turns", type=int, default=50, help="generate_response calls per size (0 to skip)")
+    parser.add_argument("--llm-median", type=float, default=0.0, help="stub LLM median latency in seconds")
+    parser.add_argument("--postgres", action="store_true", help="store turns in the local PostgreSQL from config.DB_CONFIG")
+    parser.add_argument("--workdir", help="where catalogs/indexes are built (default: a temp dir)")
+    parser.add_argument("--output", default=f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pcc_bench_")
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": [bench_size(n, workdir, args.queries, args.k, args.chat_turns, args.llm_median, args.postgres)
+                    for n in sizes],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Benchmark results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Bytes and time per page for the Playwright scraper, full page loads vs lightweight mode.
+
+By default it runs against the bundled fixture site (benchmarks/fixture_site.py: robots.txt,
+listing pages hydrated from an offset-paged JSON API, stylesheet, font, images, analytics),
+so the before/after numbers are reproducible offline. Pass a listing URL you're allowed to
+crawl to measure a live site instead. Run from the project root:
+    python -m benchmarks.scraper_page_weight 3
+    python -m benchmarks.scraper_page_weight 3 https://www.myntra.com/personal-care?f=Categories%3ALipstick
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.fixture_site import FixtureSite
+from scraping import PageStats, scrape_myntra
+
+FIXTURE_PATH = "/personal-care?f=Categories%3ALipstick"
+
+
+def run(url, pages, lightweight, direct_api=False):
+    stats = PageStats("(lightweight)" if lightweight else "(full)")
+    with tempfile.TemporaryDirectory() as tmp:
+        collected = scrape_myntra(url, pages, output=None, checkpoint_path=os.path.join(tmp, "checkpoint.sqlite"),
+                                  lightweight=lightweight, direct_api=direct_api, page_stats=stats)
+    return dict(stats.totals(), products=len(collected))
+
+
+def report(url, pages):
+    before = run(url, pages, lightweight=False)
+    after = run(url, pages, lightweight=True)
+    direct = run(url, pages, lightweight=True, direct_api=True)
+
+    print(f"\n📊 {pages} page(s) of {url}")
+    for label, t in (("full", before), ("lightweight", after), ("lightweight+api", direct)):
+        per_page = pages + 1  # includes the initial load
+        print(f"   {label:16s} {t['bytes'] / 1024 / per_page:9.1f} KiB/page  {t['seconds'] / per_page:6.2f} s/page  "
+              f"{t['requests']} requests, {t['blocked']} blocked, {t['products']} products")
+    if before["bytes"]:
+        print(f"   lightweight saves {100 * (1 - after['bytes'] / before['bytes']):.0f}% of bytes")
+    return {"full": before, "lightweight": after, "lightweight+api": direct}
+
+
+def main(pages=2, url=None):
+    if url:
+        return report(url, pages)
+    with FixtureSite() as site:
+        results = report(site.url(FIXTURE_PATH), pages)
+        expected = min(pages * site.rows, len(site.category_products("Lipstick")))
+        for label, t in results.items():
+            if t["products"] != expected:
+                print(f"   [!] {label} collected {t['products']} products, expected {expected}")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(next((int(a) for a in args if a.isdigit()), 2), next((a for a in args if "://" in a), None))
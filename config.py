@@ -27,4 +27,98 @@ HUMAN_REPRESENTATIVE_CONTACT = "+1-800-987-6543"
 DATA_FOLDER = "./data"
 
 
+# Catalog secondary indexes (brand / category / price / rating), built during ingestion
+CATALOG_INDEX_PATH = "./catalog_index.json"
+
+# Blue/green index rebuilds: versioned collections behind a read alias
+INDEX_ALIAS_FILE = "collection_alias.json"  # stored inside CHROMA_PERSIST_DIR
+INDEX_VERSIONS_TO_KEEP = 2  # active version + previous ones kept for rollback
+INDEX_VALIDATION_SAMPLE = 20
+INDEX_MIN_RECALL = 0.9
+
+# Background catalog watcher: hot-reload new/changed CSVs in DATA_FOLDER
+CATALOG_WATCH_ENABLED = os.getenv("CATALOG_WATCH_ENABLED", "false").lower() == "true"
+CATALOG_WATCH_INTERVAL = 5.0  # seconds between polls
+
+# Batch question answering (python main.py batch)
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))  # concurrent LLM calls
+
+# Streamlit chat: messages rendered per rerun ("Load older" adds another window)
+CHAT_WINDOW_SIZE = int(os.getenv("CHAT_WINDOW_SIZE", "20"))
+
+# Text encoder for product documents and queries: "chroma" (ChromaDB built-in), "sentence-transformers",
+# "onnx" or "onnx-int8" (export first: python -m src.vector_store.encoders export --quantize)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "chroma")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+ONNX_MODEL_DIR = "./models/all-MiniLM-L6-v2-onnx"
+ENCODER_THREADS = int(os.getenv("ENCODER_THREADS", "0"))  # ONNX Runtime intra-op threads, 0 = default
+ENCODER_MIN_COSINE = 0.98  # exported models must stay this close to the reference on every validation text
+
+# Near-duplicate merging when loading CSVs (MinHash + LSH over brand/name/description shingles)
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "false").lower() == "true"
+DEDUPE_THRESHOLD = 0.8  # estimated Jaccard similarity at which two products are the same
+DEDUPE_NUM_PERM = 128
+DEDUPE_MAX_PRICE_RATIO = 1.5  # similar text but prices further apart than this stays separate
+DEDUPE_BUCKET_WINDOW = 100  # max comparisons per product per LSH bucket (bounds templated catalogs)
+
+# Precomputed similar-product graph (python main.py similarity-graph)
+SIMILARITY_GRAPH_PATH = "./similarity_graph.npz"
+SIMILARITY_GRAPH_K = 20  # neighbours stored per product
+SIMILARITY_GRAPH_BLOCK_SIZE = 1024  # rows per matrix-product block
+
+# Category-sharded search: one extra collection per top-level breadcrumb category.
+# Queries naming a category search only its shard; unclear ones fan out to all shards in parallel.
+SHARDED_COLLECTIONS = os.getenv("SHARDED_COLLECTIONS", "false").lower() == "true"
+SHARD_FANOUT_WORKERS = 8
+SHARD_ROUTER_MAX_SHARDS = 3  # a query matching more categories than this fans out to all shards
+SHARD_ROUTER_SYNONYMS = {
+    "lipstick": ["lip colour", "lip color"],
+    "perfume": ["fragrance", "scent", "eau de parfum"],
+    "deodorant": ["deo", "antiperspirant"],
+    "body lotion": ["moisturizer", "moisturiser"],
+    "face wash": ["cleanser", "facewash"],
+}
+
+# Text embedded and stored per product: a key of DOCUMENT_TEMPLATES or a format string using
+# {product_name} {brand} {category} {breadcrumbs} {description} {price} {rating}
+DOCUMENT_TEMPLATES = {
+    "compact": "{product_name} by {brand}. {category}. {description}",
+    "detailed": "{product_name} by {brand}. {breadcrumbs}. Price {price}. Rating {rating}. {description}",
+    "name": "{product_name} by {brand}. {category}",
+}
+DOCUMENT_TEMPLATE = os.getenv("DOCUMENT_TEMPLATE", "compact")
+
+# Optional separate name / description vectors, combined at query time with these weights
+FIELD_EMBEDDINGS = os.getenv("FIELD_EMBEDDINGS", "false").lower() == "true"
+FIELD_WEIGHTS = {"name": 0.6, "description": 0.4}
+FIELD_OVERFETCH = 4  # candidates fetched per field = n_results * FIELD_OVERFETCH
+
+# Metrics Configuration
+# Prometheus text endpoint at http://<host>:METRICS_PORT/metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# HTTP API Configuration (src/api/server.py)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))  # worker processes
+API_MAX_IN_FLIGHT = int(os.getenv("API_MAX_IN_FLIGHT", "32"))  # per worker; beyond this requests get 503
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "30"))  # seconds
+
+
 ## Step 2: PostgreSQL Database (Conversations Only)
+# PostgreSQL connection pool (per process)
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "5"))
+
+# Conversation analytics: hourly rollups (hour x intent x requires_human_assistance) kept in
+# conversation_rollup_hourly and refreshed incrementally from the last rolled-up conversation id
+ANALYTICS_REFRESH_BATCH = 50000  # conversations folded in per transaction
+ANALYTICS_REFRESH_LAG_SECONDS = 5  # leave very recent rows for the next refresh so late commits aren't skipped
+ANALYTICS_REFRESH_INTERVAL = int(os.getenv("ANALYTICS_REFRESH_INTERVAL", "60"))  # min seconds between refresh-on-read
+
+# Conversation archive: turns older than ARCHIVE_AFTER_DAYS move from user_conversations to
+# zstd Parquet files under ARCHIVE_DIR (month=YYYY-MM/ partitions), ARCHIVE_BATCH_SIZE rows per transaction
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive/conversations")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_COMPRESSION = "zstd"
@@ -1,6 +1,12 @@
 from src.utils.data_loader import CSVDataLoader
+from src.utils.catalog_index import CatalogIndex
 from src.vector_store.chroma_manager import ChromaDBManager
 from src.chatbot.groq_chatbot import PersonalCareChatbot
+from src.utils.catalog_watcher import start_catalog_watcher
+from src.utils.metrics import start_metrics_server
+import config
+import argparse
+import json
 import os
 
 def setup_system():
@@ -23,9 +29,16 @@ def setup_system():
     if not csv_loader.validate_data_quality(products):
         print("⚠️  Data quality issues detected, but continuing...")
     
+    # Build and persist catalog indexes (brand / category / price / rating)
+    catalog_index = CatalogIndex.from_products(products)
+    catalog_index.save()
+    print(f"✅ Catalog index built: {len(catalog_index.brands())} brands, {len(catalog_index.categories())} categories")
+    
     # Add products to ChromaDB
     vector_store = ChromaDBManager()
     vector_store.add_products(products)
+    # products merged into another by dedupe may still be indexed from an earlier run
+    vector_store.delete_products(list(csv_loader.merged_ids))
     
     product_count = vector_store.get_product_count()
     print(f"✅ System setup complete! Vector store contains {product_count} products.")
@@ -45,6 +58,9 @@ def interactive_chatbot():
     chatbot = PersonalCareChatbot()
     user_id = "interactive_user"
     
+    if config.CATALOG_WATCH_ENABLED:
+        start_catalog_watcher(chatbot.vector_store, chatbot.catalog_index, on_change=chatbot.on_catalog_change)
+    
     while True:
         try:
             user_input = input("\n👤 You: ").strip()
@@ -110,7 +126,87 @@ def demo_chatbot():
         print(f"   🤖 Bot: {response}")
         print("   " + "-" * 50)
 
-if __name__ == "__main__":
+def rebuild_index():
+    """Rebuild the vector index into a new collection and switch searches to it once validated"""
+    csv_loader = CSVDataLoader()
+    products = csv_loader.load_all_products()
+    if not products:
+        print("❌ No products loaded. Nothing to rebuild.")
+        return False
+    
+    catalog_index = CatalogIndex.from_products(products)
+    vector_store = ChromaDBManager()
+    if not vector_store.rebuild_index(products):
+        print("❌ Rebuild failed validation; search keeps using the current index.")
+        return False
+    catalog_index.save()
+    if os.path.exists(config.SIMILARITY_GRAPH_PATH):
+        vector_store.build_similarity_graph()
+    return True
+
+def read_questions(path, user_id):
+    """Questions from a text file (one per line) or JSONL with "question" and optional "user_id" keys"""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                item = json.loads(line)
+                questions.append((item.get("user_id", user_id), item["question"]))
+            else:
+                questions.append((user_id, line))
+    return questions
+
+def batch_answer(input_path, output_path, user_id="batch_user", concurrency=None):
+    """Answer every question in input_path and write one JSON result per line to output_path"""
+    questions = read_questions(input_path, user_id)
+    if not questions:
+        print(f"❌ No questions found in {input_path}")
+        return []
+    
+    print(f"📦 Answering {len(questions)} questions...")
+    chatbot = PersonalCareChatbot()
+    results = chatbot.generate_responses_batch(questions, max_workers=concurrency)
+    
+    with open(output_path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    errors = sum(1 for r in results if r["intent"] == "error")
+    print(f"✅ Wrote {len(results)} answers to {output_path} ({errors} errors)")
+    return results
+
+def analytics_report(hours=24, refresh_only=False):
+    """Fold new conversations into the hourly rollup, then print the intent / handoff report"""
+    from src.database.analytics import ConversationAnalytics, print_report
+    from src.database.postgres_setup import PostgreSQLManager
+    
+    db_manager = PostgreSQLManager()
+    try:
+        analytics = ConversationAnalytics(db_manager)
+        print(f"✅ Rolled up {analytics.refresh()} new conversations")
+        if not refresh_only:
+            print_report(analytics, hours)
+    finally:
+        db_manager.close()
+
+def archive_conversations(older_than_days=None, batch_size=None, max_batches=None):
+    """Move conversations older than older_than_days from PostgreSQL to the Parquet archive"""
+    from src.database.archiver import ConversationArchiver
+    from src.database.postgres_setup import PostgreSQLManager
+    
+    db_manager = PostgreSQLManager()
+    try:
+        return ConversationArchiver(db_manager, db_manager.archive).run(older_than_days, batch_size, max_batches)
+    finally:
+        db_manager.close()
+
+def run():
+    """Set up the system and start the interactive or demo chatbot"""
+    if config.METRICS_ENABLED:
+        start_metrics_server()
+    
     # Setup system with CSV data
     products = setup_system()
     
@@ -138,3 +234,39 @@ if __name__ == "__main__":
         print("   - CSV files have required columns (product_name, brand, price)")
         print("   - PostgreSQL database is running")
         print("   - GROQ_API_KEY is set in .env file")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Personal Care Product Chatbot")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("chat", help="Set up the system and start chatting (default)")
+    subparsers.add_parser("rebuild-index", help="Rebuild the vector index without search downtime")
+    subparsers.add_parser("rollback-index", help="Switch search back to the previous index version")
+    subparsers.add_parser("similarity-graph", help="Precompute similar-product neighbours for every product")
+    batch_parser = subparsers.add_parser("batch", help="Answer a file of questions and write JSONL results")
+    batch_parser.add_argument("input", help="text file with one question per line, or JSONL with question/user_id")
+    batch_parser.add_argument("-o", "--output", default="batch_answers.jsonl")
+    batch_parser.add_argument("--user-id", default="batch_user")
+    batch_parser.add_argument("--concurrency", type=int, default=None, help="concurrent LLM calls (default BATCH_LLM_CONCURRENCY)")
+    analytics_parser = subparsers.add_parser("analytics", help="Refresh conversation rollups and print hourly intent / handoff report")
+    analytics_parser.add_argument("--hours", type=int, default=24, help="report window ending with the current hour")
+    analytics_parser.add_argument("--refresh-only", action="store_true", help="only fold new conversations into the rollup")
+    archive_parser = subparsers.add_parser("archive", help="Move old conversations to compressed Parquet files")
+    archive_parser.add_argument("--older-than-days", type=int, default=None, help="default ARCHIVE_AFTER_DAYS")
+    archive_parser.add_argument("--batch-size", type=int, default=None, help="rows per transaction (default ARCHIVE_BATCH_SIZE)")
+    archive_parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+    args = parser.parse_args()
+    
+    if args.command == "rebuild-index":
+        rebuild_index()
+    elif args.command == "rollback-index":
+        ChromaDBManager().rollback_index()
+    elif args.command == "similarity-graph":
+        ChromaDBManager().build_similarity_graph()
+    elif args.command == "batch":
+        batch_answer(args.input, args.output, args.user_id, args.concurrency)
+    elif args.command == "analytics":
+        analytics_report(args.hours, args.refresh_only)
+    elif args.command == "archive":
+        archive_conversations(args.older_than_days, args.batch_size, args.max_batches)
+    else:
+        run()
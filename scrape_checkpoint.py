@@ -0,0 +1,173 @@
+"""
+scrape_checkpoint.py
+
+Resumable scraping support shared by scraping.py and async_scraping.py.
+ - ScrapeCheckpoint: SQLite store of seen product keys (with a content hash),
+   the pages already completed per category and pages that failed every retry
+ - CSVSink / ParquetSink: append-only outputs flushed after every page
+"""
+
+import csv
+import hashlib
+import os
+import sqlite3
+import time
+
+CHECKPOINT_DB = "scrape_checkpoint.sqlite"
+PAGE_TTL_HOURS = 24   # completed pages older than this are fetched again
+CSV_COLUMNS = ["product_name", "brand", "price", "rating", "product_url", "image_url", "breadcrumbs", "description", "scraped_at"]
+
+
+def dedupe_key(rec):
+    return (rec.get("product_url") or (rec.get("product_name", "") + "|" + rec.get("brand", ""))).strip()
+
+
+def content_hash(rec):
+    """Hash of the product fields that matter (ignores scraped_at)"""
+    payload = "\x1f".join(str(rec.get(c, "")) for c in CSV_COLUMNS if c != "scraped_at")
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ScrapeCheckpoint:
+    def __init__(self, path=CHECKPOINT_DB, page_ttl_hours=PAGE_TTL_HOURS):
+        self.path = path
+        self.page_ttl = page_ttl_hours * 3600
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen_products (
+                key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS completed_pages (
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (category, page)
+            );
+            CREATE TABLE IF NOT EXISTS failed_pages (
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL,
+                PRIMARY KEY (category, page)
+            );
+        """)
+        self.conn.commit()
+
+    def is_page_done(self, category, page):
+        row = self.conn.execute(
+            "SELECT completed_at FROM completed_pages WHERE category = ? AND page = ?", (category, page)
+        ).fetchone()
+        return bool(row) and time.time() - row[0] < self.page_ttl
+
+    def new_or_changed(self, records):
+        """Records whose key is unseen or whose content changed; recorded as seen (not yet committed)"""
+        fresh = []
+        now = time.time()
+        for rec in records:
+            key = dedupe_key(rec)
+            if not key:
+                continue
+            digest = content_hash(rec)
+            row = self.conn.execute("SELECT content_hash FROM seen_products WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == digest:
+                continue
+            self.conn.execute(
+                "INSERT INTO seen_products (key, content_hash, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+                (key, digest, now),
+            )
+            fresh.append(rec)
+        return fresh
+
+    def complete_page(self, category, page):
+        """Mark a page done and commit everything recorded for it"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO completed_pages (category, page, completed_at) VALUES (?, ?, ?)",
+            (category, page, time.time()),
+        )
+        self.conn.execute("DELETE FROM failed_pages WHERE category = ? AND page = ?", (category, page))
+        self.conn.commit()
+
+    def record_failure(self, category, page, error, attempts=1):
+        """Remember a page that failed every retry (it stays pending, so the next run tries it again)"""
+        self.conn.execute(
+            "INSERT INTO failed_pages (category, page, attempts, error, failed_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(category, page) DO UPDATE SET attempts = attempts + excluded.attempts, "
+            "error = excluded.error, failed_at = excluded.failed_at",
+            (category, page, attempts, str(error), time.time()),
+        )
+        self.conn.commit()
+
+    def failed_pages(self, category=None):
+        """(category, page, attempts, error) of pages whose last run failed"""
+        query = "SELECT category, page, attempts, error FROM failed_pages"
+        params = ()
+        if category is not None:
+            query += " WHERE category = ?"
+            params = (category,)
+        return self.conn.execute(query + " ORDER BY category, page", params).fetchall()
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+class CSVSink:
+    """Append-only CSV output, flushed to disk on every write"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.written = 0
+        self._write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
+
+    def write(self, records):
+        if not records:
+            return 0
+        with open(self.filename, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            if self._write_header:
+                writer.writeheader()
+                self._write_header = False
+            writer.writerows(records)
+            f.flush()
+            os.fsync(f.fileno())
+        self.written += len(records)
+        return len(records)
+
+
+class ParquetSink:
+    """Append-only Parquet output: one part file per flush inside a directory"""
+
+    def __init__(self, directory):
+        import pyarrow  # noqa: F401  (fail early if pyarrow isn't installed)
+        self.directory = directory
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, records):
+        if not records:
+            return 0
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([{c: rec.get(c, "") for c in CSV_COLUMNS} for rec in records])
+        part = os.path.join(self.directory, f"part-{time.time_ns()}.parquet")
+        pq.write_table(table, part + ".tmp", compression="zstd")
+        os.replace(part + ".tmp", part)
+        self.written += len(records)
+        return len(records)
+
+
+def open_sink(output):
+    """CSV sink for *.csv paths, Parquet part-file sink otherwise (e.g. 'scraped_products.parquet/')"""
+    if output.lower().endswith(".csv"):
+        return CSVSink(output)
+    return ParquetSink(output)
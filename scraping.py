@@ -3,26 +3,38 @@ myntra_scraper_playwright.py
 
 Playwright-based scraper for Myntra product listings (Lipstick category).
  - checks robots.txt (will abort if disallowed)
+ - lightweight mode: blocks non-essential requests; optional direct listing-API calls
  - scrapes up to MAX_PAGES pages
  - captures JSON XHR responses and falls back to DOM scraping
- - deduplicates and saves to CSV
+ - deduplicates and appends new/changed products to the output after every page
+ - checkpoints completed pages and seen products so re-runs resume (see scrape_checkpoint.py)
+ - retries failed pages with a backoff that grows with consecutive failures; 429/503 are retried,
+   other HTTP errors fail the page at once
 """
 
 import re
 import time
 import random
-from urllib.parse import urljoin, urlparse
+from collections import deque
+from urllib.parse import urljoin, urlparse, unquote, parse_qs
 from datetime import datetime
 import urllib.robotparser
 
 import pandas as pd
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
 
+from scrape_checkpoint import CHECKPOINT_DB, ScrapeCheckpoint, open_sink, dedupe_key
+
 # -------- CONFIG --------
 BASE_URL = "https://www.myntra.com/personal-care?f=Categories%3ALipstick"
 MAX_PAGES = 5
 OUTPUT_CSV = "scraped_products.csv"
 HEADLESS = True
+LIGHTWEIGHT_MODE = True   # abort images, fonts, media, CSS and trackers; we only need JSON XHRs / card text
+DIRECT_API_MODE = False   # after page 1, call the captured listing API directly instead of navigating
+MAX_RETRIES = 3           # attempts per listing page
+RETRY_STATUSES = frozenset({429, 503})  # other non-2xx listing responses fail the page without retrying
+MAX_BACKOFF_SECONDS = 30  # backoff doubles with each consecutive failure, up to this
 # polite user agent — replace the email with yours if you intend to run more often
 USER_AGENT = "MyScraperBot/1.0 (+mailto:rupsajana1234@gmail.com) Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 
@@ -39,35 +51,103 @@ def allowed_by_robots(base_url, user_agent=USER_AGENT):
         return False
     return rp.can_fetch(user_agent, base_url)
 
-def extract_items_from_json(obj):
-    results = []
-    def looks_like_product(d):
-        if not isinstance(d, dict):
-            return False
-        keys = set(k.lower() for k in d.keys())
-        common = {'productid','product_id','id','name','productname','brand','price','searchimage','image','productlink','url'}
-        return bool(keys & common)
-    queue = [obj]
+class ListingHTTPError(RuntimeError):
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+def is_retryable(error):
+    return not isinstance(error, ListingHTTPError) or error.status in RETRY_STATUSES
+
+def backoff_ms(failures):
+    """Jittered wait after ``failures`` consecutive failures: 2s, 4s, 8s, ... up to MAX_BACKOFF_SECONDS"""
+    return 1000 * min(MAX_BACKOFF_SECONDS, 2 ** failures) * random.uniform(0.8, 1.2)
+
+# key sets / patterns compiled once, not per JSON node or per response
+PRODUCT_KEYS = frozenset({'productid','product_id','id','name','productname','brand','price','searchimage','image','productlink','url'})
+JSON_URL_PATTERN = re.compile(r'search|products|gateway|catalog|listing|api', re.IGNORECASE)
+JSON_RESOURCE_TYPES = frozenset({'xhr', 'fetch'})
+
+def looks_like_product(d):
+    return isinstance(d, dict) and any(str(k).lower() in PRODUCT_KEYS for k in d)
+
+def iter_items_from_json(obj):
+    """Yield product-like dicts from a JSON body, breadth-first with a deque (O(n) overall)"""
+    queue = deque([obj])
     while queue:
-        node = queue.pop(0)
+        node = queue.popleft()
         if isinstance(node, list):
-            if node and isinstance(node[0], dict) and looks_like_product(node[0]):
+            if node and looks_like_product(node[0]):
                 for entry in node:
                     if isinstance(entry, dict):
-                        results.append(entry)
+                        yield entry
             else:
-                for elem in node:
-                    if isinstance(elem, (dict, list)):
-                        queue.append(elem)
+                queue.extend(elem for elem in node if isinstance(elem, (dict, list)))
         elif isinstance(node, dict):
             if looks_like_product(node):
-                results.append(node)
-            for v in node.values():
-                if isinstance(v, (dict, list)):
-                    queue.append(v)
-    return results
+                yield node
+            queue.extend(v for v in node.values() if isinstance(v, (dict, list)))
+
+def extract_items_from_json(obj):
+    return list(iter_items_from_json(obj))
+
+def is_product_json_response(response):
+    """Cheap header/URL check so non-listing responses are never parsed"""
+    try:
+        if response.request.resource_type not in JSON_RESOURCE_TYPES:
+            return False
+        ct = response.headers.get("content-type", "")
+        return "application/json" in ct or bool(JSON_URL_PATTERN.search(response.url))
+    except Exception:
+        return False
+
+def set_query_param(url, name, value):
+    """Replace (or append) one query parameter; anchored on [?&] so 'p' never matches 'sp='"""
+    pattern = re.compile(r'([?&])' + re.escape(name) + r'=[^&#]*')
+    if pattern.search(url):
+        return pattern.sub(lambda m: f"{m.group(1)}{name}={value}", url, count=1)
+    sep = '&' if urlparse(url).query else '?'
+    return url + f"{sep}{name}={value}"
+
+def paged_url(base_url, pnum):
+    return set_query_param(base_url, "p", pnum)
+
+# listing APIs page either by page number or by offset + page size
+PAGE_PARAMS = ("p", "page", "pageNumber", "pageNo")
+OFFSET_PARAMS = ("o", "offset", "start", "from", "skip")
+SIZE_PARAMS = ("rows", "size", "limit", "pageSize", "count", "per_page")
+
+def api_paging(api_url, page_size=None):
+    """How a captured listing-API URL pages: ('offset', param, page_size) or ('page', param, None).
 
-def normalize_product_dict(raw):
+    The page size comes from the URL's rows/size/limit parameter, else ``page_size`` (the
+    number of products in the captured response). Falls back to ('page', 'p', None).
+    """
+    query = parse_qs(urlparse(api_url).query, keep_blank_values=True)
+    for name in OFFSET_PARAMS:
+        if name in query:
+            size = next((int(query[s][0]) for s in SIZE_PARAMS if query.get(s, [""])[0].isdigit()), page_size)
+            if size:
+                return ("offset", name, size)
+    for name in PAGE_PARAMS:
+        if name in query:
+            return ("page", name, None)
+    return ("page", "p", None)
+
+def api_paged_url(api_url, pnum, page_size=None):
+    """The captured listing-API URL rewritten to fetch listing page ``pnum`` (1-based)"""
+    kind, name, size = api_paging(api_url, page_size)
+    if kind == "offset":
+        return set_query_param(api_url, name, (pnum - 1) * size)
+    return set_query_param(api_url, name, pnum)
+
+def breadcrumbs_for_url(url):
+    """Breadcrumb trail from a listing URL's Categories filter, e.g. '...?f=Categories%3ALipstick'"""
+    match = re.search(r'Categories:([^&:]+)', unquote(url))
+    category = match.group(1).replace('+', ' ').strip() if match else "Lipstick"
+    return f"Home / Personal Care / {category}"
+
+def normalize_product_dict(raw, breadcrumbs="Home / Personal Care / Lipstick"):
     get = lambda *keys: next((raw[k] for k in keys if k in raw and raw.get(k) not in (None, "")), None)
     name = get('productName','name','title','displayName','product_title') or ""
     brand = get('brand','brandName','productBrand') or ""
@@ -105,147 +185,332 @@ def normalize_product_dict(raw):
         "rating": str(rating).strip(),
         "product_url": product_url or "",
         "image_url": image or "",
-        "breadcrumbs": "Home / Personal Care / Lipstick",
+        "breadcrumbs": breadcrumbs,
         "description": (desc or "").strip(),
         "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
 
+# -------- DOM fallback --------
+# card/field selectors per site; each field selector may be a comma-separated list
+SITE_SELECTORS = {
+    "www.myntra.com": {
+        "card": [".product-base", ".product", ".product-card", ".product-grid",
+                 ".product-listing", ".productItem", ".product-item", ".grid-product", "li.product"],
+        "name": ".product-product, .product-title, .productName, .product-name",
+        "brand": ".product-brand, .productBrand",
+        "price": ".product-discountedPrice, .price, .product-price",
+        "link": "a",
+        "image": "img",
+        "max_cards": 200,
+    },
+}
+DEFAULT_SITE = "www.myntra.com"
+
+# runs in the browser: every field of every card comes back in a single round trip
+EXTRACT_CARDS_JS = """
+(sel) => {
+    const out = [];
+    for (const cardSel of sel.card) {
+        const cards = document.querySelectorAll(cardSel);
+        if (!cards.length) continue;
+        for (const el of cards) {
+            const text = (s) => { const n = el.querySelector(s); return n ? n.innerText.trim() : ""; };
+            const link = el.querySelector(sel.link);
+            const img = el.querySelector(sel.image);
+            out.push({
+                name: text(sel.name),
+                brand: text(sel.brand),
+                price: text(sel.price),
+                link: link ? (link.getAttribute("href") || "") : "",
+                image: img ? (img.getAttribute("src") || img.getAttribute("data-src") || "") : "",
+            });
+        }
+        if (out.length >= sel.max_cards) break;
+    }
+    return out;
+}
+"""
+
+def selectors_for_url(url):
+    return SITE_SELECTORS.get(urlparse(url).netloc, SITE_SELECTORS[DEFAULT_SITE])
+
+def card_to_record(card, breadcrumbs):
+    price_value = 0.0
+    if card.get("price"):
+        s = re.sub(r'[^\d.]', '', card["price"])
+        price_value = float(s) if s else 0.0
+    link = card.get("link") or ""
+    product_url = urljoin("https://www.myntra.com", link) if link.startswith("/") else link
+    return {
+        "product_name": card.get("name", ""),
+        "brand": card.get("brand", ""),
+        "price": price_value,
+        "rating": "",
+        "product_url": product_url,
+        "image_url": card.get("image") or "",
+        "breadcrumbs": breadcrumbs,
+        "description": "",
+        "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+# -------- request blocking / page weight --------
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+BLOCKED_URL_PATTERN = re.compile(
+    r"google-analytics|googletagmanager|doubleclick|facebook\.net|hotjar|clarity\.ms|/beacon|/analytics|"
+    r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|woff2?|ttf|otf|mp4|css)(?:\?|$)",
+    re.IGNORECASE,
+)
+
+def should_block(request):
+    return request.resource_type in BLOCKED_RESOURCE_TYPES or bool(BLOCKED_URL_PATTERN.search(request.url))
+
+class PageStats:
+    """Bytes transferred, requests made/blocked and load time per page"""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.pages = {}
+        self.current = None
+
+    def start(self, pnum):
+        self.current = {"bytes": 0, "requests": 0, "blocked": 0, "seconds": 0.0, "_t": time.perf_counter()}
+        self.pages[pnum] = self.current
+
+    def loaded(self):
+        """Stop the page's load clock; bytes still count until finish()"""
+        if self.current and "_t" in self.current:
+            self.current["seconds"] = time.perf_counter() - self.current.pop("_t")
+
+    def finish(self):
+        self.loaded()
+        self.current = None
+
+    def add_bytes(self, nbytes):
+        if self.current is not None:
+            self.current["bytes"] += nbytes
+            self.current["requests"] += 1
+
+    def add_blocked(self):
+        if self.current is not None:
+            self.current["blocked"] += 1
+
+    def on_request_finished(self, request):
+        try:
+            sizes = request.sizes()
+            self.add_bytes(sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0))
+        except Exception:
+            self.add_bytes(0)
+
+    def totals(self):
+        return {
+            "bytes": sum(p["bytes"] for p in self.pages.values()),
+            "seconds": sum(p["seconds"] for p in self.pages.values()),
+            "requests": sum(p["requests"] for p in self.pages.values()),
+            "blocked": sum(p["blocked"] for p in self.pages.values()),
+        }
+
+    def report(self):
+        print(f"[+] Page weight {self.label}".rstrip())
+        for pnum, p in sorted(self.pages.items()):
+            print(f"    page {pnum}: {p['bytes'] / 1024:8.1f} KiB  {p['seconds']:6.2f}s  {p['requests']} requests, {p['blocked']} blocked")
+        t = self.totals()
+        print(f"    total : {t['bytes'] / 1024:8.1f} KiB  {t['seconds']:6.2f}s  {t['requests']} requests, {t['blocked']} blocked")
+
+def install_request_blocking(context, page_stats=None):
+    """Abort non-essential requests for every page in the context"""
+    def handle(route):
+        if should_block(route.request):
+            if page_stats:
+                page_stats.add_blocked()
+            route.abort()
+        else:
+            route.continue_()
+    context.route("**/*", handle)
+
 # -------- scraper --------
-def scrape_myntra(base_url=BASE_URL, max_pages=MAX_PAGES):
+def scrape_myntra(base_url=BASE_URL, max_pages=MAX_PAGES, output=OUTPUT_CSV, checkpoint_path=CHECKPOINT_DB,
+                  lightweight=LIGHTWEIGHT_MODE, direct_api=DIRECT_API_MODE, page_stats=None):
     if not allowed_by_robots(base_url):
         print("[!] robots.txt disallows scraping this path or robots.txt couldn't be read. Exiting.")
         return []
 
+    breadcrumbs = breadcrumbs_for_url(base_url)
+    checkpoint = ScrapeCheckpoint(checkpoint_path)
+    sink = open_sink(output) if output else None
+    pages = [pnum for pnum in range(1, max_pages + 1) if not checkpoint.is_page_done(breadcrumbs, pnum)]
+    if not pages:
+        print(f"[+] All {max_pages} pages of {breadcrumbs} already scraped (checkpoint). Nothing to do.")
+        checkpoint.close()
+        return []
+
+    # products are normalized and deduped as responses arrive; JSON bodies are not kept
     collected = []
-    json_responses = []
+    pending = []
+    seen = set()
+    stats = {"responses": 0, "items": 0, "emitted": 0}
+    page_stats = page_stats or PageStats("(lightweight)" if lightweight else "(full)")
+    api_template = {}
+
+    def add_record(rec):
+        stats["items"] += 1
+        key = dedupe_key(rec)
+        if key and key not in seen:
+            seen.add(key)
+            collected.append(rec)
+            pending.append(rec)
+
+    def flush(pnum=None):
+        """Append this page's new/changed products to the sink, then checkpoint the page"""
+        fresh = checkpoint.new_or_changed(pending)
+        try:
+            if sink:
+                sink.write(fresh)
+        except Exception:
+            checkpoint.rollback()
+            raise
+        if pnum is None:
+            checkpoint.commit()
+        else:
+            checkpoint.complete_page(breadcrumbs, pnum)
+        stats["emitted"] += len(fresh)
+        pending.clear()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=HEADLESS)
+        # one context (cookies, cache, routes) reused for every page
         context = browser.new_context(user_agent=USER_AGENT, locale="en-US")
+        if lightweight:
+            install_request_blocking(context, page_stats)
+        context.on("requestfinished", page_stats.on_request_finished)
         page = context.new_page()
 
+        def process_body(body):
+            found = 0
+            for raw in iter_items_from_json(body):
+                try:
+                    rec = normalize_product_dict(raw, breadcrumbs)
+                except Exception:
+                    continue
+                if rec.get("product_name"):
+                    add_record(rec)
+                    found += 1
+            return found
+
         def on_response(response):
+            if not is_product_json_response(response):
+                return
             try:
-                url = response.url
-                ct = response.headers.get("content-type","")
-                if ("application/json" in ct) or any(x in url.lower() for x in ("search","products","gateway","catalog","listing","api")):
-                    try:
-                        body = response.json()
-                        if body:
-                            json_responses.append((url, body))
-                    except Exception:
-                        pass
+                body = response.json()
             except Exception:
-                pass
+                return
+            stats["responses"] += 1
+            found = process_body(body)
+            if found and not api_template:
+                # remember the listing API request so later pages can call it directly
+                api_template["url"] = response.url
+                api_template["headers"] = response.request.headers
+                api_template["page_size"] = found
 
         page.on("response", on_response)
 
+        page_stats.start(0)
         try:
             print(f"[+] Loading: {base_url}")
             page.goto(base_url, timeout=60000)
-            time.sleep(random.uniform(1.5, 3.0))
+            page.wait_for_load_state("networkidle", timeout=15000)
         except PWTimeoutError as e:
             print(f"[!] Timeout loading initial page: {e}")
+        page_stats.loaded()
+        # unlike time.sleep, this keeps dispatching response events while we wait
+        page.wait_for_timeout(random.uniform(1500, 3000))
+        page_stats.finish()
 
-        parsed = urlparse(base_url)
-        base_query = parsed.query
-        for pnum in range(1, max_pages + 1):
-            if "p=" in base_query:
-                new_q = re.sub(r'p=\d+', f'p={pnum}', base_query)
-                paged = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{new_q}"
-            else:
-                sep = '&' if base_query else '?'
-                paged = base_url + f"{sep}p={pnum}"
+        if direct_api and api_template and not allowed_by_robots(api_template["url"]):
+            print("[!] robots.txt disallows the listing API; using page navigation.")
+            api_template.clear()
 
-            try:
+        def fetch_page(pnum):
+            """Load one listing page; raises unless a listing response for it was processed"""
+            listings_before = stats["responses"]
+            timeout = None
+            if direct_api and api_template:
+                api_url = api_paged_url(api_template["url"], pnum, api_template["page_size"])
+                print(f"[+] Fetching listing API page {pnum}: {api_url}")
+                response = context.request.get(api_url, headers=api_template["headers"], timeout=60000)
+                page_stats.add_bytes(len(response.body()))
+                if not response.ok:
+                    raise ListingHTTPError(response.status, api_url)
+                stats["responses"] += 1
+                process_body(response.json())
+            else:
+                paged = paged_url(base_url, pnum)
                 print(f"[+] Visiting page {pnum}: {paged}")
-                page.goto(paged, timeout=60000)
-                time.sleep(random.uniform(1.5, 4.0))
-            except Exception as e:
-                print(f"[!] Navigation to {paged} failed: {e}")
-                time.sleep(min(10, 2 ** min(pnum,4)))
+                try:
+                    response = page.goto(paged, timeout=60000)
+                    if response is not None and not response.ok:
+                        raise ListingHTTPError(response.status, paged)
+                    page.wait_for_load_state("networkidle", timeout=15000)
+                except PWTimeoutError as e:
+                    timeout = e  # the listing XHR may still arrive during the pause below
+            page_stats.loaded()
+            # polite pause before the next request; late XHRs for this page are still handled during it
+            page.wait_for_timeout(random.uniform(1500, 4000))
+            if stats["responses"] == listings_before:
+                raise timeout or RuntimeError("no listing response")
 
-        print(f"[+] Processing {len(json_responses)} captured JSON responses...")
-        for url, body in json_responses:
-            try:
-                items = extract_items_from_json(body)
-                for raw in items:
-                    rec = normalize_product_dict(raw)
-                    if rec.get("product_name"):
-                        collected.append(rec)
-            except Exception:
-                continue
+        failures = 0  # consecutive, across pages: once the host struggles, every request after waits longer
+        for pnum in pages:
+            for attempt in range(1, MAX_RETRIES + 1):
+                page_stats.start(pnum)
+                try:
+                    fetch_page(pnum)
+                    error = None
+                except Exception as e:
+                    error = e
+                page_stats.finish()
+                if error is None:
+                    failures = 0
+                    break
+                failures += 1
+                print(f"[!] Page {pnum} failed (attempt {attempt}/{MAX_RETRIES}): {error}")
+                page.wait_for_timeout(backoff_ms(failures))
+                if not is_retryable(error):
+                    break
+            if error is None:
+                flush(pnum)
+            else:
+                # keep whatever did arrive, but leave the page pending for the next run
+                flush()
+                checkpoint.record_failure(breadcrumbs, pnum, error, attempts=attempt)
+
+        print(f"[+] Extracted {len(collected)} products from {stats['responses']} JSON responses.")
 
         if not collected or len(collected) < 10:
             print("[+] Falling back to DOM scraping of product cards.")
-            card_selectors = [
-                ".product-base", ".product", ".product-card", ".product-grid",
-                ".product-listing", ".productItem", ".product-item", ".grid-product", "li.product"
-            ]
-            seen_cards = 0
-            for sel in card_selectors:
+            selectors = selectors_for_url(base_url)
+            try:
+                cards = page.evaluate(EXTRACT_CARDS_JS, selectors)
+            except Exception as e:
+                print(f"[!] DOM extraction failed: {e}")
+                cards = []
+            print(f"[+] Extracted {len(cards)} product cards in one evaluate call")
+            for card in cards:
+                if not card.get("name"):
+                    continue
                 try:
-                    elems = page.query_selector_all(sel)
+                    add_record(card_to_record(card, breadcrumbs))
                 except Exception:
-                    elems = []
-                if not elems:
                     continue
-                print(f"[+] Found {len(elems)} elements for selector {sel}")
-                for el in elems:
-                    try:
-                        name_el = el.query_selector(".product-product, .product-title, .productName, .product-name")
-                        brand_el = el.query_selector(".product-brand, .productBrand")
-                        price_el = el.query_selector(".product-discountedPrice, .price, .product-price")
-                        link_el = el.query_selector("a")
-                        img_el = el.query_selector("img")
-
-                        name = name_el.inner_text().strip() if name_el else ""
-                        brand = brand_el.inner_text().strip() if brand_el else ""
-                        price_text = price_el.inner_text().strip() if price_el else ""
-                        link = link_el.get_attribute("href") if link_el else ""
-                        image = ""
-                        if img_el:
-                            image = img_el.get_attribute("src") or img_el.get_attribute("data-src") or ""
-
-                        price_value = 0.0
-                        if price_text:
-                            s = re.sub(r'[^\d.]', '', price_text)
-                            price_value = float(s) if s else 0.0
-
-                        product_url = urljoin("https://www.myntra.com", link) if link and link.startswith("/") else (link or "")
-                        collected.append({
-                            "product_name": name,
-                            "brand": brand,
-                            "price": price_value,
-                            "rating": "",
-                            "product_url": product_url,
-                            "image_url": image or "",
-                            "breadcrumbs": "Home / Personal Care / Lipstick",
-                            "description": "",
-                            "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                    except Exception:
-                        continue
-                seen_cards += len(elems)
-                if seen_cards >= 200:
-                    break
+            flush()
 
         browser.close()
+    for category, pnum, attempts, error in checkpoint.failed_pages(breadcrumbs):
+        print(f"[!] Still failing: {category} page {pnum} ({attempts} attempts, last error: {error}); re-run to retry")
+    checkpoint.close()
+    page_stats.report()
 
-    # dedupe
-    unique = []
-    seen = set()
-    for it in collected:
-        key = (it.get("product_url") or (it.get("product_name","") + "|" + it.get("brand",""))).strip()
-        if not key:
-            continue
-        if key in seen:
-            continue
-        seen.add(key)
-        unique.append(it)
-
-    print(f"[+] Collected {len(collected)} items; {len(unique)} unique after dedupe.")
-    return unique
+    print(f"[+] Collected {stats['items']} items; {len(collected)} unique after dedupe; {stats['emitted']} new or changed.")
+    return collected
 
 # -------- CSV export --------
 def save_to_csv(items, filename=OUTPUT_CSV):
@@ -264,6 +529,5 @@ def save_to_csv(items, filename=OUTPUT_CSV):
 # -------- main --------
 if __name__ == "__main__":
     print("[*] Starting scraper for:", BASE_URL)
-    items = scrape_myntra()
-    save_to_csv(items)
+    scrape_myntra()
     print("[*] Done.")
@@ -0,0 +1,235 @@
+"""
+HTTP chat API over the same chatbot, vector store and PostgreSQL pool used by main.py / app3.py.
+
+Each worker process builds one shared PersonalCareChatbot on startup. Blocking work runs on a
+pool of API_MAX_IN_FLIGHT threads with a per-request timeout; once API_MAX_IN_FLIGHT calls are
+running in a worker, new requests get 503 + Retry-After so a load balancer can send them elsewhere.
+A request that times out keeps its slot until its thread has actually finished.
+
+Run from the project root:
+    python -m src.api.server            # API_HOST:API_PORT with API_WORKERS processes
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+import config
+from src.utils.metrics import metrics, new_trace_id
+
+
+class ChatRequest(BaseModel):
+    message: str
+    user_id: str = "default_user"
+
+
+class Overloaded(Exception):
+    pass
+
+
+_END = object()
+
+
+def setup_state(app, chatbot, analytics=None):
+    """Per-worker state shared by every request: the chatbot, the in-flight slots and their threads"""
+    app.state.chatbot = chatbot
+    app.state.analytics = analytics
+    app.state.slots = asyncio.Semaphore(config.API_MAX_IN_FLIGHT)
+    # one thread per slot, so an admitted call never queues behind another
+    app.state.executor = ThreadPoolExecutor(max_workers=config.API_MAX_IN_FLIGHT, thread_name_prefix="chat-api")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from src.chatbot.groq_chatbot import PersonalCareChatbot
+    from src.database.analytics import ConversationAnalytics
+    from src.utils.catalog_watcher import start_catalog_watcher
+
+    chatbot = PersonalCareChatbot()
+    setup_state(app, chatbot, ConversationAnalytics(chatbot.db_manager))
+    if config.CATALOG_WATCH_ENABLED:
+        start_catalog_watcher(app.state.chatbot.vector_store, app.state.chatbot.catalog_index,
+                              on_change=app.state.chatbot.on_catalog_change)
+    print(f"✅ Chat API worker ready ({app.state.chatbot.vector_store.get_product_count()} products)")
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown(wait=False)
+        app.state.chatbot.db_manager.close()
+
+
+app = FastAPI(title="Personal Care Chatbot API", lifespan=lifespan)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc):
+    metrics.inc("api_rejected_total", path=request.url.path)
+    return JSONResponse({"detail": "Server busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+
+
+async def acquire_slot(request: Request):
+    slots = request.app.state.slots
+    if slots.locked():
+        raise Overloaded()
+    await slots.acquire()
+    return slots
+
+
+def submit_blocking(request: Request, slots, func, *args, **kwargs):
+    """Start func on the worker's threads; its slot is released when the thread finishes, not when the request gives up"""
+    loop = asyncio.get_running_loop()
+
+    def release(_):
+        # asyncio.Semaphore isn't thread-safe: release it on the event loop
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            pass  # event loop already closed (shutdown)
+
+    try:
+        future = request.app.state.executor.submit(func, *args, **kwargs)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(release)
+    return future
+
+
+async def run_blocking(request: Request, func, *args, **kwargs):
+    """Run a blocking call under the in-flight limit and request timeout"""
+    slots = await acquire_slot(request)
+    future = submit_blocking(request, slots, func, *args, **kwargs)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), config.API_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.inc("errors_total", component="api", stage="timeout")
+        raise HTTPException(status_code=504, detail="Request timed out")
+
+
+@app.post("/chat")
+async def chat(body: ChatRequest, request: Request):
+    trace_id = new_trace_id()
+    response = await run_blocking(request, request.app.state.chatbot.generate_response,
+                                  body.message, body.user_id, trace_id=trace_id)
+    return {"response": response, "trace_id": trace_id}
+
+
+@app.post("/chat/stream")
+async def chat_stream(body: ChatRequest, request: Request):
+    """Server-sent events: one ``data:`` event per chunk, then ``event: done`` (or ``event: error``)"""
+    slots = await acquire_slot(request)
+    trace_id = new_trace_id()
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    deadline = time.monotonic() + config.API_REQUEST_TIMEOUT
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+            return True
+        except RuntimeError:
+            return False  # event loop closed (shutdown)
+
+    def produce():
+        # runs on a worker thread for the whole answer, holding the slot; stops at the next chunk once
+        # the deadline passes or the client is gone, even if the response body was never started
+        chunks = request.app.state.chatbot.generate_response_stream(body.message, body.user_id, trace_id=trace_id)
+        try:
+            for chunk in chunks:
+                if not put(chunk) or stop.is_set() or time.monotonic() > deadline:
+                    break
+        except Exception as e:
+            print(f"❌ Error streaming response (trace {trace_id}): {e}")
+            put(e)
+        finally:
+            chunks.close()
+            put(_END)
+
+    submit_blocking(request, slots, produce)
+
+    async def events():
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.monotonic()))
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    metrics.inc("errors_total", component="api", stage="stream")
+                    yield f"event: error\ndata: {json.dumps({'detail': 'Stream failed', 'trace_id': trace_id})}\n\n"
+                    return
+                yield f"data: {json.dumps({'content': item})}\n\n"
+            yield f"event: done\ndata: {json.dumps({'trace_id': trace_id})}\n\n"
+        except asyncio.TimeoutError:
+            metrics.inc("errors_total", component="api", stage="timeout")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Request timed out', 'trace_id': trace_id})}\n\n"
+        finally:
+            stop.set()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"X-Trace-Id": trace_id})
+
+
+@app.get("/history/{user_id}")
+async def history(user_id: str, request: Request, limit: int = Query(10, ge=1, le=100), include_archive: bool = False):
+    rows = await run_blocking(request, request.app.state.chatbot.db_manager.get_conversation_history,
+                              user_id, limit, include_archive)
+    return {
+        "user_id": user_id,
+        "history": [
+            {"user_message": user_message, "bot_response": bot_response,
+             "created_at": created_at.isoformat() if hasattr(created_at, "isoformat") else created_at}
+            for user_message, bot_response, created_at in rows
+        ],
+    }
+
+
+@app.get("/search")
+async def search(request: Request, q: str, n: int = Query(5, ge=1, le=50)):
+    results = await run_blocking(request, request.app.state.chatbot.vector_store.search_products, q, n)
+    return {"query": q, "results": results}
+
+
+@app.get("/similar/{product_id}")
+async def similar(product_id: str, request: Request, n: int = Query(5, ge=1, le=50)):
+    results = await run_blocking(request, request.app.state.chatbot.vector_store.similar_products, product_id, n)
+    return {"product_id": product_id, "results": results}
+
+
+@app.get("/analytics")
+async def analytics(request: Request, hours: int = Query(24, ge=1, le=24 * 90)):
+    def report():
+        # reads only the hourly rollup; new conversations are folded in at most every ANALYTICS_REFRESH_INTERVAL
+        request.app.state.analytics.refresh_if_stale()
+        start, end = request.app.state.analytics.last_hours(hours)
+        return request.app.state.analytics.summary(start, end), request.app.state.analytics.hourly(start, end)
+
+    summary, hourly = await run_blocking(request, report)
+    return {**summary, "hourly": hourly}
+
+
+@app.get("/healthz")
+async def healthz(request: Request):
+    return {"status": "ok", "saturated": request.app.state.slots.locked()}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def main(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None):
+    import uvicorn
+    uvicorn.run("src.api.server:app", host=host or config.API_HOST, port=port or config.API_PORT,
+                workers=workers or config.API_WORKERS)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,31 @@ from langchain_groq import ChatGroq
 #from langchain.schema import HumanMessage, SystemMessage
 from src.vector_store.chroma_manager import ChromaDBManager
 from src.database.postgres_setup import PostgreSQLManager
+from src.utils.catalog_index import CatalogIndex
+from src.utils.metrics import metrics, new_trace_id
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import config
 
+ERROR_MESSAGE = "I apologize, but I'm experiencing technical difficulties. Please try again later."
+
 class PersonalCareChatbot:
-    def __init__(self):
+    def __init__(self, llm=None, vector_store=None, db_manager=None, catalog_index=None):
+        """Dependencies default to Groq, ChromaDB and PostgreSQL; pass your own to share
+        instances (API server) or substitute stubs (benchmarks)."""
         try:
-            self.llm = ChatGroq(
+            self.llm = llm or ChatGroq(
                 groq_api_key=config.GROQ_API_KEY,
                 model_name="llama-3.1-8b-instant"
             )
-            self.vector_store = ChromaDBManager()
-            self.db_manager = PostgreSQLManager()
+            self.vector_store = vector_store or ChromaDBManager()
+            self.db_manager = db_manager or PostgreSQLManager()
+            self.catalog_index = catalog_index if catalog_index is not None else CatalogIndex.load()
+            # product_ids last shown to each user, the anchor for "similar"/"alternatives" follow-ups
+            self.last_shown = OrderedDict()
+            self._shown_lock = threading.Lock()  # one chatbot serves many request threads
             print("✅ Chatbot initialized successfully!")
         except Exception as e:
             print(f"❌ Error initializing chatbot: {e}")
@@ -38,6 +52,13 @@ class PersonalCareChatbot:
             if keyword in user_message_lower:
                 return 'human_assistance', True
         
+        # Follow-ups about the products just shown
+        similar_keywords = ['similar', 'alternative', 'something like', 'like this', 'like that', 'instead of']
+        
+        for keyword in similar_keywords:
+            if keyword in user_message_lower:
+                return 'similar_products', False
+        
         # Product inquiry keywords
         product_keywords = [
             'product', 'item', 'benefit', 'use', 'how to', 'what is',
@@ -55,62 +76,195 @@ class PersonalCareChatbot:
         
         return 'general_inquiry', False
     
-    def generate_response(self, user_message, user_id="default_user"):
-        """Generate response based on user message"""
-        # Classify intent
-        intent, requires_human = self.classify_intent(user_message)
+    def generate_response(self, user_message, user_id="default_user", trace_id=None):
+        """Generate response based on user message.
+        
+        The chatbot is shared across requests, so callers that need the turn's trace id
+        pass their own ``trace_id`` (it is stored with the conversation) instead of reading it back.
+        """
+        trace_id = trace_id or new_trace_id()
+        with metrics.timer("chat_turn_latency_seconds"):
+            return self._generate_response(user_message, user_id, trace_id)
+    
+    def _generate_response(self, user_message, user_id, trace_id):
+        intent, requires_human = self._classify(user_message)
         
         # If human assistance required, provide contact information
         if requires_human:
-            response = f"""I understand you're asking about a topic that requires specialized assistance. 
-
-For inquiries about offers, returns, shipping, payments, or account issues, please contact our dedicated team:
-
-📞 Customer Service: {config.CUSTOMER_SERVICE_CONTACT}
-👨‍💼 Human Representative: {config.HUMAN_REPRESENTATIVE_CONTACT}
-
-They'll provide you with the most accurate and up-to-date information!"""
-            
-            # Store conversation
-            self.db_manager.store_conversation(
-                user_id, user_message, response, intent, 
-                requires_human=True, contact=config.CUSTOMER_SERVICE_CONTACT
-            )
-            
-            return response
-        
-        # For product inquiries, search vector store
-        product_results = []
-        if intent == 'product_inquiry':
-            product_results = self.vector_store.search_products(user_message, n_results=3)
+            return self._human_assistance_response(user_message, user_id, intent, trace_id)
         
         # Generate response using LLM
         try:
-            enhanced_prompt = self.create_enhanced_prompt(user_message, intent, product_results)
-            
-            messages = [
-                SystemMessage(content=enhanced_prompt),
-                HumanMessage(content=user_message)
-            ]
+            messages = self._build_messages(user_message, intent, user_id=user_id)
             
-            response = self.llm.invoke(messages)
+            with metrics.timer("chat_stage_latency_seconds", stage="llm_invoke"):
+                response = self.llm.invoke(messages)
             bot_response = response.content
             
-            # Store conversation
-            self.db_manager.store_conversation(
-                user_id, user_message, bot_response, intent,
-                requires_human=False, contact=None
-            )
-            
+            self._store(user_id, user_message, bot_response, intent, trace_id)
             return bot_response
             
         except Exception as e:
-            error_msg = "I apologize, but I'm experiencing technical difficulties. Please try again later."
+            return self._error_response(user_message, user_id, trace_id, e)
+    
+    def generate_response_stream(self, user_message, user_id="default_user", trace_id=None):
+        """Like generate_response, but yields the answer in chunks as the LLM produces them"""
+        trace_id = trace_id or new_trace_id()
+        start = time.perf_counter()
+        try:
+            intent, requires_human = self._classify(user_message)
+            if requires_human:
+                yield self._human_assistance_response(user_message, user_id, intent, trace_id)
+                return
+            
+            chunks = []
+            try:
+                messages = self._build_messages(user_message, intent, user_id=user_id)
+                with metrics.timer("chat_stage_latency_seconds", stage="llm_stream"):
+                    for chunk in self.llm.stream(messages):
+                        if chunk.content:
+                            chunks.append(chunk.content)
+                            yield chunk.content
+            except Exception as e:
+                yield self._error_response(user_message, user_id, trace_id, e)
+                return
+            self._store(user_id, user_message, "".join(chunks), intent, trace_id)
+        finally:
+            metrics.observe("chat_turn_latency_seconds", time.perf_counter() - start)
+    
+    def generate_responses_batch(self, questions, user_id="batch_user", max_workers=None, n_results=3):
+        """Answer many questions at once; returns one result dict per question, in order.
+        
+        Intents are classified up front, product inquiries are searched with one multi-query
+        vector search, LLM calls run on a bounded thread pool, and all turns are stored in bulk.
+        ``questions`` are strings or (user_id, question) pairs.
+        """
+        items = [(q if isinstance(q, (tuple, list)) else (user_id, q)) for q in questions]
+        results = []
+        for uid, question in items:
+            intent, requires_human = self._classify(question)
+            results.append({
+                "user_id": uid, "question": question, "intent": intent,
+                "requires_human": requires_human, "trace_id": new_trace_id(),
+            })
+        
+        product_turns = [r for r in results if r["intent"] == 'product_inquiry']
+        with metrics.timer("chat_stage_latency_seconds", stage="search_products_batch"):
+            searches = self.vector_store.search_products_batch([r["question"] for r in product_turns], n_results=n_results) if product_turns else []
+        product_results = {id(r): found for r, found in zip(product_turns, searches)}
+        
+        def answer(result):
+            start = time.perf_counter()
+            try:
+                messages = self._build_messages(result["question"], result["intent"],
+                                                product_results.get(id(result)), user_id=result["user_id"])
+                with metrics.timer("chat_stage_latency_seconds", stage="llm_invoke"):
+                    result["response"] = self.llm.invoke(messages).content
+            except Exception as e:
+                print(f"❌ Error generating response (trace {result['trace_id']}): {e}")
+                metrics.inc("errors_total", component="chatbot", stage="generate_response")
+                result["response"], result["intent"] = ERROR_MESSAGE, "error"
+            metrics.observe("chat_turn_latency_seconds", time.perf_counter() - start)
+        
+        for result in results:
+            if result["requires_human"]:
+                result["response"] = self.human_assistance_message()
+        with ThreadPoolExecutor(max_workers=max_workers or config.BATCH_LLM_CONCURRENCY) as pool:
+            list(pool.map(answer, [r for r in results if not r["requires_human"]]))
+        
+        rows = [
+            (r["user_id"], r["question"], r["response"], r["intent"], r["requires_human"],
+             config.CUSTOMER_SERVICE_CONTACT if r["requires_human"] else None, r["trace_id"])
+            for r in results
+        ]
+        with metrics.timer("chat_stage_latency_seconds", stage="store_conversations_bulk"):
+            if hasattr(self.db_manager, "store_conversations_bulk"):
+                self.db_manager.store_conversations_bulk(rows)
+            else:
+                for row in rows:
+                    self.db_manager.store_conversation(*row[:4], requires_human=row[4], contact=row[5], trace_id=row[6])
+        return results
+    
+    def _classify(self, user_message):
+        with metrics.timer("chat_stage_latency_seconds", stage="classify_intent"):
+            intent, requires_human = self.classify_intent(user_message)
+        metrics.inc("chat_requests_total", intent=intent)
+        return intent, requires_human
+    
+    def _build_messages(self, user_message, intent, product_results=None, user_id=None):
+        """Retrieve products (for product inquiries, unless already given) and build the LLM messages"""
+        if product_results is None:
+            product_results = []
+        if intent == 'similar_products' and not product_results:
+            with metrics.timer("chat_stage_latency_seconds", stage="similar_products"):
+                product_results = self.similar_to_last_shown(user_id)
+        if intent in ('product_inquiry', 'similar_products') and not product_results:
+            with metrics.timer("chat_stage_latency_seconds", stage="search_products"):
+                product_results = self.vector_store.search_products(user_message, n_results=3)
+        
+        if product_results and user_id:
+            self.remember_shown(user_id, product_results)
+        
+        with metrics.timer("chat_stage_latency_seconds", stage="create_enhanced_prompt"):
+            enhanced_prompt = self.create_enhanced_prompt(user_message, intent, product_results)
+        
+        return [
+            SystemMessage(content=enhanced_prompt),
+            HumanMessage(content=user_message)
+        ]
+    
+    def remember_shown(self, user_id, product_results, max_users=10000):
+        ids = [r['metadata'].get('product_id') for r in product_results if r['metadata'].get('product_id')]
+        if ids:
+            with self._shown_lock:
+                self.last_shown[user_id] = ids
+                self.last_shown.move_to_end(user_id)
+                while len(self.last_shown) > max_users:
+                    self.last_shown.popitem(last=False)
+    
+    def similar_to_last_shown(self, user_id, n_results=3):
+        """Neighbours of the top product last shown to this user, from the precomputed similarity graph"""
+        if not user_id:
+            return []
+        with self._shown_lock:
+            shown = self.last_shown.get(user_id)
+        if not shown:
+            return []
+        return self.vector_store.similar_products(shown[0], n_results=n_results)
+    
+    def _human_assistance_response(self, user_message, user_id, intent, trace_id):
+        response = self.human_assistance_message()
+        self._store(user_id, user_message, response, intent, trace_id,
+                    requires_human=True, contact=config.CUSTOMER_SERVICE_CONTACT)
+        return response
+    
+    @staticmethod
+    def human_assistance_message():
+        return f"""I understand you're asking about a topic that requires specialized assistance. 
+
+For inquiries about offers, returns, shipping, payments, or account issues, please contact our dedicated team:
+
+📞 Customer Service: {config.CUSTOMER_SERVICE_CONTACT}
+👨‍💼 Human Representative: {config.HUMAN_REPRESENTATIVE_CONTACT}
+
+They'll provide you with the most accurate and up-to-date information!"""
+    
+    def _error_response(self, user_message, user_id, trace_id, error):
+        print(f"❌ Error generating response (trace {trace_id}): {error}")
+        metrics.inc("errors_total", component="chatbot", stage="generate_response")
+        error_msg = ERROR_MESSAGE
+        self.db_manager.store_conversation(
+            user_id, user_message, error_msg, "error",
+            requires_human=False, contact=None, trace_id=trace_id
+        )
+        return error_msg
+    
+    def _store(self, user_id, user_message, bot_response, intent, trace_id, requires_human=False, contact=None):
+        with metrics.timer("chat_stage_latency_seconds", stage="store_conversation"):
             self.db_manager.store_conversation(
-                user_id, user_message, error_msg, "error",
-                requires_human=False, contact=None
+                user_id, user_message, bot_response, intent,
+                requires_human=requires_human, contact=contact, trace_id=trace_id
             )
-            return error_msg
     
     def create_enhanced_prompt(self, user_message, intent, product_results):
         """Create enhanced prompt based on intent and available products"""
@@ -129,7 +283,7 @@ They'll provide you with the most accurate and up-to-date information!"""
         User Question: {user_message}
         """
         
-        if intent == 'product_inquiry' and product_results:
+        if intent in ('product_inquiry', 'similar_products') and product_results:
             product_context = "Based on our product database, here are relevant products:\n"
             for result in product_results:
                 metadata = result['metadata']
@@ -137,7 +291,7 @@ They'll provide you with the most accurate and up-to-date information!"""
                 🛍️ Product: {metadata['product_name']}
                 🏷️ Brand: {metadata['brand']}
                 💰 Price: ${metadata['price']}
-                ⭐ Rating: {metadata['rating']}
+                ⭐ Rating: {metadata.get('rating', 'No rating')}
                 📁 Category: {metadata['breadcrumbs']}
                 ---
                 """
@@ -150,11 +304,36 @@ They'll provide you with the most accurate and up-to-date information!"""
             If the user asks for recommendations, suggest the most relevant products from the list above.
             """
         else:
+            catalog_overview = self.get_catalog_overview()
+            if catalog_overview:
+                base_prompt += f"""
+            Catalog Overview:
+            {catalog_overview}
+            """
             return base_prompt + """
             Please provide helpful information about personal care products in general.
             If you cannot find specific products in our database, be honest and offer general advice.
             """
     
-    def get_conversation_history(self, user_id="default_user", limit=10):
+    def on_catalog_change(self, catalog_index):
+        """Swap in a refreshed catalog index after a hot reload"""
+        self.catalog_index = catalog_index
+        self.vector_store.refresh_collection()
+    
+    def get_catalog_overview(self):
+        """Short catalog summary (price range, brands, categories) from the catalog index"""
+        if not self.catalog_index or not len(self.catalog_index):
+            return ""
+        stats = self.catalog_index.summary()
+        lines = [f"Total products: {stats['total_products']}"]
+        if stats['min_price'] is not None:
+            lines.append(f"Price range: ${stats['min_price']:.2f} - ${stats['max_price']:.2f} (average ${stats['avg_price']:.2f})")
+        if stats['avg_rating'] is not None:
+            lines.append(f"Average rating: {stats['avg_rating']:.1f}")
+        lines.append(f"Brands ({stats['brand_count']}): {', '.join(self.catalog_index.brands()[:20])}")
+        lines.append(f"Categories ({stats['category_count']}): {', '.join(self.catalog_index.categories())}")
+        return "\n            ".join(lines)
+    
+    def get_conversation_history(self, user_id="default_user", limit=10, include_archive=False):
         """Get conversation history for a user"""
-        return self.db_manager.get_conversation_history(user_id, limit)
+        return self.db_manager.get_conversation_history(user_id, limit, include_archive=include_archive)
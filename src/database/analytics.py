@@ -0,0 +1,223 @@
+"""
+Incremental conversation analytics for dashboards.
+
+user_conversations is folded into conversation_rollup_hourly (one row per hour x intent x
+requires_human_assistance) from a high-water mark on the conversation id, so reports read
+O(buckets) rows and never scan the OLTP table. Rows newer than ANALYTICS_REFRESH_LAG_SECONDS
+are left for the next refresh, so a turn that commits slightly out of id order isn't skipped.
+
+    python main.py analytics --hours 24        # refresh, then print the last day's report
+    python main.py analytics --refresh-only    # for cron
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import config
+from src.utils.metrics import metrics
+
+ROLLUP_TABLE = "conversation_rollup_hourly"
+WATERMARK_TABLE = "analytics_watermarks"
+WATERMARK_NAME = ROLLUP_TABLE
+
+
+class ConversationAnalytics:
+    """Hourly intent / handoff rollups over a PostgreSQLManager's conversation table"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self.setup_tables()
+
+    def setup_tables(self):
+        try:
+            with self.db_manager.cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                        bucket TIMESTAMP NOT NULL,
+                        intent VARCHAR(50) NOT NULL,
+                        requires_human_assistance BOOLEAN NOT NULL,
+                        conversations BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (bucket, intent, requires_human_assistance)
+                    );
+                """)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                        name VARCHAR(100) PRIMARY KEY,
+                        last_id BIGINT NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cursor.execute(f"""
+                    INSERT INTO {WATERMARK_TABLE} (name, last_id) VALUES (%s, 0)
+                    ON CONFLICT (name) DO NOTHING
+                """, (WATERMARK_NAME,))
+        except Exception as e:
+            print(f"❌ Error setting up analytics tables: {e}")
+
+    def refresh(self, batch_size: Optional[int] = None, lag_seconds: Optional[int] = None) -> int:
+        """Fold conversations above the high-water mark into the rollup; returns rows folded in.
+
+        Each batch of ids is aggregated, upserted and the watermark advanced in one transaction,
+        with the watermark row locked so concurrent refreshers can't count a row twice.
+        """
+        batch_size = batch_size or config.ANALYTICS_REFRESH_BATCH
+        lag_seconds = config.ANALYTICS_REFRESH_LAG_SECONDS if lag_seconds is None else lag_seconds
+        total = 0
+        try:
+            with metrics.timer("analytics_refresh_seconds"):
+                while True:
+                    with self.db_manager.cursor() as cursor:
+                        cursor.execute(f"SELECT last_id FROM {WATERMARK_TABLE} WHERE name = %s FOR UPDATE",
+                                       (WATERMARK_NAME,))
+                        last_id = cursor.fetchone()[0]
+                        cursor.execute("""
+                            SELECT MAX(id), COUNT(*) FROM (
+                                SELECT id FROM user_conversations
+                                WHERE id > %s AND created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                                ORDER BY id
+                                LIMIT %s
+                            ) AS pending
+                        """, (last_id, lag_seconds, batch_size))
+                        upper, pending = cursor.fetchone()
+                        if upper is None:
+                            break
+                        cursor.execute(f"""
+                            WITH batch AS (
+                                SELECT date_trunc('hour', created_at) AS bucket, COALESCE(intent, 'unknown') AS intent,
+                                       COALESCE(requires_human_assistance, FALSE) AS requires_human_assistance,
+                                       COUNT(*) AS conversations
+                                FROM user_conversations
+                                WHERE id > %s AND id <= %s
+                                GROUP BY 1, 2, 3
+                            ), upserted AS (
+                                INSERT INTO {ROLLUP_TABLE} AS r (bucket, intent, requires_human_assistance, conversations)
+                                SELECT bucket, intent, requires_human_assistance, conversations FROM batch
+                                ON CONFLICT (bucket, intent, requires_human_assistance)
+                                DO UPDATE SET conversations = r.conversations + EXCLUDED.conversations
+                            )
+                            SELECT COALESCE(SUM(conversations), 0) FROM batch
+                        """, (last_id, upper))
+                        folded = int(cursor.fetchone()[0])
+                        cursor.execute(f"""
+                            UPDATE {WATERMARK_TABLE} SET last_id = %s, updated_at = CURRENT_TIMESTAMP
+                            WHERE name = %s
+                        """, (upper, WATERMARK_NAME))
+                    total += folded
+                    if pending < batch_size:
+                        break
+            self._last_refresh = time.time()
+            metrics.inc("analytics_rows_rolled_up_total", total)
+            return total
+        except Exception as e:
+            print(f"❌ Error refreshing conversation analytics: {e}")
+            metrics.inc("errors_total", component="analytics", stage="refresh")
+            return total
+
+    def refresh_if_stale(self, max_age: Optional[int] = None):
+        """Refresh when the last refresh in this process is older than max_age seconds"""
+        max_age = config.ANALYTICS_REFRESH_INTERVAL if max_age is None else max_age
+        if time.time() - self._last_refresh < max_age:
+            return 0
+        # one refresher per process; other readers use the current rollup
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def hourly(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+        """Per hour in [start, end): total turns, handoffs, handoff rate and turns by intent"""
+        hours: Dict[datetime, Dict] = {}
+        for bucket, intent, requires_human, conversations in self._rollup_rows(start, end):
+            hour = hours.setdefault(bucket, {"hour": bucket, "conversations": 0, "handoffs": 0, "intents": {}})
+            hour["conversations"] += conversations
+            hour["intents"][intent] = hour["intents"].get(intent, 0) + conversations
+            if requires_human:
+                hour["handoffs"] += conversations
+        for hour in hours.values():
+            hour["handoff_rate"] = hour["handoffs"] / hour["conversations"] if hour["conversations"] else 0.0
+        return [hours[bucket] for bucket in sorted(hours)]
+
+    def summary(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+        """Totals over [start, end): volume, handoff rate and intent mix (share of turns per intent)"""
+        hours = self.hourly(start, end)
+        conversations = sum(h["conversations"] for h in hours)
+        handoffs = sum(h["handoffs"] for h in hours)
+        intents: Dict[str, int] = {}
+        for hour in hours:
+            for intent, count in hour["intents"].items():
+                intents[intent] = intents.get(intent, 0) + count
+        return {
+            "start": start,
+            "end": end,
+            "hours": len(hours),
+            "conversations": conversations,
+            "handoffs": handoffs,
+            "handoff_rate": handoffs / conversations if conversations else 0.0,
+            "intent_mix": {intent: count / conversations
+                           for intent, count in sorted(intents.items(), key=lambda item: -item[1])},
+            "peak_hour": max(hours, key=lambda h: h["conversations"])["hour"] if hours else None,
+        }
+
+    def db_now(self) -> Optional[datetime]:
+        """Current time on the database clock: created_at and the hourly buckets are DB-local TIMESTAMPs"""
+        try:
+            with self.db_manager.cursor() as cursor:
+                cursor.execute("SELECT LOCALTIMESTAMP")
+                return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"❌ Error reading database time: {e}")
+            metrics.inc("errors_total", component="analytics", stage="db_now")
+            return None
+
+    def last_hours(self, hours: int):
+        """(start, end) of the last ``hours`` hours, measured on the database clock"""
+        return last_hours(hours, self.db_now())
+
+    def _rollup_rows(self, start, end):
+        try:
+            with self.db_manager.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT bucket, intent, requires_human_assistance, conversations
+                    FROM {ROLLUP_TABLE}
+                    WHERE (%s IS NULL OR bucket >= %s) AND (%s IS NULL OR bucket < %s)
+                    ORDER BY bucket
+                """, (start, start, end, end))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"❌ Error reading conversation analytics: {e}")
+            metrics.inc("errors_total", component="analytics", stage="query")
+            return []
+
+
+def last_hours(hours: int, now: Optional[datetime] = None):
+    """(start, end) covering the current hour and the ``hours - 1`` before it.
+
+    ``now`` should come from the database (ConversationAnalytics.db_now); the app host's clock
+    or time zone may differ from the one the buckets were truncated in.
+    """
+    now = now or datetime.now()
+    end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return end - timedelta(hours=hours), end
+
+
+def print_report(analytics: ConversationAnalytics, hours: int = 24):
+    start, end = analytics.last_hours(hours)
+    summary = analytics.summary(start, end)
+    print(f"\n📊 Conversations {start:%Y-%m-%d %H:%M} – {end:%Y-%m-%d %H:%M}")
+    print(f"   Total: {summary['conversations']}   Handoffs: {summary['handoffs']} "
+          f"({summary['handoff_rate']:.1%})")
+    if summary["peak_hour"] is not None:
+        print(f"   Peak hour: {summary['peak_hour']:%Y-%m-%d %H:00}")
+    print("   Intent mix:")
+    for intent, share in summary["intent_mix"].items():
+        print(f"     {intent:<20} {share:6.1%}")
+    print("   Per hour:")
+    for hour in analytics.hourly(start, end):
+        print(f"     {hour['hour']:%m-%d %H:00}  {hour['conversations']:>6}  handoff {hour['handoff_rate']:6.1%}")
+    return summary
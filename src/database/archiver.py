@@ -0,0 +1,245 @@
+"""
+Conversation retention: move old turns out of user_conversations into compressed Parquet.
+
+Turns older than ARCHIVE_AFTER_DAYS are moved in batches of ARCHIVE_BATCH_SIZE. For each batch
+the rows are locked, written to ARCHIVE_DIR/month=YYYY-MM/part-<first id>-<last id>.parquet
+(zstd, sorted by user_id so row-group statistics skip other users on read), and deleted in the
+same transaction. If the delete or commit fails the files are removed again, and readers drop duplicate ids.
+Each user's archived months are listed in ARCHIVE_DIR/_users/, so history reads open only those months.
+Rows not yet folded into the analytics rollup are kept; the archiver refreshes the rollup first.
+
+    python main.py archive --older-than-days 90
+"""
+
+import glob
+import hashlib
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+from src.utils.metrics import metrics
+
+COLUMNS = ("id", "user_id", "user_message", "bot_response", "intent", "requires_human_assistance",
+           "contact_provided", "created_at", "trace_id")
+ROW_GROUP_SIZE = 1000
+USER_INDEX_DIR = "_users"
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()), ("user_id", pa.string()), ("user_message", pa.string()),
+        ("bot_response", pa.string()), ("intent", pa.string()), ("requires_human_assistance", pa.bool_()),
+        ("contact_provided", pa.string()), ("created_at", pa.timestamp("us")), ("trace_id", pa.string()),
+    ])
+
+
+class ConversationArchive:
+    """Month-partitioned Parquet files of archived conversation rows"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or config.ARCHIVE_DIR
+
+    def write(self, rows: List[tuple], index_users: bool = True) -> List[str]:
+        """Write rows (in COLUMNS order) into one file per month; returns the paths written.
+
+        With ``index_users=False`` the caller runs ``index_user_months`` itself, once the rows are
+        known to stay (the archiver does so after its DELETE commits).
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        by_month: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_month.setdefault(row[7].strftime("%Y-%m"), []).append(row)
+
+        paths = []
+        try:
+            for month, month_rows in sorted(by_month.items()):
+                month_rows.sort(key=lambda r: (r[1], r[7], r[0]))
+                ids = [r[0] for r in month_rows]
+                directory = os.path.join(self.root, f"month={month}")
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"part-{min(ids):012d}-{max(ids):012d}.parquet")
+                table = pa.Table.from_pydict({name: [r[i] for r in month_rows] for i, name in enumerate(COLUMNS)},
+                                             schema=_schema())
+                tmp_path = f"{path}.tmp"
+                pq.write_table(table, tmp_path, compression=config.ARCHIVE_COMPRESSION, row_group_size=ROW_GROUP_SIZE)
+                os.replace(tmp_path, path)
+                paths.append(path)
+            if index_users:
+                self.index_user_months(rows)
+        except Exception:
+            self.remove(paths)
+            raise
+        return paths
+
+    @staticmethod
+    def remove(paths: List[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _user_index_path(self, user_id: str) -> str:
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, USER_INDEX_DIR, digest[:2], f"{digest}.months")
+
+    def user_months(self, user_id: str) -> List[str]:
+        """Months holding archived turns for user_id, newest first"""
+        try:
+            with open(self._user_index_path(user_id), encoding="utf-8") as f:
+                return sorted({line.strip() for line in f if line.strip()}, reverse=True)
+        except FileNotFoundError:
+            return []
+
+    def index_user_months(self, rows: List[tuple]):
+        """Append each user's new months to their index file (a duplicate line from a concurrent writer is harmless)"""
+        by_user: Dict[str, set] = {}
+        for row in rows:
+            by_user.setdefault(row[1], set()).add(row[7].strftime("%Y-%m"))
+        for user_id, months in by_user.items():
+            new = months.difference(self.user_months(user_id))
+            if not new:
+                continue
+            path = self._user_index_path(user_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{month}\n" for month in sorted(new)))
+
+    def months(self) -> List[str]:
+        """Archived months, newest first"""
+        return sorted((os.path.basename(d).split("=", 1)[1] for d in glob.glob(os.path.join(self.root, "month=*"))),
+                      reverse=True)
+
+    def get_conversation_history(self, user_id: str, limit: int = 10, before: Optional[datetime] = None):
+        """Newest archived (user_message, bot_response, created_at) for a user, like the hot table query"""
+        import pyarrow.parquet as pq
+
+        found: Dict[int, tuple] = {}
+        # only months this user has turns in, so a short history doesn't open every month
+        for month in self.user_months(user_id):
+            if before is not None and month > before.strftime("%Y-%m"):
+                continue
+            filters = [("user_id", "=", user_id)]
+            if before is not None:
+                filters.append(("created_at", "<", before))
+            for path in sorted(glob.glob(os.path.join(self.root, f"month={month}", "*.parquet"))):
+                table = pq.read_table(path, columns=["id", "user_message", "bot_response", "created_at"],
+                                      filters=filters)
+                for row in table.to_pylist():
+                    found[row["id"]] = (row["user_message"], row["bot_response"], row["created_at"])
+            # months are disjoint, so once a month fills the limit older ones can't rank higher
+            if len(found) >= limit:
+                break
+        return sorted(found.values(), key=lambda r: r[2], reverse=True)[:limit]
+
+
+class ConversationArchiver:
+    """Moves old turns from PostgreSQL into a ConversationArchive"""
+
+    def __init__(self, db_manager, archive: Optional[ConversationArchive] = None):
+        self.db_manager = db_manager
+        self.archive = archive or ConversationArchive()
+
+    def _rollup_watermark(self, cursor):
+        """Last id folded into the analytics rollup (see analytics.py), or None if analytics isn't set up"""
+        cursor.execute("SELECT to_regclass('analytics_watermarks') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return None
+        from src.database.analytics import WATERMARK_NAME
+        cursor.execute("SELECT last_id FROM analytics_watermarks WHERE name = %s", (WATERMARK_NAME,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _refresh_rollup(self):
+        """Fold pending turns into the analytics rollup, since rows above its watermark are never archived"""
+        with self.db_manager.cursor() as cursor:
+            if self._rollup_watermark(cursor) is None:
+                return
+        from src.database.analytics import ConversationAnalytics
+        folded = ConversationAnalytics(self.db_manager).refresh()
+        if folded:
+            print(f"📊 Rolled up {folded} conversations into analytics before archiving")
+
+    def _cutoff(self, older_than_days: int) -> datetime:
+        """older_than_days before now on the database clock, which created_at is written with"""
+        with self.db_manager.cursor() as cursor:
+            cursor.execute("SELECT LOCALTIMESTAMP - make_interval(days => %s)", (older_than_days,))
+            return cursor.fetchone()[0]
+
+    def _held_back(self, cutoff: datetime) -> int:
+        """Turns older than cutoff that the analytics watermark still keeps in the table"""
+        with self.db_manager.cursor() as cursor:
+            watermark = self._rollup_watermark(cursor)
+            if watermark is None:
+                return 0
+            cursor.execute("SELECT COUNT(*) FROM user_conversations WHERE created_at < %s AND id > %s",
+                           (cutoff, watermark))
+            return cursor.fetchone()[0]
+
+    def archive_batch(self, cutoff: datetime, batch_size: int) -> int:
+        """Archive and delete up to batch_size turns created before cutoff; returns rows moved"""
+        paths = []
+        try:
+            with self.db_manager.cursor() as cursor:
+                # rows not yet counted by the analytics rollup stay until they are
+                watermark = self._rollup_watermark(cursor)
+                cursor.execute(f"""
+                    SELECT {", ".join(COLUMNS)} FROM user_conversations
+                    WHERE created_at < %s AND (%s IS NULL OR id <= %s)
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                """, (cutoff, watermark, watermark, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    return 0
+                paths = self.archive.write(rows, index_users=False)
+                cursor.execute("DELETE FROM user_conversations WHERE id = ANY(%s)", ([r[0] for r in rows],))
+        except Exception:
+            # the files stay only if the delete committed
+            self.archive.remove(paths)
+            raise
+        # indexed only now, so a rolled-back batch leaves no months pointing at removed files
+        self.archive.index_user_months(rows)
+        return len(rows)
+
+    def run(self, older_than_days: Optional[int] = None, batch_size: Optional[int] = None,
+            max_batches: Optional[int] = None) -> int:
+        """Archive every turn older than older_than_days, one bounded transaction per batch"""
+        older_than_days = config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+        total = batches = 0
+        try:
+            self._refresh_rollup()
+            cutoff = self._cutoff(older_than_days)
+        except Exception as e:
+            print(f"❌ Error preparing conversation archive: {e}")
+            metrics.inc("errors_total", component="archiver", stage="prepare")
+            return total
+        while max_batches is None or batches < max_batches:
+            try:
+                with metrics.timer("archive_batch_seconds"):
+                    moved = self.archive_batch(cutoff, batch_size)
+            except Exception as e:
+                print(f"❌ Error archiving conversations: {e}")
+                metrics.inc("errors_total", component="archiver", stage="archive_batch")
+                break
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            metrics.inc("conversations_archived_total", moved)
+            print(f"📦 Archived {total} conversations so far...")
+        print(f"✅ Archived {total} conversations older than {cutoff:%Y-%m-%d} to {self.archive.root}")
+        try:
+            held = self._held_back(cutoff)
+        except Exception:
+            held = 0
+        if held:
+            print(f"⚠️  {held} older conversations are not in the analytics rollup yet and were kept; "
+                  f"run `python main.py analytics --refresh-only`, then archive again")
+        return total
@@ -1,73 +1,133 @@
+import threading
+from contextlib import contextmanager
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import config
+from src.database.archiver import ConversationArchive
+from src.utils.metrics import metrics
 
 class PostgreSQLManager:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, max_connections=None):
+        self.pool = None
+        self.max_connections = max_connections or config.DB_POOL_MAX_CONNECTIONS
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self.archive = ConversationArchive()
         self.connect()
         self.setup_tables()
     
     def connect(self):
         try:
-            self.connection = psycopg2.connect(**config.DB_CONFIG)
+            self.pool = ThreadedConnectionPool(1, self.max_connections, **config.DB_CONFIG)
             print("✅ Connected to PostgreSQL database successfully!")
         except Exception as e:
             print(f"❌ Error connecting to database: {e}")
     
+    @contextmanager
+    def cursor(self):
+        """Cursor on a pooled connection; commits on success, rolls back on error"""
+        with self._slots:
+            connection = self.pool.getconn()
+            try:
+                cursor = connection.cursor()
+                try:
+                    yield cursor
+                    connection.commit()
+                finally:
+                    cursor.close()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                self.pool.putconn(connection)
+    
     def setup_tables(self):
         """Create only conversation table"""
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_conversations (
-                    id SERIAL PRIMARY KEY,
-                    user_id VARCHAR(100) NOT NULL,
-                    user_message TEXT NOT NULL,
-                    bot_response TEXT NOT NULL,
-                    intent VARCHAR(50),
-                    requires_human_assistance BOOLEAN DEFAULT FALSE,
-                    contact_provided VARCHAR(20),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            
-            self.connection.commit()
-            cursor.close()
+            with self.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS user_conversations (
+                        id SERIAL PRIMARY KEY,
+                        user_id VARCHAR(100) NOT NULL,
+                        user_message TEXT NOT NULL,
+                        bot_response TEXT NOT NULL,
+                        intent VARCHAR(50),
+                        requires_human_assistance BOOLEAN DEFAULT FALSE,
+                        contact_provided VARCHAR(20),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        trace_id VARCHAR(32)
+                    );
+                """)
+                cursor.execute("ALTER TABLE user_conversations ADD COLUMN IF NOT EXISTS trace_id VARCHAR(32);")
             print("✅ Conversation table created successfully!")
         except Exception as e:
             print(f"❌ Error setting up tables: {e}")
     
-    def store_conversation(self, user_id, user_message, bot_response, intent=None, requires_human=False, contact=None):
+    def store_conversation(self, user_id, user_message, bot_response, intent=None, requires_human=False, contact=None, trace_id=None):
         """Store user-AI conversation only"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                INSERT INTO user_conversations 
-                (user_id, user_message, bot_response, intent, requires_human_assistance, contact_provided)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (user_id, user_message, bot_response, intent, requires_human, contact))
-            self.connection.commit()
-            cursor.close()
+            with self.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO user_conversations 
+                    (user_id, user_message, bot_response, intent, requires_human_assistance, contact_provided, trace_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (user_id, user_message, bot_response, intent, requires_human, contact, trace_id))
             return True
         except Exception as e:
             print(f"❌ Error storing conversation: {e}")
+            metrics.inc("errors_total", component="database", stage="store_conversation")
             return False
     
-    def get_conversation_history(self, user_id="default_user", limit=10):
-        """Get conversation history for a user"""
+    def store_conversations_bulk(self, rows, page_size=500):
+        """Store many conversations in one transaction.
+        
+        ``rows`` are (user_id, user_message, bot_response, intent, requires_human, contact, trace_id) tuples.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                SELECT user_message, bot_response, created_at 
-                FROM user_conversations 
-                WHERE user_id = %s 
-                ORDER BY created_at DESC 
-                LIMIT %s
-            """, (user_id, limit))
-            results = cursor.fetchall()
-            cursor.close()
-            return results
+            with self.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO user_conversations
+                    (user_id, user_message, bot_response, intent, requires_human_assistance, contact_provided, trace_id)
+                    VALUES %s
+                """, rows, page_size=page_size)
+            return len(rows)
+        except Exception as e:
+            print(f"❌ Error storing conversations: {e}")
+            metrics.inc("errors_total", component="database", stage="store_conversations_bulk")
+            return 0
+    
+    def get_conversation_history(self, user_id="default_user", limit=10, include_archive=False):
+        """Get conversation history for a user.
+        
+        With ``include_archive``, turns the hot table can't supply are read from the Parquet archive.
+        """
+        try:
+            with self.cursor() as cursor:
+                cursor.execute("""
+                    SELECT user_message, bot_response, created_at 
+                    FROM user_conversations 
+                    WHERE user_id = %s 
+                    ORDER BY created_at DESC 
+                    LIMIT %s
+                """, (user_id, limit))
+                rows = cursor.fetchall()
         except Exception as e:
             print(f"❌ Error fetching conversation history: {e}")
+            metrics.inc("errors_total", component="database", stage="get_conversation_history")
             return []
+        if include_archive and len(rows) < limit:
+            try:
+                before = rows[-1][2] if rows else None
+                rows = list(rows) + self.archive.get_conversation_history(user_id, limit - len(rows), before)
+            except Exception as e:
+                print(f"❌ Error reading archived conversation history: {e}")
+                metrics.inc("errors_total", component="database", stage="get_archived_history")
+        return rows
+    
+    def close(self):
+        if self.pool:
+            self.pool.closeall()
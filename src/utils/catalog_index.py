@@ -0,0 +1,242 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional
+import config
+from src.utils.product_record import ProductRecord
+
+
+class _SortedColumn:
+    """Parallel sorted value/key arrays supporting O(log n) range lookups"""
+
+    def __init__(self, values=None, keys=None):
+        self.values = list(values or [])
+        self.keys = list(keys or [])
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Column over (value, key) pairs, sorted once"""
+        pairs = sorted(pairs, key=lambda pair: pair[0])
+        return cls([value for value, _ in pairs], [key for _, key in pairs])
+
+    def copy(self):
+        return _SortedColumn(self.values, self.keys)
+
+    def insert(self, value, key):
+        i = bisect_right(self.values, value)
+        self.values.insert(i, value)
+        self.keys.insert(i, key)
+
+    def insert_many(self, pairs):
+        """Insert (value, key) pairs; large batches are merged in one sort instead of one list.insert each"""
+        pairs = list(pairs)
+        if len(pairs) <= 32:
+            for value, key in pairs:
+                self.insert(value, key)
+            return
+        # the existing column is one sorted run, so this sort is close to a linear merge
+        merged = _SortedColumn.from_pairs(list(zip(self.values, self.keys)) + pairs)
+        self.values, self.keys = merged.values, merged.keys
+
+    def remove(self, value, key):
+        lo = bisect_left(self.values, value)
+        hi = bisect_right(self.values, value)
+        for i in range(lo, hi):
+            if self.keys[i] == key:
+                del self.values[i]
+                del self.keys[i]
+                return
+
+    def range(self, low=None, high=None):
+        lo = 0 if low is None else bisect_left(self.values, low)
+        hi = len(self.values) if high is None else bisect_right(self.values, high)
+        return self.keys[lo:hi]
+
+    def min(self):
+        return self.values[0] if self.values else None
+
+    def max(self):
+        return self.values[-1] if self.values else None
+
+
+class CatalogIndex:
+    """In-memory secondary indexes and summary statistics over the product catalog.
+
+    Built once during ingestion, persisted to ``config.CATALOG_INDEX_PATH`` and
+    updated incrementally with ``add_products`` / ``remove_product``.
+    """
+
+    def __init__(self):
+        self.products: Dict[str, ProductRecord] = {}
+        self.by_brand = defaultdict(set)
+        self.by_category = defaultdict(set)
+        self.display_names = {}
+        self.prices = _SortedColumn()
+        self.ratings = _SortedColumn()
+        self._price_total = 0.0
+        self._rating_total = 0.0
+        self._with_brand = 0
+
+    @classmethod
+    def from_products(cls, products: List[ProductRecord]):
+        index = cls()
+        index.add_products(products)
+        return index
+
+    def copy(self):
+        """Independent index over the same records (records themselves are shared)"""
+        index = CatalogIndex()
+        index.products = dict(self.products)
+        index.by_brand = defaultdict(set, {name: set(keys) for name, keys in self.by_brand.items()})
+        index.by_category = defaultdict(set, {name: set(keys) for name, keys in self.by_category.items()})
+        index.display_names = dict(self.display_names)
+        index.prices = self.prices.copy()
+        index.ratings = self.ratings.copy()
+        index._price_total = self._price_total
+        index._rating_total = self._rating_total
+        index._with_brand = self._with_brand
+        return index
+
+    def __len__(self):
+        return len(self.products)
+
+    # ---- updates ----
+    def add_products(self, products: List[ProductRecord]):
+        """Insert or replace products in the index"""
+        # sorted-column entries are collected per key (a repeated key keeps its last record) and inserted together
+        prices, ratings = {}, {}
+        for product in products:
+            if not product.product_name:
+                continue
+            key = product.product_id
+            if key in self.products:
+                self.remove_product(key)
+            self._insert(key, product)
+            prices.pop(key, None)
+            ratings.pop(key, None)
+            if product.price > 0:
+                prices[key] = product.price
+            if product.rating is not None:
+                ratings[key] = product.rating
+        self.prices.insert_many((value, key) for key, value in prices.items())
+        self.ratings.insert_many((value, key) for key, value in ratings.items())
+
+    def _insert(self, key, product):
+        """Add ``product`` to the hash indexes and totals; the caller inserts into the sorted columns"""
+        self.products[key] = product
+        brand = product.brand
+        category = product.category
+        self.by_brand[brand.lower()].add(key)
+        self.by_category[category.lower()].add(key)
+        self.display_names.setdefault(brand.lower(), brand)
+        self.display_names.setdefault(category.lower(), category)
+        if brand != "Unknown Brand":
+            self._with_brand += 1
+
+        if product.price > 0:
+            self._price_total += product.price
+
+        if product.rating is not None:
+            self._rating_total += product.rating
+
+    def remove_product(self, key):
+        """Remove a product by key; returns True if it was present"""
+        product = self.products.pop(key, None)
+        if product is None:
+            return False
+
+        self._discard(self.by_brand, product.brand.lower(), key)
+        self._discard(self.by_category, product.category.lower(), key)
+        if product.brand != "Unknown Brand":
+            self._with_brand -= 1
+
+        if product.price > 0:
+            self.prices.remove(product.price, key)
+            self._price_total -= product.price
+
+        if product.rating is not None:
+            self.ratings.remove(product.rating, key)
+            self._rating_total -= product.rating
+        return True
+
+    @staticmethod
+    def _discard(mapping, name, key):
+        keys = mapping.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del mapping[name]
+
+    # ---- queries ----
+    def brands(self):
+        return sorted(self.display_names.get(name, name) for name in self.by_brand)
+
+    def categories(self):
+        return sorted(self.display_names.get(name, name) for name in self.by_category)
+
+    def products_by_brand(self, brand):
+        return [self.products[k] for k in self.by_brand.get(brand.lower(), ())]
+
+    def products_by_category(self, category):
+        return [self.products[k] for k in self.by_category.get(category.lower(), ())]
+
+    def products_in_price_range(self, min_price=None, max_price=None):
+        return [self.products[k] for k in self.prices.range(min_price, max_price)]
+
+    def products_with_rating(self, min_rating=None, max_rating=None):
+        return [self.products[k] for k in self.ratings.range(min_rating, max_rating)]
+
+    def summary(self):
+        """Summary statistics, maintained incrementally"""
+        total = len(self.products)
+        priced = len(self.prices.values)
+        rated = len(self.ratings.values)
+        return {
+            'total_products': total,
+            'products_with_brand': self._with_brand,
+            'products_with_price': priced,
+            'products_with_rating': rated,
+            'brand_count': len(self.by_brand),
+            'category_count': len(self.by_category),
+            'min_price': self.prices.min(),
+            'max_price': self.prices.max(),
+            'avg_price': self._price_total / priced if priced else None,
+            'avg_rating': self._rating_total / rated if rated else None,
+        }
+
+    # ---- persistence ----
+    def save(self, path: Optional[str] = None):
+        """Persist the records and the already-sorted price / rating columns"""
+        path = path or config.CATALOG_INDEX_PATH
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'products': [product.to_dict() for product in self.products.values()],
+                'prices': {'values': self.prices.values, 'keys': self.prices.keys},
+                'ratings': {'values': self.ratings.values, 'keys': self.ratings.keys},
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None):
+        """Load a persisted index, or None if it doesn't exist or can't be read"""
+        path = path or config.CATALOG_INDEX_PATH
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                # older files hold only the records
+                return cls.from_products([ProductRecord.from_dict(d) for d in data])
+            index = cls()
+            for d in data['products']:
+                product = ProductRecord.from_dict(d)
+                index._insert(product.product_id, product)
+            index.prices = _SortedColumn(data['prices']['values'], data['prices']['keys'])
+            index.ratings = _SortedColumn(data['ratings']['values'], data['ratings']['keys'])
+            return index
+        except Exception as e:
+            print(f"❌ Error loading catalog index {path}: {e}")
+            return None
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+import config
+from src.utils.catalog_index import CatalogIndex
+from src.utils.data_loader import CSVDataLoader
+from src.utils.product_record import ProductRecord
+
+
+def _fingerprint(record: ProductRecord):
+    return hashlib.sha1(repr(sorted(record.to_dict().items())).encode('utf-8')).hexdigest()
+
+
+class CatalogWatcher:
+    """Background thread that polls ``DATA_FOLDER`` and hot-reloads new or changed CSVs.
+
+    Only the delta of a changed file (new/changed/removed products) is pushed to
+    the vector store. A file is ingested once its size and mtime hold still across two
+    polls, and a file that fails to load keeps its products until it changes again. The catalog index is updated on a copy and swapped in, and
+    listeners are called with the new index, so in-flight chat requests keep
+    reading a consistent snapshot.
+    """
+
+    def __init__(self, vector_store, catalog_index: Optional[CatalogIndex] = None,
+                 data_folder: Optional[str] = None, interval: Optional[float] = None):
+        self.vector_store = vector_store
+        self.catalog_index = catalog_index or CatalogIndex()
+        self.data_loader = CSVDataLoader()
+        if data_folder:
+            self.data_loader.data_folder = data_folder
+        self.interval = interval or config.CATALOG_WATCH_INTERVAL
+        self.listeners: List[Callable[[CatalogIndex], None]] = []
+        self._file_stats: Dict[str, tuple] = {}
+        self._file_products: Dict[str, Dict[str, str]] = {}
+        self._pending: Dict[str, tuple] = {}  # changed files waiting for their stat to settle
+        self._failed: Dict[str, tuple] = {}  # stat of files that failed to load, not retried until it changes
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback: Callable[[CatalogIndex], None]):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def _scan(self):
+        stats = {}
+        for path in self.data_loader.find_csv_files():
+            try:
+                # a Parquet part directory's mtime changes whenever the scraper adds a part
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _load_file(self, path):
+        """Products in ``path``, or None when it can't be read (half-copied, locked, malformed)"""
+        try:
+            records = self.data_loader.read_products(path)
+        except Exception as e:
+            print(f"❌ Error loading catalog file {os.path.basename(path)}: {e}")
+            return None
+        if config.DEDUPE_ENABLED:
+            records = self.data_loader.dedupe(records)
+        return records
+
+    def seed(self):
+        """Record the current files and their products (already ingested at startup) as the baseline"""
+        self._file_stats, self._file_products = {}, {}
+        for path, stat in self._scan().items():
+            records = self._load_file(path)
+            # an unreadable file was skipped at startup too; leaving it out picks it up once it loads
+            if records is not None:
+                self._file_stats[path] = stat
+                self._file_products[path] = {r.product_id: _fingerprint(r) for r in records}
+
+    def start(self):
+        """Seed the per-file baseline and start polling"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self.seed()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        print(f"👀 Watching {self.data_loader.data_folder} for catalog changes every {self.interval:g}s")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"❌ Catalog watcher error: {e}")
+
+    def poll(self):
+        """Check for new, changed or deleted files once; returns the number of products upserted or removed"""
+        current = self._scan()
+        changed_files = [p for p, stat in current.items()
+                         if self._file_stats.get(p) != stat and self._failed.get(p) != stat]
+        deleted_files = [p for p in self._file_stats if p not in current]
+        # a file still being copied changes between polls; only ingest it once it holds still
+        ready_files = [p for p in changed_files if self._pending.get(p) == current[p]]
+        self._pending = {p: current[p] for p in changed_files if p not in ready_files}
+        self._failed = {p: stat for p, stat in self._failed.items() if current.get(p) == stat}
+
+        upserts: List[ProductRecord] = []
+        dropped = set()
+        loaded = 0
+        for path in ready_files:
+            print(f"🔄 Catalog file changed: {os.path.basename(path)}")
+            records = self._load_file(path)
+            if records is None:
+                # not "every product was deleted": keep the file's products and its old stat
+                self._failed[path] = current[path]
+                continue
+            loaded += 1
+            previous = self._file_products.get(path, {})
+            fingerprints = {r.product_id: _fingerprint(r) for r in records}
+            upserts.extend(r for r in records if previous.get(r.product_id) != fingerprints[r.product_id])
+            dropped.update(pid for pid in previous if pid not in fingerprints)
+            self._file_products[path] = fingerprints
+            self._file_stats[path] = current[path]
+        for path in deleted_files:
+            print(f"🗑️  Catalog file removed: {os.path.basename(path)}")
+            dropped.update(self._file_products.pop(path, {}))
+            del self._file_stats[path]
+        if not loaded and not deleted_files:
+            return 0
+
+        # a product that moved to another file is still in the catalog
+        remaining = set()
+        for fingerprints in self._file_products.values():
+            remaining.update(fingerprints)
+        removed = sorted(dropped - remaining)
+
+        if upserts:
+            self.vector_store.add_products(upserts)
+        if removed:
+            self.vector_store.delete_products(removed)
+        self.vector_store.update_similarity_graph([r.product_id for r in upserts], removed)
+
+        # deltas go into a copy that is swapped in, so readers never see a half-applied change
+        index = self.catalog_index.copy()
+        index.add_products(upserts)
+        for product_id in removed:
+            index.remove_product(product_id)
+        index.save()
+        self.catalog_index = index
+
+        for listener in list(self.listeners):
+            try:
+                listener(index)
+            except Exception as e:
+                print(f"❌ Catalog change listener failed: {e}")
+
+        print(f"✅ Catalog reloaded: {len(upserts)} upserted, {len(removed)} removed")
+        return len(upserts) + len(removed)
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_catalog_watcher(vector_store, catalog_index: Optional[CatalogIndex] = None,
+                          on_change: Optional[Callable[[CatalogIndex], None]] = None):
+    """Start (once per process) the shared catalog watcher and register a change listener"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = CatalogWatcher(vector_store, catalog_index).start()
+        if on_change:
+            _watcher.add_listener(on_change)
+        return _watcher
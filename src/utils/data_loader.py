@@ -3,16 +3,19 @@ import os
 import glob
 from typing import List, Dict
 import config
+from src.utils.product_record import ProductRecord
+from src.utils.dedupe import dedupe_products
 
 class CSVDataLoader:
     def __init__(self):
         self.data_folder = config.DATA_FOLDER
+        self.merged_ids = {}  # product_id merged away by the last dedupe -> canonical product_id
     
     def find_csv_files(self):
-        """Find all CSV files in the data folder"""
-        csv_pattern = os.path.join(self.data_folder, "*.csv")
-        csv_files = glob.glob(csv_pattern)
-        return csv_files
+        """Find all CSV files in the data folder, plus Parquet outputs (files or part-file directories)"""
+        csv_files = glob.glob(os.path.join(self.data_folder, "*.csv"))
+        csv_files += glob.glob(os.path.join(self.data_folder, "*.parquet"))
+        return sorted(csv_files)
     
     def load_all_products(self):
         """Load products from all CSV files in data folder"""
@@ -23,75 +26,94 @@ class CSVDataLoader:
             return []
         
         all_products = []
+        sources = []
         
         for csv_file in csv_files:
             print(f"📁 Loading data from: {os.path.basename(csv_file)}")
             products = self.load_products_from_csv(csv_file)
             all_products.extend(products)
+            sources.extend([csv_file] * len(products))
         
         print(f"✅ Loaded {len(all_products)} products from {len(csv_files)} CSV file(s)")
+        
+        if config.DEDUPE_ENABLED:
+            all_products = self.dedupe(all_products, sources)
         return all_products
     
+    def dedupe(self, products, sources=None):
+        """Merge near-duplicate products (MinHash + LSH) into canonical records.
+        
+        Products from one source (CSV file) with different explicit ids or URLs are never merged.
+        The ids merged away are kept in ``self.merged_ids`` so callers can drop them from existing indexes.
+        """
+        products, report = dedupe_products(products, sources=sources)
+        self.merged_ids = report["merged_ids"]
+        if report["merged"]:
+            print(f"🧹 Merged {report['merged']} near-duplicate products into {report['clusters']} canonical products "
+                  f"(largest cluster {report['largest_cluster']}); {report['output']} remain")
+        return products
+    
     def load_products_from_csv(self, csv_path):
         """Load products from a specific CSV file"""
         try:
-            df = pd.read_csv(csv_path)
-            print(f"   📊 Found {len(df)} products in {os.path.basename(csv_path)}")
-            
-            # Convert DataFrame to list of dictionaries
-            products = df.to_dict('records')
-            
-            # Clean and standardize the data
-            cleaned_products = self.clean_product_data(products)
-            
-            return cleaned_products
-            
+            return self.read_products(csv_path)
         except Exception as e:
             print(f"❌ Error loading CSV {csv_path}: {e}")
             return []
     
-    def clean_product_data(self, products: List[Dict]):
-        """Clean and standardize product data"""
+    def read_products(self, csv_path):
+        """Like ``load_products_from_csv``, but raises when the file can't be read instead of returning []"""
+        # the scraper's ParquetSink writes a directory of part files; pandas reads it as one table
+        if csv_path.endswith(".parquet"):
+            df = pd.read_parquet(csv_path)
+        else:
+            df = pd.read_csv(csv_path)
+        print(f"   📊 Found {len(df)} products in {os.path.basename(csv_path)}")
+        
+        # Convert DataFrame to list of dictionaries
+        products = df.to_dict('records')
+        
+        # Clean and standardize the data
+        return self.clean_product_data(products)
+    
+    def clean_product_data(self, products: List[Dict]) -> List[ProductRecord]:
+        """Clean and standardize product data into compact ProductRecords"""
         cleaned_products = []
         
         for product in products:
-            cleaned_product = {}
+            # case-insensitive column lookup, built once per row
+            product = {str(k).lower(): v for k, v in product.items()}
             
             # Handle product name
-            cleaned_product['product_name'] = self.get_value(product, ['product_name', 'name', 'title', 'product'])
-            
-            # Handle brand
-            cleaned_product['brand'] = self.get_value(product, ['brand', 'company', 'manufacturer']) or "Unknown Brand"
-            
-            # Handle price
-            price = self.get_value(product, ['price', 'cost', 'amount'])
-            cleaned_product['price'] = self.clean_price(price)
-            
-            # Handle rating
-            cleaned_product['rating'] = self.get_value(product, ['rating', 'review', 'score']) or "No rating"
-            
-            # Handle product URL
-            cleaned_product['product_url'] = self.get_value(product, ['product_url', 'url', 'link']) or ""
-            
-            # Handle breadcrumbs
-            cleaned_product['breadcrumbs'] = self.get_value(product, ['breadcrumbs', 'category', 'categories']) or "Home / Personal Care"
-            
-            # Handle description
-            cleaned_product['description'] = self.get_value(product, ['description', 'desc', 'details']) or f"{cleaned_product['brand']} {cleaned_product['product_name']}"
+            product_name = self.get_value(product, ['product_name', 'name', 'title', 'product'])
             
             # Only add if we have at least a product name
-            if cleaned_product['product_name']:
-                cleaned_products.append(cleaned_product)
-            else:
+            if not product_name:
                 print(f"⚠️  Skipping product without name: {product}")
+                continue
+            
+            # Handle brand
+            brand = self.get_value(product, ['brand', 'company', 'manufacturer']) or "Unknown Brand"
+            
+            cleaned_products.append(ProductRecord(
+                product_id=self.get_value(product, ['product_id', 'sku']),
+                product_name=product_name,
+                brand=brand,
+                price=self.clean_price(self.get_value(product, ['price', 'cost', 'amount'])),
+                rating=self.clean_rating(self.get_value(product, ['rating', 'review', 'score'])),
+                product_url=self.get_value(product, ['product_url', 'url', 'link']) or "",
+                breadcrumbs=self.get_value(product, ['breadcrumbs', 'category', 'categories']) or "Home / Personal Care",
+                description=self.get_value(product, ['description', 'desc', 'details']) or f"{brand} {product_name}",
+            ))
         
         return cleaned_products
     
     def get_value(self, product_dict, possible_keys):
-        """Get value from dictionary using multiple possible keys"""
+        """Get value from a row whose keys are lowercased, using multiple possible keys"""
         for key in possible_keys:
-            if key in product_dict and pd.notna(product_dict[key]) and product_dict[key] != '':
-                return str(product_dict[key])
+            value = product_dict.get(key)
+            if value is not None and pd.notna(value) and value != '':
+                return str(value)
         return None
     
     def clean_price(self, price_value):
@@ -112,15 +134,27 @@ class CSVDataLoader:
         except:
             return 0.0
     
+    def clean_rating(self, rating_value):
+        """Convert rating to float, or None when missing/non-numeric"""
+        try:
+            return float(rating_value) if rating_value else None
+        except (TypeError, ValueError):
+            return None
+    
     def validate_data_quality(self, products):
         """Validate the quality of loaded data"""
         if not products:
             return False
         
         total_products = len(products)
-        products_with_name = len([p for p in products if p.get('product_name')])
-        products_with_brand = len([p for p in products if p.get('brand') and p['brand'] != "Unknown Brand"])
-        products_with_price = len([p for p in products if p.get('price', 0) > 0])
+        products_with_name = products_with_brand = products_with_price = 0
+        for p in products:
+            if p.product_name:
+                products_with_name += 1
+            if p.brand != "Unknown Brand":
+                products_with_brand += 1
+            if p.price > 0:
+                products_with_price += 1
         
         print(f"\n📈 Data Quality Report:")
         print(f"   Total products: {total_products}")
@@ -0,0 +1,212 @@
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import config
+from src.utils.product_record import ProductRecord
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation: "L'Oréal  Paris" -> "l oreal paris\""""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def product_shingles(product: ProductRecord, k: int = 4) -> set:
+    """Character k-shingles of brand + name, plus word bigrams of the description"""
+    title = normalize_text(f"{product.brand} {product.product_name}").replace(" ", "")
+    shingles = {title[i:i + k] for i in range(max(1, len(title) - k + 1))}
+    words = normalize_text(product.description).split()
+    shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return shingles
+
+
+class MinHasher:
+    """MinHash signatures from universal hashing of 32-bit shingle hashes"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles) -> np.ndarray:
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (a*h + b) mod p, truncated to 32 bits; h < 2**32 so a*h wraps in uint64 like datasketch
+        permuted = (hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Bands and rows per band whose S-curve midpoint (1/b)^(1/r) is closest to ``threshold``"""
+    candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def explicit_keys(product: ProductRecord) -> Tuple[str, str]:
+    """(product_id, product_url) as given by the source; '' where the id was derived or the URL is missing"""
+    product_id = product.product_id if product.product_id != product._derive_id() else ""
+    return product_id, product.product_url.strip().rstrip("/").lower()
+
+
+class _UnionFind:
+    """Union-find that refuses to join clusters holding different explicit ids/URLs from one source.
+
+    ``keys[i]`` is (source, product_id, url) with '' for unknown values.
+    """
+
+    def __init__(self, n, keys=None):
+        self.parent = list(range(n))
+        self.keys = keys
+        self.cluster_keys: Dict[int, Dict] = {}  # root -> {(source, 'id' | 'url'): value}, non-singletons only
+
+    def _keys_of(self, root):
+        keys = self.cluster_keys.get(root)
+        if keys is None:
+            source, product_id, url = self.keys[root]
+            keys = {key: value for key, value in (((source, "id"), product_id), ((source, "url"), url)) if value}
+        return keys
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return True
+        if self.keys is not None:
+            kx, ky = self._keys_of(rx), self._keys_of(ry)
+            small, large = (kx, ky) if len(kx) <= len(ky) else (ky, kx)
+            if any(large.get(key, value) != value for key, value in small.items()):
+                return False
+            large.update(small)
+            self.cluster_keys.pop(rx, None)
+            self.cluster_keys.pop(ry, None)
+            self.cluster_keys[min(rx, ry)] = large
+        self.parent[max(rx, ry)] = min(rx, ry)
+        return True
+
+
+def find_duplicate_clusters(products: List[ProductRecord], threshold: Optional[float] = None,
+                            num_perm: Optional[int] = None, max_price_ratio: Optional[float] = None,
+                            sources: Optional[List[str]] = None, bucket_window: Optional[int] = None) -> List[List[int]]:
+    """Indices of near-duplicate products grouped into clusters (only clusters of 2+).
+
+    Signatures are bucketed per LSH band, so only products sharing a band are compared;
+    candidate pairs are kept when their estimated Jaccard similarity reaches ``threshold``
+    and their prices (when both known) are within ``max_price_ratio`` of each other.
+
+    ``sources`` names where each product came from (e.g. its CSV file; all one source when
+    omitted). A source that lists two products under different product_ids or URLs means
+    they are different products, so such records never end up in one cluster. In a bucket
+    larger than ``bucket_window`` each product is only compared with its ``bucket_window``
+    nearest predecessors in signature order, which bounds the work on templated catalogs.
+    """
+    threshold = config.DEDUPE_THRESHOLD if threshold is None else threshold
+    num_perm = num_perm or config.DEDUPE_NUM_PERM
+    max_price_ratio = max_price_ratio or config.DEDUPE_MAX_PRICE_RATIO
+    bucket_window = bucket_window or config.DEDUPE_BUCKET_WINDOW
+    if len(products) < 2:
+        return []
+
+    hasher = MinHasher(num_perm)
+    signatures = np.vstack([hasher.signature(product_shingles(p)) for p in products])
+    prices = np.array([p.price for p in products])
+    bands, rows = lsh_params(threshold, num_perm)
+    keys = [(sources[i] if sources is not None else "", *explicit_keys(product)) for i, product in enumerate(products)]
+
+    clusters = _UnionFind(len(products), keys)
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(key.tobytes(), []).append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            root = clusters.find(members[0])
+            if all(clusters.find(i) == root for i in members):
+                continue  # already one cluster (identical texts share every band)
+            if len(members) > bucket_window:
+                # near-identical signatures sort next to each other
+                members.sort(key=lambda i: signatures[i].tobytes())
+            for pos in range(1, len(members)):
+                i, previous = members[pos], members[max(0, pos - bucket_window):pos]
+                similarity = (signatures[previous] == signatures[i]).mean(axis=1)
+                low = np.minimum(prices[previous], prices[i])
+                high = np.maximum(prices[previous], prices[i])
+                # same text at very different prices is usually a different size/variant
+                price_ok = (low <= 0) | (high <= low * max_price_ratio)
+                for j in {clusters.find(int(j)) for j in np.asarray(previous)[(similarity >= threshold) & price_ok]}:
+                    clusters.union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(products)):
+        groups.setdefault(clusters.find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def _completeness(product: ProductRecord):
+    return (
+        bool(product.product_url), product.rating is not None, product.price > 0,
+        product.brand != "Unknown Brand", len(product.description),
+    )
+
+
+def merge_cluster(products: List[ProductRecord]) -> ProductRecord:
+    """One canonical record: the most complete member, with gaps filled from the others"""
+    ordered = sorted(products, key=lambda p: (tuple(-int(v) for v in _completeness(p)), p.product_id))
+    canonical = ordered[0]
+    merged = ProductRecord(**{field: getattr(canonical, field) for field in (
+        'product_id', 'product_name', 'brand', 'price', 'rating', 'product_url', 'breadcrumbs', 'description')})
+    for other in ordered[1:]:
+        if merged.rating is None and other.rating is not None:
+            merged.rating = other.rating
+        if not merged.product_url and other.product_url:
+            merged.product_url = other.product_url
+        if merged.price <= 0 < other.price:
+            merged.price = other.price
+    return merged
+
+
+def dedupe_products(products: List[ProductRecord], threshold: Optional[float] = None,
+                    num_perm: Optional[int] = None, max_price_ratio: Optional[float] = None,
+                    sources: Optional[List[str]] = None) -> Tuple[List[ProductRecord], Dict]:
+    """Merge near-duplicate products; returns (products, report).
+
+    Each cluster is replaced by its canonical record at the position of its first member.
+    ``report["merged_ids"]`` maps every product_id merged away to the canonical product_id,
+    so callers can drop the old ids from indexes built before the merge.
+    """
+    clusters = find_duplicate_clusters(products, threshold, num_perm, max_price_ratio, sources)
+    replacement: Dict[int, Optional[ProductRecord]] = {}
+    merged_ids: Dict[str, str] = {}
+    for members in clusters:
+        members.sort()
+        canonical = merge_cluster([products[i] for i in members])
+        replacement[members[0]] = canonical
+        for i in members[1:]:
+            replacement[i] = None
+        merged_ids.update({products[i].product_id: canonical.product_id for i in members
+                           if products[i].product_id != canonical.product_id})
+
+    deduped = [replacement.get(i, product) for i, product in enumerate(products)
+               if replacement.get(i, product) is not None]
+    report = {
+        "input": len(products),
+        "output": len(deduped),
+        "merged": len(products) - len(deduped),
+        "clusters": len(clusters),
+        "largest_cluster": max((len(c) for c in clusters), default=0),
+        "merged_ids": merged_ids,
+    }
+    return deduped, report
@@ -0,0 +1,151 @@
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+import config
+
+# latency buckets in seconds (Prometheus "le" upper bounds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple, extra: Tuple = ()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Metrics:
+    """Thread-safe in-process counters and latency histograms, exported as Prometheus text"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, list]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, value=1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # [per-bucket counts..., +Inf count, sum]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block into histogram ``name`` (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, state):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {cumulative}")
+                    cumulative += state[len(self.buckets)]
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[-1]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+# process-wide registry
+metrics = Metrics()
+metrics.describe("chat_stage_latency_seconds", "Latency of each chat pipeline stage")
+metrics.describe("chat_turn_latency_seconds", "End-to-end latency of a chat turn")
+metrics.describe("chat_requests_total", "Chat turns handled, by intent")
+metrics.describe("errors_total", "Errors by component and stage")
+metrics.describe("search_routing_total", "Sharded searches routed to named categories vs fanned out to all shards")
+metrics.describe("api_rejected_total", "API requests rejected with 503 because the worker was at API_MAX_IN_FLIGHT")
+metrics.describe("analytics_refresh_seconds", "Time to fold new conversations into the hourly analytics rollup")
+metrics.describe("analytics_rows_rolled_up_total", "Conversations folded into the hourly analytics rollup")
+metrics.describe("archive_batch_seconds", "Time to move one batch of old conversations to the Parquet archive")
+metrics.describe("conversations_archived_total", "Conversations moved from PostgreSQL to the Parquet archive")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Serve /metrics in a daemon thread (once per process)"""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        port = port or config.METRICS_PORT
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            print(f"❌ Could not start metrics endpoint on port {port}: {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"📈 Metrics available at http://{host}:{port}/metrics")
+        return _server
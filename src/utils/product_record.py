@@ -0,0 +1,113 @@
+import hashlib
+import sys
+from typing import Dict, Optional
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+class ProductRecord:
+    """Compact, typed product record shared by the loader, vector store and chatbot.
+
+    Uses ``__slots__`` instead of a per-instance ``__dict__``; brand, breadcrumbs and
+    category repeat across thousands of products, so they are interned.
+
+    There is no struct-of-arrays table: every consumer (Chroma upserts, the catalog index,
+    the prompt builder) takes one record or one metadata dict at a time, so columns would be
+    converted back to rows at each boundary. Batch operations share the records instead:
+    a batch is a slice of the one record list, which copies references, never products.
+    """
+
+    __slots__ = (
+        'product_id', 'product_name', 'brand', 'price', 'rating',
+        'product_url', 'breadcrumbs', 'description', 'category',
+    )
+
+    def __init__(self, product_name: str, brand: str = "Unknown Brand", price: float = 0.0,
+                 rating: Optional[float] = None, product_url: str = "",
+                 breadcrumbs: str = "Home / Personal Care", description: str = "",
+                 product_id: Optional[str] = None):
+        self.product_name = product_name
+        self.brand = _intern(brand or "Unknown Brand")
+        self.price = float(price or 0.0)
+        self.rating = rating
+        self.product_url = product_url or ""
+        self.breadcrumbs = _intern(breadcrumbs or "Home / Personal Care")
+        self.description = description or ""
+        parts = [part.strip() for part in self.breadcrumbs.split('/') if part.strip()]
+        self.category = _intern(parts[-1] if parts else "Personal Care")
+        self.product_id = product_id or self._derive_id()
+
+    def _derive_id(self):
+        key = self.product_url.strip() or f"{self.product_name}|{self.brand}"
+        return "product_" + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    def __repr__(self):
+        return f"ProductRecord({self.product_id!r}, {self.product_name!r}, brand={self.brand!r}, price={self.price})"
+
+    def __eq__(self, other):
+        if not isinstance(other, ProductRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __hash__(self):
+        return hash(self.product_id)
+
+    @property
+    def rating_text(self):
+        return f"{self.rating:g}" if self.rating is not None else "No rating"
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Build a record from a plain product dict (loader output, scraper rows or persisted JSON)"""
+        rating = data.get('rating')
+        try:
+            rating = float(rating) if rating not in (None, '') else None
+        except (TypeError, ValueError):
+            rating = None
+        return cls(
+            product_name=data.get('product_name', ''),
+            brand=data.get('brand') or "Unknown Brand",
+            price=data.get('price') or 0.0,
+            rating=rating,
+            product_url=data.get('product_url') or "",
+            breadcrumbs=data.get('breadcrumbs') or "Home / Personal Care",
+            description=data.get('description') or "",
+            product_id=data.get('product_id'),
+        )
+
+    @classmethod
+    def coerce(cls, product):
+        return product if isinstance(product, cls) else cls.from_dict(product)
+
+    def to_dict(self):
+        return {
+            'product_id': self.product_id,
+            'product_name': self.product_name,
+            'brand': self.brand,
+            'price': self.price,
+            'rating': self.rating,
+            'product_url': self.product_url,
+            'breadcrumbs': self.breadcrumbs,
+            'description': self.description,
+        }
+
+    def to_metadata(self):
+        """Chroma metadata: typed values, no None (rating is omitted when unknown).
+
+        The description is not repeated here; it is part of the stored document.
+        """
+        metadata = {
+            'product_id': self.product_id,
+            'product_name': self.product_name,
+            'brand': self.brand,
+            'price': self.price,
+            'product_url': self.product_url,
+            'breadcrumbs': self.breadcrumbs,
+            'category': self.category,
+            'type': 'product',
+        }
+        if self.rating is not None:
+            metadata['rating'] = self.rating
+        return metadata
@@ -1,103 +1,632 @@
+import json
+import os
+import random
+import re
+import string
+import threading
+import time
+import uuid
 import chromadb
+import numpy as np
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+from typing import List, Dict, Optional
 import config
+from src.utils.product_record import ProductRecord
+from src.utils.metrics import metrics
+from src.vector_store.encoders import load_encoder
+from src.vector_store.similarity_graph import SimilarityGraph
+from src.vector_store.shard_router import SHARD_SEPARATOR, ShardRouter, shard_category, shard_collection_name
+from concurrent.futures import ThreadPoolExecutor
 
 class ChromaDBManager:
     def __init__(self):
         self.client = chromadb.PersistentClient(path=config.CHROMA_PERSIST_DIR)
-        self.collection = self.client.get_or_create_collection(name=config.COLLECTION_NAME)
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.alias_path = os.path.join(config.CHROMA_PERSIST_DIR, config.INDEX_ALIAS_FILE)
+        self._alias_lock = threading.Lock()
+        self._alias_mtime = None
+        self.collection_name = None
+        self.collection = None
+        # we always embed and pass vectors in: the stored document is not the embedded text
+        self.encoder = load_encoder(config.EMBEDDING_BACKEND)
+        self.sharded = config.SHARDED_COLLECTIONS
+        self.field_weights = dict(config.FIELD_WEIGHTS) if config.FIELD_EMBEDDINGS else {}
+        # base collection name -> {category: shard}; the inner dicts are replaced, never mutated,
+        # so a search can iterate the one it read while the catalog watcher adds a shard
+        self._shards: Dict[str, Dict[str, object]] = {}
+        self._shards_lock = threading.RLock()
+        self._shard_pool = None
+        if self.sharded:
+            self._shard_pool = ThreadPoolExecutor(max_workers=config.SHARD_FANOUT_WORKERS, thread_name_prefix="shard-query")
+        self.refresh_collection()
+        self.similarity_graph = None
+        self._graph_mtime = None
     
-    def add_products(self, products: List[Dict]):
-        """Add products to ChromaDB vector store"""
+    # ---- read alias (blue/green collections) ----
+    def _read_alias(self):
+        """Alias record {"active": name, "versions": [...]}, or the plain collection when no rebuild has run"""
+        try:
+            with open(self.alias_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'active': config.COLLECTION_NAME, 'versions': [config.COLLECTION_NAME]}
+    
+    def _write_alias(self, alias):
+        tmp_path = f"{self.alias_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(alias, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.alias_path)
+    
+    def refresh_collection(self):
+        """Point ``self.collection`` at the active version if the alias changed (cheap stat when it hasn't)"""
+        try:
+            mtime = os.stat(self.alias_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self.collection is not None and mtime == self._alias_mtime:
+            return
+        
+        with self._shards_lock:
+            self._shards.clear()
+        name = self._read_alias()['active']
+        if name != self.collection_name or self.collection is None:
+            self.collection = self.client.get_or_create_collection(name=name)
+            self.collection_name = name
+        self._alias_mtime = mtime
+    
+    def add_products(self, products: List[ProductRecord], batch_size: int = 1000):
+        """Add (or update) products in the active ChromaDB collection"""
         if not products:
             print("❌ No products to add to ChromaDB")
             return
         
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, product in enumerate(products):
-            if not product.get('product_name'):
-                continue
-                
-            # Create document text for embedding
-            doc_text = self.create_product_document(product)
-            
-            documents.append(doc_text)
-            metadatas.append({
-                'product_name': product.get('product_name', ''),
-                'brand': product.get('brand', 'Unknown Brand'),
-                'price': str(product.get('price', 0)),
-                'rating': product.get('rating', 'No rating'),
-                'product_url': product.get('product_url', ''),
-                'breadcrumbs': product.get('breadcrumbs', 'Home / Personal Care'),
-                'description': product.get('description', ''),
-                'type': 'product'
-            })
-            ids.append(f"product_{idx}")
-        
-        if documents:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"✅ Added {len(products)} products to ChromaDB vector store")
-        else:
+        records = [ProductRecord.coerce(p) for p in products]
+        # later rows win, e.g. a changed product appended again by the scraper's sink
+        records = list({r.product_id: r for r in records if r.product_name}.values())
+        if not records:
             print("❌ No valid products to add to ChromaDB")
+            return
+        
+        self._upsert_records(self.collection, records, batch_size)
+        print(f"✅ Added {len(records)} products to ChromaDB vector store")
+    
+    def delete_products(self, product_ids: List[str]):
+        """Remove products from the active collection by id"""
+        if not product_ids:
+            return
+        try:
+            self.collection.delete(ids=list(product_ids))
+            if self.sharded:
+                for shard in self._get_shards(self.collection_name).values():
+                    shard.delete(ids=list(product_ids))
+            for field in self.field_weights:
+                self._field_collection(self.collection_name, field).delete(ids=list(product_ids))
+            print(f"🗑️  Removed {len(product_ids)} products from ChromaDB vector store")
+        except Exception as e:
+            print(f"❌ Error deleting products: {e}")
+    
+    def _upsert_records(self, collection, records: List[ProductRecord], batch_size: int = 1000):
+        # Upsert in batches keyed by the stable product_id so re-ingesting
+        # the same catalog updates entries instead of duplicating them
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            # name, brand, breadcrumbs and category are already in the metadata, so only the
+            # description is stored as the document; the full template text is what gets embedded
+            documents = [self._description(r) for r in batch]
+            metadatas = [r.to_metadata() for r in batch]
+            ids = [r.product_id for r in batch]
+            embeddings = self._embed([self.create_product_document(r) for r in batch])
+            # read before the upsert overwrites it: a product whose category changed must leave its old shard
+            previous = self._stored_categories(collection, ids) if self.sharded else {}
+            collection.upsert(documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings)
+            if self.sharded:
+                self._upsert_shards(collection.name, batch, ids, embeddings, previous)
+            for field in self.field_weights:
+                # vectors only: text and metadata live once, in the main collection
+                self._field_collection(collection.name, field).upsert(
+                    ids=ids, embeddings=self._embed([self.field_text(r, field) for r in batch]))
+    
+    def rebuild_index(self, products: List[ProductRecord], background: bool = False):
+        """Build a new versioned collection, validate it, then atomically switch the read alias.
+        
+        Searches keep hitting the current collection until the swap. With
+        ``background=True`` the rebuild runs in a daemon thread, which is returned.
+        """
+        if background:
+            thread = threading.Thread(target=self.rebuild_index, args=(products,), daemon=True)
+            thread.start()
+            return thread
+        
+        records = [ProductRecord.coerce(p) for p in products]
+        records = list({r.product_id: r for r in records if r.product_name}.values())
+        if not records:
+            print("❌ No valid products to rebuild the index with")
+            return False
+        
+        # the random suffix keeps two rebuilds in the same second from sharing (and dropping) a collection
+        version = f"{config.COLLECTION_NAME}_v{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        print(f"🔨 Building collection {version} with {len(records)} products...")
+        new_collection = self.client.create_collection(name=version)
+        try:
+            self._upsert_records(new_collection, records)
+            if not self._validate_collection(new_collection, records):
+                self._drop_version(version)
+                return False
+        except Exception as e:
+            print(f"❌ Error rebuilding index: {e}")
+            self._drop_version(version)
+            return False
+        
+        with self._alias_lock:
+            alias = self._read_alias()
+            versions = [v for v in alias['versions'] if v != version] + [version]
+            self._write_alias({'active': version, 'versions': versions})
+            self.collection = new_collection
+            self.collection_name = version
+            self._alias_mtime = os.stat(self.alias_path).st_mtime_ns
+            self._prune_versions(versions)
+        
+        print(f"✅ Switched search to {version}")
+        return True
     
-    def create_product_document(self, product):
-        """Create a comprehensive document for vector embedding"""
-        return f"""
-        Product: {product.get('product_name', '')}
-        Brand: {product.get('brand', 'Unknown Brand')}
-        Price: {product.get('price', 'N/A')}
-        Rating: {product.get('rating', 'No rating')}
-        Description: {product.get('description', '')}
-        Category: {product.get('breadcrumbs', 'Home / Personal Care')}
-        Type: Personal Care Product
+    def _validate_collection(self, collection, records: List[ProductRecord]):
+        """Check the new collection's count and that a sample of products is found by name.
+        
+        Queries are the short product names a shopper would type, not the stored documents
+        (a document always finds itself). A result with the same name counts as a hit, since
+        catalogs list the same product name under several ids.
         """
+        count = collection.count()
+        if count != len(records):
+            print(f"❌ Validation failed: collection has {count} products, expected {len(records)}")
+            return False
+        
+        sample = random.sample(records, min(config.INDEX_VALIDATION_SAMPLE, len(records)))
+        results = self._query(
+            collection,
+            [r.product_name for r in sample],
+            n_results=min(5, count),
+            include=["metadatas"]
+        )
+        hits = sum(
+            1 for r, ids, metadatas in zip(sample, results['ids'], results['metadatas'])
+            if r.product_id in ids or any(m.get('product_name') == r.product_name for m in metadatas)
+        )
+        recall = hits / len(sample)
+        if recall < config.INDEX_MIN_RECALL:
+            print(f"❌ Validation failed: sample recall@5 {recall:.2f} < {config.INDEX_MIN_RECALL}")
+            return False
+        print(f"   ✔️ Validated {count} products, sample recall@5 {recall:.2f}")
+        return True
+    
+    def _drop_version(self, version: str):
+        if version == self._read_alias()['active']:
+            print(f"⚠️  Not dropping {version}: it is the active index")
+            return
+        for name in [version] + self._derived_names(version):
+            try:
+                self.client.delete_collection(name=name)
+            except Exception:
+                pass
+        with self._shards_lock:
+            self._shards.pop(version, None)
+    
+    def _prune_versions(self, versions: List[str]):
+        """Drop versions beyond ``config.INDEX_VERSIONS_TO_KEEP`` (the active one is always kept)"""
+        stale = versions[:-config.INDEX_VERSIONS_TO_KEEP] if config.INDEX_VERSIONS_TO_KEEP > 0 else versions[:-1]
+        active = self._read_alias()['active']
+        stale = [name for name in stale if name != active]
+        for name in stale:
+            try:
+                self.client.delete_collection(name=name)
+                for derived in self._derived_names(name):
+                    self.client.delete_collection(name=derived)
+            except Exception as e:
+                print(f"⚠️  Could not delete old collection {name}: {e}")
+        if stale:
+            self._write_alias({'active': active, 'versions': [v for v in versions if v not in stale]})
+    
+    def rollback_index(self):
+        """Switch the read alias back to the previous retained version"""
+        with self._alias_lock:
+            alias = self._read_alias()
+            versions = alias['versions']
+            position = versions.index(alias['active']) if alias['active'] in versions else len(versions) - 1
+            if position == 0:
+                print("❌ No previous index version to roll back to")
+                return False
+            previous = versions[position - 1]
+            self._write_alias({'active': previous, 'versions': versions})
+            self.collection = self.client.get_or_create_collection(name=previous)
+            self.collection_name = previous
+            self._alias_mtime = os.stat(self.alias_path).st_mtime_ns
+        print(f"✅ Rolled back search to {previous}")
+        return True
+    
+    @staticmethod
+    def _description(product: ProductRecord):
+        """Description, unless it is the loader's "<brand> <name>" placeholder"""
+        if product.description == f"{product.brand} {product.product_name}":
+            return ""
+        return product.description
+    
+    def create_product_document(self, product: ProductRecord):
+        """Compact text embedded for a product (``config.DOCUMENT_TEMPLATE``)"""
+        template = config.DOCUMENT_TEMPLATES.get(config.DOCUMENT_TEMPLATE, config.DOCUMENT_TEMPLATE)
+        values = {
+            'product_name': product.product_name,
+            'brand': product.brand,
+            'category': product.category,
+            'breadcrumbs': product.breadcrumbs,
+            'description': self._description(product),
+            'price': f"{product.price:.2f}",
+            'rating': product.rating_text,
+        }
+        parts = []
+        skip_separator = False
+        for literal, field, spec, _ in string.Formatter().parse(template):
+            # an empty field takes the separator after it along ("Lipstick. {description}. " -> "Lipstick.")
+            if not skip_separator:
+                parts.append(literal)
+            skip_separator = False
+            if field is not None:
+                value = format(values[field], spec) if spec else values[field]
+                parts.append(value)
+                skip_separator = not value
+        return re.sub(r"\s+", " ", "".join(parts)).strip(" ,;:|")
+    
+    def field_text(self, product: ProductRecord, field: str):
+        if field == 'name':
+            return f"{product.product_name} by {product.brand}"
+        if field == 'description':
+            return self._description(product) or product.product_name
+        raise ValueError(f"Unknown embedding field {field!r}")
     
     def search_products(self, query: str, n_results: int = 5):
         """Search for products similar to the query"""
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-            
-            products = []
-            if results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    product_info = {
-                        'document': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i],
-                        'distance': results['distances'][0][i] if results['distances'] else 0
-                    }
-                    products.append(product_info)
-            
-            return products
+            self.refresh_collection()
+            if self.field_weights:
+                return self._search_weighted([query], n_results)[0]
+            if self.sharded:
+                return self._search_sharded([query], n_results)[0]
+            results = self._query(self.collection, [query], n_results=n_results)
+            return self._query_products(results, 0)
         except Exception as e:
             print(f"❌ Error searching products: {e}")
+            metrics.inc("errors_total", component="vector_store", stage="search_products")
             return []
     
+    def search_products_batch(self, queries: List[str], n_results: int = 5, batch_size: int = 256):
+        """Search for many queries at once; returns one result list per query, in order.
+        
+        Each batch is embedded as one matrix and answered by a single multi-query ``collection.query``.
+        """
+        all_products = []
+        self.refresh_collection()
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            try:
+                if self.field_weights:
+                    all_products.extend(self._search_weighted(batch, n_results))
+                    continue
+                if self.sharded:
+                    all_products.extend(self._search_sharded(batch, n_results))
+                    continue
+                results = self._query(self.collection, batch, n_results=n_results)
+                all_products.extend(self._query_products(results, i) for i in range(len(batch)))
+            except Exception as e:
+                print(f"❌ Error searching products (batch at {start}): {e}")
+                metrics.inc("errors_total", component="vector_store", stage="search_products_batch")
+                all_products.extend([] for _ in batch)
+        return all_products
+    
+    def _embed(self, texts: List[str]):
+        """Embeddings from the configured encoder"""
+        with metrics.timer("embedding_latency_seconds", backend=self.encoder.name):
+            return self.encoder.encode(texts)
+    
+    def _query(self, collection, texts: List[str], **kwargs):
+        return collection.query(query_embeddings=self._embed(texts), **kwargs)
+    
+    @staticmethod
+    def _query_products(results, i):
+        """Products for the i-th query of a ``collection.query`` result"""
+        products = []
+        if results['documents'] and results['documents'][i]:
+            for j in range(len(results['documents'][i])):
+                product_info = {
+                    'document': results['documents'][i][j],
+                    'metadata': results['metadatas'][i][j],
+                    'distance': results['distances'][i][j] if results['distances'] else 0
+                }
+                products.append(product_info)
+        return products
+    
+    def _derived_names(self, base: str):
+        """Shard and field-vector collections that belong to collection ``base``"""
+        prefixes = (base + SHARD_SEPARATOR, base + ".")
+        return [c.name for c in self.client.list_collections() if c.name.startswith(prefixes)]
+    
+    # ---- per-field vectors (config.FIELD_EMBEDDINGS) ----
+    def _field_collection(self, base: str, field: str):
+        return self.client.get_or_create_collection(name=f"{base}.{field}")
+    
+    def _search_weighted(self, queries: List[str], n_results: int):
+        """Rank by the weighted sum of cosine similarity between the query and each field's vector"""
+        embeddings = np.asarray(self._embed(queries), dtype=np.float32)
+        fetch = n_results * config.FIELD_OVERFETCH
+        fields = {field: self._field_collection(self.collection_name, field) for field in self.field_weights}
+        hits = {field: collection.query(query_embeddings=embeddings, n_results=fetch, include=['embeddings'])
+                for field, collection in fields.items()}
+        total_weight = sum(self.field_weights.values()) or 1.0
+        
+        ranked = []
+        for i, query_vector in enumerate(embeddings):
+            scores = {}
+            for field, result in hits.items():
+                scores[field] = {pid: float(np.dot(query_vector, vector))
+                                 for pid, vector in zip(result['ids'][i], result['embeddings'][i])}
+            candidates = set().union(*(field_scores.keys() for field_scores in scores.values()))
+            for field, field_scores in scores.items():
+                # candidates found through another field: score them against this field's stored vector
+                missing = [pid for pid in candidates if pid not in field_scores]
+                if missing:
+                    page = fields[field].get(ids=missing, include=['embeddings'])
+                    field_scores.update((pid, float(np.dot(query_vector, vector)))
+                                        for pid, vector in zip(page['ids'], page['embeddings']))
+            combined = {pid: sum(w * scores[f].get(pid, 0.0) for f, w in self.field_weights.items()) / total_weight
+                        for pid in candidates}
+            ranked.append(sorted(combined.items(), key=lambda item: -item[1])[:n_results])
+        
+        wanted = list({pid for top in ranked for pid, _ in top})
+        page = self.collection.get(ids=wanted, include=['documents', 'metadatas']) if wanted else {'ids': []}
+        found = {pid: (doc, meta) for pid, doc, meta in zip(page['ids'], page.get('documents') or [], page.get('metadatas') or [])}
+        return [
+            [{'document': found[pid][0], 'metadata': found[pid][1], 'distance': 1.0 - score}
+             for pid, score in top if pid in found]
+            for top in ranked
+        ]
+    
+    # ---- category shards (config.SHARDED_COLLECTIONS) ----
+    def _shard_names(self, base: str):
+        prefix = base + SHARD_SEPARATOR
+        return [c.name for c in self.client.list_collections() if c.name.startswith(prefix)]
+    
+    def _get_shards(self, base: str):
+        """{category: collection} for the shards of ``base``, discovered once per alias change"""
+        shards = self._shards.get(base)
+        if shards is None:
+            with self._shards_lock:
+                shards = self._shards.get(base)
+                if shards is None:
+                    shards = {}
+                    for name in self._shard_names(base):
+                        shard = self.client.get_collection(name=name)
+                        shards[(shard.metadata or {}).get('shard_category', name)] = shard
+                    self._shards[base] = shards
+        return shards
+    
+    def _add_shard(self, base: str, category: str):
+        """Create the shard for ``category`` and publish a new {category: shard} dict (copy-on-write)"""
+        with self._shards_lock:
+            shards = self._get_shards(base)
+            if category not in shards:
+                shards = dict(shards)
+                shards[category] = self.client.get_or_create_collection(
+                    name=shard_collection_name(base, category), metadata={'shard_category': category})
+                self._shards[base] = shards
+            return shards[category]
+    
+    @staticmethod
+    def _stored_categories(collection, ids: List[str]):
+        """{product_id: shard category} for the ids already in ``collection``"""
+        page = collection.get(ids=ids, include=['metadatas'])
+        return {pid: shard_category(ProductRecord.from_dict(meta))
+                for pid, meta in zip(page['ids'], page.get('metadatas') or []) if meta}
+    
+    def _upsert_shards(self, base, records, ids, embeddings, previous):
+        """Vectors only: documents and metadata live once, in the main collection"""
+        by_category: Dict[str, List[int]] = {}
+        moved: Dict[str, List[str]] = {}
+        for i, record in enumerate(records):
+            category = shard_category(record)
+            by_category.setdefault(category, []).append(i)
+            old_category = previous.get(ids[i])
+            if old_category is not None and old_category != category:
+                moved.setdefault(old_category, []).append(ids[i])
+        shards = self._get_shards(base)
+        for old_category, moved_ids in moved.items():
+            if old_category in shards:
+                shards[old_category].delete(ids=moved_ids)
+        for category, rows in by_category.items():
+            shard = shards.get(category) or self._add_shard(base, category)
+            shard.upsert(ids=[ids[i] for i in rows], embeddings=[embeddings[i] for i in rows])
+    
+    def _search_sharded(self, queries: List[str], n_results: int):
+        """Route each query to the shards it names (or all shards), query shards in parallel, merge top-k"""
+        # a snapshot: new shards are published as a new dict, so this one doesn't change under us
+        shards = self._get_shards(self.collection_name)
+        if not shards:
+            return [self._query_products(self._query(self.collection, [q], n_results=n_results), 0) for q in queries]
+        
+        router = ShardRouter(shards)
+        embeddings = self._embed(queries)
+        routed_to: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            categories = router.route(query)
+            metrics.inc("search_routing_total", mode="routed" if categories else "fanout")
+            for category in categories or shards:
+                routed_to.setdefault(category, []).append(i)
+        
+        def query_shard(category):
+            rows = routed_to[category]
+            shard = shards[category]
+            results = shard.query(query_embeddings=[embeddings[i] for i in rows], n_results=n_results,
+                                  include=['distances'])
+            return rows, results
+        
+        merged: List[List[tuple]] = [[] for _ in queries]
+        for rows, results in self._shard_pool.map(query_shard, list(routed_to)):
+            for j, i in enumerate(rows):
+                merged[i].extend(zip(results['ids'][j], results['distances'][j]))
+        ranked = [sorted(hits, key=lambda hit: hit[1])[:n_results] for hits in merged]
+        
+        wanted = list({pid for top in ranked for pid, _ in top})
+        page = self.collection.get(ids=wanted, include=['documents', 'metadatas']) if wanted else {'ids': []}
+        found = {pid: (doc, meta) for pid, doc, meta in zip(page['ids'], page.get('documents') or [], page.get('metadatas') or [])}
+        return [
+            [{'document': found[pid][0], 'metadata': found[pid][1], 'distance': distance}
+             for pid, distance in top if pid in found]
+            for top in ranked
+        ]
+    
+    # ---- precomputed similar-product graph ----
+    def _all_embeddings(self, batch_size: int = 5000):
+        ids, vectors = [], []
+        for page in self.iter_products(batch_size=batch_size, include=("embeddings",)):
+            ids.extend(page['ids'])
+            vectors.extend(page['embeddings'])
+        return ids, np.asarray(vectors, dtype=np.float32)
+    
+    def build_similarity_graph(self, k: Optional[int] = None):
+        """Offline job: top-k neighbours of every product from its stored embedding, persisted to disk"""
+        ids, embeddings = self._all_embeddings()
+        if not ids:
+            print("❌ No products in the collection; similarity graph not built")
+            return None
+        start = time.perf_counter()
+        graph = SimilarityGraph.build(ids, embeddings, k)
+        graph.save()
+        self.similarity_graph, self._graph_mtime = graph, None
+        print(f"✅ Similarity graph built for {len(ids)} products (top-{graph.k}) in {time.perf_counter() - start:.1f}s")
+        return graph
+    
+    def _embeddings_for(self, product_ids: List[str], batch_size: int = 5000):
+        ids, vectors = [], []
+        product_ids = list(product_ids)
+        for start in range(0, len(product_ids), batch_size):
+            page = self.collection.get(ids=product_ids[start:start + batch_size], include=['embeddings'])
+            ids.extend(page['ids'])
+            vectors.extend(page['embeddings'])
+        return ids, np.asarray(vectors, dtype=np.float32)
+    
+    def update_similarity_graph(self, changed_ids: List[str], removed_ids: List[str] = ()):
+        """Incrementally refresh the persisted graph after products were upserted or deleted.
+        
+        Only the changed products' embeddings are read, except for the first update after the
+        graph was loaded from disk, which reads them all once to seed the graph's in-memory copy.
+        """
+        graph = self.get_similarity_graph()
+        if graph is None or not (changed_ids or removed_ids):
+            return graph
+        if graph.embeddings is None:
+            ids, embeddings = self._all_embeddings()
+        else:
+            ids, embeddings = graph.apply_changes(*self._embeddings_for(changed_ids), removed_ids)
+        graph = graph.update(ids, embeddings, changed_ids, removed_ids)
+        graph.save()
+        self.similarity_graph, self._graph_mtime = graph, None
+        print(f"✅ Similarity graph updated ({len(changed_ids)} changed, {len(removed_ids)} removed)")
+        return graph
+    
+    def get_similarity_graph(self):
+        """The persisted graph (reloaded when another process rewrites it), or None if never built"""
+        try:
+            mtime = os.stat(config.SIMILARITY_GRAPH_PATH).st_mtime_ns
+        except FileNotFoundError:
+            return self.similarity_graph
+        if self.similarity_graph is None or (self._graph_mtime is not None and mtime != self._graph_mtime):
+            self.similarity_graph = SimilarityGraph.load()
+        self._graph_mtime = mtime
+        return self.similarity_graph
+    
+    def similar_products(self, product_id: str, n_results: int = 5):
+        """Nearest products to ``product_id`` from the precomputed graph (no embedding or ANN query)"""
+        graph = self.get_similarity_graph()
+        neighbors = graph.similar(product_id, n_results) if graph is not None else []
+        if not neighbors:
+            return []
+        try:
+            page = self.collection.get(ids=[pid for pid, _ in neighbors], include=['documents', 'metadatas'])
+        except Exception as e:
+            print(f"❌ Error fetching similar products: {e}")
+            metrics.inc("errors_total", component="vector_store", stage="similar_products")
+            return []
+        found = {pid: (doc, meta) for pid, doc, meta in zip(page['ids'], page['documents'], page['metadatas'])}
+        return [
+            {'document': found[pid][0], 'metadata': found[pid][1], 'distance': 1.0 - score}
+            for pid, score in neighbors if pid in found
+        ]
+    
     def get_product_count(self):
         """Get number of products in collection"""
         try:
-            results = self.collection.get()
-            return len(results['ids']) if results and 'ids' in results else 0
+            return self.collection.count()
         except Exception as e:
             print(f"❌ Error getting product count: {e}")
             return 0
     
-    def get_all_products(self):
-        """Get all products from collection (for debugging)"""
+    def iter_products(self, batch_size: int = 500, include=("documents", "metadatas"),
+                      where: Optional[Dict] = None, offset: int = 0, limit: Optional[int] = None):
+        """Yield pages of products (``collection.get`` results) without loading the whole collection.
+        
+        ``include`` selects the fields to return, e.g. ("metadatas",) or
+        ("documents", "metadatas", "embeddings"). ``offset``/``limit`` bound the export.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = batch_size if remaining is None else min(batch_size, remaining)
+            try:
+                page = self.collection.get(
+                    include=list(include),
+                    where=where,
+                    limit=page_size,
+                    offset=offset
+                )
+            except Exception as e:
+                print(f"❌ Error exporting products at offset {offset}: {e}")
+                return
+            
+            count = len(page['ids'])
+            if not count:
+                return
+            yield page
+            
+            offset += count
+            if remaining is not None:
+                remaining -= count
+            if count < page_size:
+                return
+    
+    def export_products(self, path: str, include_embeddings: bool = False, batch_size: int = 500):
+        """Stream the collection to a JSONL file, one product per line"""
+        include = ("documents", "metadatas", "embeddings") if include_embeddings else ("documents", "metadatas")
+        exported = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for page in self.iter_products(batch_size=batch_size, include=include):
+                for i, product_id in enumerate(page['ids']):
+                    row = {
+                        'id': product_id,
+                        'document': page['documents'][i],
+                        'metadata': page['metadatas'][i],
+                    }
+                    if include_embeddings:
+                        row['embedding'] = [float(x) for x in page['embeddings'][i]]
+                    f.write(json.dumps(row) + "\n")
+                    exported += 1
+        print(f"✅ Exported {exported} products to {path}")
+        return exported
+    
+    def get_all_products(self, limit: Optional[int] = None):
+        """Get all products from collection (for debugging).
+        
+        Prefer ``iter_products`` for anything larger than a quick look; this
+        materializes the requested rows in a single dict.
+        """
         try:
-            return self.collection.get()
+            return self.collection.get(limit=limit)
         except Exception as e:
             print(f"❌ Error getting all products: {e}")
             return None
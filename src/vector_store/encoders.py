@@ -0,0 +1,227 @@
+"""
+Pluggable text encoders for the vector store.
+
+Backends (config.EMBEDDING_BACKEND):
+ - "chroma": ChromaDB's built-in embedding function, run by us so vectors are passed in explicitly
+ - "sentence-transformers": the PyTorch all-MiniLM-L6-v2 reference model
+ - "onnx": the same model exported to ONNX and run with ONNX Runtime
+ - "onnx-int8": the ONNX export with dynamically quantized int8 weights
+
+Export (needs torch + sentence-transformers once, on any machine) and validate against the reference:
+    python -m src.vector_store.encoders export --quantize
+"""
+
+import argparse
+import json
+import os
+from typing import List
+
+import numpy as np
+import config
+
+BACKENDS = ("chroma", "sentence-transformers", "onnx", "onnx-int8")
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+VALIDATION_FILE = "validation.json"
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEncoder:
+    """Reference encoder: the PyTorch SentenceTransformer model"""
+
+    def __init__(self, model_name: str = None):
+        from sentence_transformers import SentenceTransformer
+        self.name = "sentence-transformers"
+        self.model = SentenceTransformer(model_name or config.EMBEDDING_MODEL, device="cpu")
+
+    def encode(self, texts: List[str], batch_size: int = 64):
+        vectors = self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEncoder:
+    """all-MiniLM-L6-v2 exported to ONNX: tokenizer.json + model.onnx, mean pooling and L2 norm in NumPy"""
+
+    def __init__(self, model_dir: str = None, model_file: str = ONNX_MODEL_FILE, max_length: int = 256,
+                 threads: int = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or config.ONNX_MODEL_DIR
+        path = os.path.join(model_dir, model_file)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run: python -m src.vector_store.encoders export")
+        self.name = "onnx-int8" if model_file == ONNX_INT8_MODEL_FILE else "onnx"
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = config.ENCODER_THREADS if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], batch_size: int = 64):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            out.append(_normalize(pooled).astype(np.float32))
+        return np.vstack(out)
+
+
+class ChromaDefaultEncoder:
+    """ChromaDB's built-in embedding function, wrapped for benchmarking against the other backends"""
+
+    def __init__(self):
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self.name = "chroma"
+        self.function = DefaultEmbeddingFunction()
+
+    def encode(self, texts: List[str], batch_size: int = 64):
+        return _normalize(np.asarray(self.function(list(texts)), dtype=np.float32))
+
+
+def load_encoder(backend: str = None, model_dir: str = None):
+    """Build the encoder for ``backend`` (default config.EMBEDDING_BACKEND)"""
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend == "chroma":
+        return ChromaDefaultEncoder()
+    if backend == "sentence-transformers":
+        return SentenceTransformerEncoder()
+    if backend in ("onnx", "onnx-int8"):
+        model_file = ONNX_INT8_MODEL_FILE if backend == "onnx-int8" else ONNX_MODEL_FILE
+        encoder = OnnxEncoder(model_dir, model_file)
+        _warn_if_unvalidated(model_dir or config.ONNX_MODEL_DIR, model_file)
+        return encoder
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def _warn_if_unvalidated(model_dir, model_file):
+    try:
+        with open(os.path.join(model_dir, VALIDATION_FILE), encoding="utf-8") as f:
+            report = json.load(f).get(model_file)
+    except (FileNotFoundError, ValueError):
+        report = None
+    if not report:
+        print(f"⚠️  {model_file} has not been validated against the reference model")
+    elif not report["passed"]:
+        print(f"⚠️  {model_file} failed validation (min cosine {report['min_cosine']:.4f})")
+
+
+def validate_encoder(candidate, reference, texts: List[str], min_cosine: float = None):
+    """Cosine similarity between candidate and reference embeddings of the same texts"""
+    min_cosine = config.ENCODER_MIN_COSINE if min_cosine is None else min_cosine
+    a = _normalize(candidate.encode(texts))
+    b = _normalize(reference.encode(texts))
+    cosines = (a * b).sum(axis=1)
+    return {
+        "texts": len(texts),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "threshold": min_cosine,
+        "passed": bool(cosines.min() >= min_cosine),
+    }
+
+
+def export_onnx(model_name: str = None, output_dir: str = None, quantize: bool = False, opset: int = 14):
+    """Export the SentenceTransformer's transformer to ONNX (and optionally int8), then validate"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_name = model_name or config.EMBEDDING_MODEL
+    output_dir = output_dir or config.ONNX_MODEL_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["export sample text"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    fp32_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in input_names), fp32_path,
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=opset, do_constant_folding=True,
+        )
+    print(f"✅ Exported {model_name} to {fp32_path}")
+
+    model_files = [ONNX_MODEL_FILE]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(output_dir, ONNX_INT8_MODEL_FILE), weight_type=QuantType.QInt8)
+        model_files.append(ONNX_INT8_MODEL_FILE)
+        print(f"✅ Quantized to {ONNX_INT8_MODEL_FILE}")
+
+    reference = SentenceTransformerEncoder(model_name)
+    texts = validation_texts()
+    report = {}
+    for model_file in model_files:
+        report[model_file] = validate_encoder(OnnxEncoder(output_dir, model_file), reference, texts)
+        status = "✔️" if report[model_file]["passed"] else "❌"
+        print(f"   {status} {model_file}: mean cosine {report[model_file]['mean_cosine']:.4f}, "
+              f"min {report[model_file]['min_cosine']:.4f}")
+    with open(os.path.join(output_dir, VALIDATION_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def validation_texts(limit: int = 500) -> List[str]:
+    """Product texts from the catalog in DATA_FOLDER, plus a few typical questions"""
+    from src.utils.data_loader import CSVDataLoader
+
+    texts = [
+        "Can you recommend skincare products?",
+        "What are the benefits of using moisturizer?",
+        "Do you have any anti-aging creams?",
+        "long lasting matte lipstick under 500",
+        "sulfate free shampoo for dry hair",
+    ]
+    try:
+        products = CSVDataLoader().load_all_products()
+    except Exception:
+        products = []
+    texts.extend(f"{p.product_name} {p.brand} {p.description}".strip() for p in products[:limit])
+    return texts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and validate ONNX text encoders")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export the reference model to ONNX and validate it")
+    export_parser.add_argument("--model", default=None, help="default config.EMBEDDING_MODEL")
+    export_parser.add_argument("--output-dir", default=None, help="default config.ONNX_MODEL_DIR")
+    export_parser.add_argument("--quantize", action="store_true", help="also write a dynamic int8 model")
+    validate_parser = subparsers.add_parser("validate", help="Compare a backend with the reference model")
+    validate_parser.add_argument("backend", choices=BACKENDS)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.model, args.output_dir, args.quantize)
+    else:
+        print(json.dumps(validate_encoder(load_encoder(args.backend), SentenceTransformerEncoder(),
+                                         validation_texts()), indent=2))
@@ -0,0 +1,52 @@
+import re
+from typing import Dict, Iterable, List, Optional
+import config
+from src.utils.product_record import ProductRecord
+
+# breadcrumb segments that sit above the real categories
+_ROOT_SEGMENTS = {"home", "personal care", "beauty", "beauty & personal care"}
+_WORD = re.compile(r"[a-z0-9]+")
+SHARD_SEPARATOR = "__"
+
+
+def shard_category(product: ProductRecord) -> str:
+    """Top-level category below the generic roots: "Home / Personal Care / Lipstick" -> "Lipstick\""""
+    for part in product.breadcrumbs.split('/'):
+        part = part.strip()
+        if part and part.lower() not in _ROOT_SEGMENTS:
+            return part
+    return "Personal Care"
+
+
+def shard_collection_name(base: str, category: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-") or "other"
+    return f"{base}{SHARD_SEPARATOR}{slug}"
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall(text.lower())]
+
+
+class ShardRouter:
+    """Maps a query to the category shards it names, by keyword match on category names and synonyms"""
+
+    def __init__(self, categories: Iterable[str], synonyms: Optional[Dict[str, List[str]]] = None):
+        synonyms = config.SHARD_ROUTER_SYNONYMS if synonyms is None else synonyms
+        self.categories = sorted(set(categories))
+        # each category is matched by any of its phrases (all terms of the phrase present in the query)
+        self.phrases = {}
+        for category in self.categories:
+            phrases = [category] + list(synonyms.get(category.lower(), []))
+            self.phrases[category] = [tuple(_terms(p)) for p in phrases if _terms(p)]
+
+    def route(self, query: str, max_shards: Optional[int] = None) -> List[str]:
+        """Categories named by the query, or [] when it is unclear (caller fans out to every shard)"""
+        max_shards = max_shards or config.SHARD_ROUTER_MAX_SHARDS
+        terms = set(_terms(query))
+        matched = [category for category, phrases in self.phrases.items()
+                   if any(all(t in terms for t in phrase) for phrase in phrases)]
+        return matched if 0 < len(matched) <= max_shards else []
@@ -0,0 +1,163 @@
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import config
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _top_k(scores, k):
+    """Column indices and values of the k largest scores per row, best first"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int32), np.zeros((scores.shape[0], 0), dtype=np.float32)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1).astype(np.int32), np.take_along_axis(part_scores, order, axis=1)
+
+
+def knn_rows(queries, embeddings, k, exclude=None, block_size=1024):
+    """Cosine top-k neighbours in ``embeddings`` for each row of ``queries`` (both L2-normalized).
+
+    Works through ``queries`` in blocks so only a block_size x n score matrix is in memory.
+    ``exclude[i]`` is a column to skip for query i (its own row when querying the catalog itself).
+    """
+    neighbors = np.zeros((len(queries), min(k, max(len(embeddings) - 1, 0))), dtype=np.int32)
+    scores = np.zeros(neighbors.shape, dtype=np.float32)
+    for start in range(0, len(queries), block_size):
+        block = queries[start:start + block_size] @ embeddings.T
+        if exclude is not None:
+            rows = np.arange(block.shape[0])
+            block[rows, exclude[start:start + block_size]] = -np.inf
+        idx, val = _top_k(block, neighbors.shape[1])
+        neighbors[start:start + block_size], scores[start:start + block_size] = idx, val
+    return neighbors, scores
+
+
+class SimilarityGraph:
+    """Precomputed top-k cosine neighbours for every product, keyed by product_id.
+
+    A graph built or updated in this process keeps the normalized embeddings it was computed
+    from (``embeddings``; not persisted), so later updates only need the changed products' vectors.
+    """
+
+    def __init__(self, ids: List[str] = None, neighbors=None, scores=None, k: Optional[int] = None, embeddings=None):
+        self.k = k or config.SIMILARITY_GRAPH_K
+        self.ids = list(ids or [])
+        self.neighbors = neighbors if neighbors is not None else np.zeros((0, 0), dtype=np.int32)
+        self.scores = scores if scores is not None else np.zeros((0, 0), dtype=np.float32)
+        self.embeddings = embeddings
+        self.row_of: Dict[str, int] = {product_id: i for i, product_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: List[str], embeddings, k: Optional[int] = None, block_size: Optional[int] = None):
+        k = k or config.SIMILARITY_GRAPH_K
+        embeddings = _normalize(embeddings)
+        neighbors, scores = knn_rows(embeddings, embeddings, k, exclude=np.arange(len(ids)),
+                                     block_size=block_size or config.SIMILARITY_GRAPH_BLOCK_SIZE)
+        return cls(ids, neighbors, scores, k, embeddings)
+
+    def apply_changes(self, changed_ids: List[str], changed_embeddings, removed: Iterable[str] = ()):
+        """(ids, embeddings) of the catalog after upserting ``changed_ids`` and deleting ``removed``,
+        starting from this graph's own embeddings (requires ``self.embeddings``)"""
+        removed = set(removed)
+        ids = [product_id for product_id in self.ids if product_id not in removed]
+        embeddings = self.embeddings[[self.row_of[product_id] for product_id in ids]]
+        row_of = {product_id: i for i, product_id in enumerate(ids)}
+        changed_embeddings = _normalize(changed_embeddings) if len(changed_ids) else changed_embeddings
+        added = []
+        for product_id, vector in zip(changed_ids, changed_embeddings):
+            if product_id in row_of:
+                embeddings[row_of[product_id]] = vector
+            elif product_id not in removed:
+                row_of[product_id] = len(ids)
+                ids.append(product_id)
+                added.append(vector)
+        if added:
+            embeddings = np.vstack([embeddings, np.asarray(added, dtype=np.float32)])
+        return ids, embeddings
+
+    def similar(self, product_id: str, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(product_id, cosine) of the nearest products, best first; [] for unknown ids"""
+        row = self.row_of.get(product_id)
+        if row is None:
+            return []
+        n = self.k if n is None else n
+        return [(self.ids[j], float(s)) for j, s in zip(self.neighbors[row, :n], self.scores[row, :n])]
+
+    def update(self, ids: List[str], embeddings, changed: Iterable[str], removed: Iterable[str] = (),
+               block_size: Optional[int] = None):
+        """New graph for the current catalog (``ids``/``embeddings``) after ``changed`` / ``removed`` products.
+
+        Only changed rows, rows that pointed at a changed or removed product, and the
+        n x changed score matrix are computed; every other row keeps its neighbours and
+        only admits changed products that now score higher.
+        """
+        block_size = block_size or config.SIMILARITY_GRAPH_BLOCK_SIZE
+        embeddings = _normalize(embeddings)
+        row_of = {product_id: i for i, product_id in enumerate(ids)}
+        changed = {pid for pid in changed if pid in row_of}
+        stale = changed | set(removed)
+        k = min(self.k, max(len(ids) - 1, 0))
+
+        neighbors = np.zeros((len(ids), k), dtype=np.int32)
+        scores = np.zeros((len(ids), k), dtype=np.float32)
+        recompute = []
+        keep = []
+        for i, product_id in enumerate(ids):
+            old_row = self.row_of.get(product_id)
+            if product_id in changed or old_row is None:
+                recompute.append(i)
+                continue
+            old_neighbors = [self.ids[j] for j in self.neighbors[old_row]]
+            if len(old_neighbors) < k or any(pid in stale for pid in old_neighbors):
+                recompute.append(i)
+            else:
+                keep.append(i)
+                neighbors[i] = [row_of[pid] for pid in old_neighbors[:k]]
+                scores[i] = self.scores[old_row, :k]
+
+        if recompute:
+            rows = np.array(recompute)
+            neighbors[rows], scores[rows] = knn_rows(embeddings[rows], embeddings, k, exclude=rows, block_size=block_size)
+
+        if keep and changed:
+            # merge changed products into the kept rows' top-k
+            keep_rows = np.array(keep)
+            changed_rows = np.array(sorted(row_of[pid] for pid in changed))
+            for start in range(0, len(keep_rows), block_size):
+                block = keep_rows[start:start + block_size]
+                candidate_scores = np.concatenate([scores[block], embeddings[block] @ embeddings[changed_rows].T], axis=1)
+                candidate_ids = np.concatenate([neighbors[block], np.broadcast_to(changed_rows, (len(block), len(changed_rows)))], axis=1)
+                idx, val = _top_k(candidate_scores, k)
+                neighbors[block], scores[block] = np.take_along_axis(candidate_ids, idx, axis=1), val
+
+        return SimilarityGraph(ids, neighbors, scores, self.k, embeddings)
+
+    def save(self, path: Optional[str] = None):
+        """Write the graph atomically as a compressed .npz"""
+        path = path or config.SIMILARITY_GRAPH_PATH
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, ids=np.array(self.ids, dtype=str), neighbors=self.neighbors,
+                            scores=self.scores, k=np.array(self.k))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional["SimilarityGraph"]:
+        """The persisted graph, or None if it hasn't been built yet"""
+        path = path or config.SIMILARITY_GRAPH_PATH
+        try:
+            with np.load(path) as data:
+                return cls(data["ids"].tolist(), data["neighbors"], data["scores"], int(data["k"]))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Could not load similarity graph from {path}: {e}")
+            return None
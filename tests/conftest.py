@@ -0,0 +1,86 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.utils.product_record import ProductRecord  # noqa: E402
+
+
+def make_product(i, **overrides):
+    fields = dict(
+        product_id=f"P{i:05d}", product_name=f"Product {i}", brand=f"Brand {i % 7}",
+        price=float(100 + (i * 37) % 900), rating=None if i % 5 == 0 else round(1 + (i % 40) / 10, 1),
+        product_url=f"https://example.com/p/{i}", breadcrumbs=f"Home / Personal Care / Category {i % 4}",
+        description=f"Description of product {i}",
+    )
+    fields.update(overrides)
+    return ProductRecord(**fields)
+
+
+@pytest.fixture
+def products():
+    return [make_product(i) for i in range(200)]
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder so vector store tests need no model download"""
+
+    name = "hashing"
+
+    def __init__(self, dim=4096):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=64):
+        import re
+        import zlib
+
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vectors[i, zlib.crc32(word.encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+@pytest.fixture
+def chroma_config(tmp_path, monkeypatch):
+    """Point the vector store at a temporary directory with the hashing encoder"""
+    import config
+    from src.vector_store import chroma_manager
+
+    monkeypatch.setattr(config, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(config, "SIMILARITY_GRAPH_PATH", str(tmp_path / "similarity_graph.npz"))
+    monkeypatch.setattr(config, "EMBEDDING_BACKEND", "hashing")
+    monkeypatch.setattr(chroma_manager, "load_encoder", lambda backend=None, model_dir=None: HashingEncoder())
+    return config
+
+
+@pytest.fixture
+def vector_store(chroma_config):
+    from src.vector_store.chroma_manager import ChromaDBManager
+    return ChromaDBManager()
+
+
+@pytest.fixture(scope="session")
+def chromium_available():
+    """Skip browser tests when Playwright's Chromium isn't installed (python -m playwright install chromium)"""
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+    except Exception as e:
+        pytest.skip(f"Playwright Chromium not available: {str(e).splitlines()[0]}")
+    return True
+
+
+@pytest.fixture
+def fixture_site():
+    from benchmarks.fixture_site import FixtureSite
+    with FixtureSite() as site:
+        yield site
@@ -0,0 +1,160 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from src.database.analytics import ConversationAnalytics, print_report
+
+
+class RollupManager:
+    """Pooled cursors over a fake database whose clock reads ``now``"""
+
+    def __init__(self, now, rows=()):
+        self.now = now
+        self.rows = list(rows)
+        self.queries = []
+
+    @contextmanager
+    def cursor(self):
+        manager = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                manager.queries.append((sql, params))
+                self.sql = sql
+
+            def fetchone(self):
+                return (manager.now,)
+
+            def fetchall(self):
+                return manager.rows if "conversation_rollup_hourly" in self.sql else []
+
+        yield Cursor()
+
+
+def test_report_window_follows_the_database_clock():
+    # the DB runs hours ahead of the app host; its current hour must still be in the window
+    db_now = datetime(2030, 1, 2, 5, 30)
+    db = RollupManager(db_now, rows=[(datetime(2030, 1, 2, 5), "product_inquiry", False, 3)])
+    analytics = ConversationAnalytics(db)
+
+    assert analytics.last_hours(2) == (datetime(2030, 1, 2, 4), datetime(2030, 1, 2, 6))
+    summary = print_report(analytics, 2)
+    assert summary["conversations"] == 3
+    assert any("LOCALTIMESTAMP" in sql for sql, _ in db.queries)
+
+
+class ConversationDB:
+    """Just enough of user_conversations / the rollup / the watermark for ConversationAnalytics.refresh.
+
+    Each ``cursor()`` is one transaction: state is restored if the block raises.
+    """
+
+    def __init__(self, now=datetime(2030, 1, 2, 12, 0)):
+        self.now = now
+        self.conversations = []  # (id, created_at, intent, requires_human)
+        self.rollup = {}
+        self.last_id = 0
+        self.fail_watermark_update = False
+
+    def add(self, n, intent="product_inquiry", requires_human=False, created_at=datetime(2030, 1, 2, 9, 15)):
+        start = len(self.conversations) + 1
+        self.conversations += [(i, created_at, intent, requires_human) for i in range(start, start + n)]
+
+    @contextmanager
+    def cursor(self):
+        snapshot = (dict(self.rollup), self.last_id)
+        try:
+            yield _ConversationCursor(self)
+        except Exception:
+            self.rollup, self.last_id = snapshot
+            raise
+
+
+class _ConversationCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def execute(self, sql, params=None):
+        db = self.db
+        if "FOR UPDATE" in sql:
+            self.result = (db.last_id,)
+        elif "SELECT MAX(id), COUNT(*)" in sql:
+            last_id, lag, batch_size = params
+            cutoff = db.now - timedelta(seconds=lag)
+            ids = [c[0] for c in db.conversations if c[0] > last_id and c[1] < cutoff][:batch_size]
+            self.result = (max(ids) if ids else None, len(ids))
+        elif sql.lstrip().startswith("WITH batch"):
+            low, high = params
+            folded = 0
+            for conversation_id, created_at, intent, requires_human in db.conversations:
+                if low < conversation_id <= high:
+                    key = (created_at.replace(minute=0, second=0, microsecond=0), intent, requires_human)
+                    db.rollup[key] = db.rollup.get(key, 0) + 1
+                    folded += 1
+            self.result = (folded,)
+        elif sql.lstrip().startswith("UPDATE"):
+            if db.fail_watermark_update:
+                raise RuntimeError("connection lost")
+            db.last_id = params[0]
+
+    def fetchone(self):
+        return self.result
+
+
+def test_refresh_folds_new_rows_in_batches_and_advances_the_watermark():
+    db = ConversationDB()
+    db.add(5)
+    db.add(2, intent="order_status", requires_human=True, created_at=datetime(2030, 1, 2, 10, 40))
+    analytics = ConversationAnalytics(db)
+
+    assert analytics.refresh(batch_size=3) == 7
+    assert db.last_id == 7
+    assert db.rollup == {(datetime(2030, 1, 2, 9), "product_inquiry", False): 5,
+                         (datetime(2030, 1, 2, 10), "order_status", True): 2}
+
+    # nothing above the watermark: a second run folds nothing and counts nothing twice
+    assert analytics.refresh(batch_size=3) == 0
+    db.add(4)
+    assert analytics.refresh(batch_size=3) == 4
+    assert db.last_id == 11
+    assert sum(db.rollup.values()) == 11
+
+
+def test_refresh_leaves_rows_inside_the_lag_for_the_next_run():
+    db = ConversationDB()
+    db.add(3)
+    db.add(2, created_at=db.now - timedelta(seconds=2))
+    analytics = ConversationAnalytics(db)
+    assert analytics.refresh(lag_seconds=5) == 3
+    assert db.last_id == 3
+    db.now += timedelta(seconds=10)
+    assert analytics.refresh(lag_seconds=5) == 2
+
+
+def test_failed_watermark_update_rolls_back_its_batch():
+    db = ConversationDB()
+    db.add(6)
+    analytics = ConversationAnalytics(db)
+    db.fail_watermark_update = True
+    assert analytics.refresh(batch_size=4) == 0
+    assert db.rollup == {} and db.last_id == 0
+
+    db.fail_watermark_update = False
+    assert analytics.refresh(batch_size=4) == 6
+    assert sum(db.rollup.values()) == 6
+
+
+def test_refresh_if_stale_refreshes_at_most_once_per_interval():
+    db = ConversationDB()
+    db.add(2)
+    analytics = ConversationAnalytics(db)
+    assert analytics.refresh_if_stale(max_age=60) == 2
+    db.add(3)
+    assert analytics.refresh_if_stale(max_age=60) == 0
+    assert analytics.refresh_if_stale(max_age=0) == 3
+
+    # another thread is already refreshing: readers use the current rollup
+    db.add(1)
+    with analytics._refresh_lock:
+        assert analytics.refresh_if_stale(max_age=0) == 0
+    assert db.last_id == 5
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+from src.api import server
+
+
+class StubChatbot:
+    """Blocks in search_products / generate_response_stream until ``gate`` is set"""
+
+    def __init__(self, chunks=("Try ", "the ", "kajal.")):
+        self.gate = threading.Event()
+        self.chunks = chunks
+        self.finished = threading.Event()
+        self.vector_store = SimpleNamespace(search_products=self.search_products)
+
+    def search_products(self, q, n):
+        self.gate.wait(5)
+        self.finished.set()
+        return [{"document": q, "metadata": {}, "distance": 0.0}]
+
+    def generate_response_stream(self, message, user_id, trace_id=None):
+        try:
+            yield self.chunks[0]
+            self.gate.wait(5)
+            yield from self.chunks[1:]
+        finally:
+            self.finished.set()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(config, "API_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(config, "API_REQUEST_TIMEOUT", 0.3)
+    chatbot = StubChatbot()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        server.setup_state(app, chatbot)
+        yield
+        chatbot.gate.set()
+        app.state.executor.shutdown(wait=True)
+
+    monkeypatch.setattr(server.app.router, "lifespan_context", lifespan)
+    # entering the client runs one event loop for all requests, as a uvicorn worker does
+    with TestClient(server.app) as client:
+        yield client, chatbot
+
+
+def _wait_free(client, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while client.get("/healthz").json()["saturated"]:
+        assert time.monotonic() < deadline, "slot was never released"
+        time.sleep(0.01)
+
+
+def test_timed_out_request_keeps_its_slot_until_the_thread_finishes(api):
+    client, chatbot = api
+    assert client.get("/search", params={"q": "kajal"}).status_code == 504
+    busy = client.get("/search", params={"q": "kajal"})
+    assert busy.status_code == 503 and busy.headers["Retry-After"] == "1"
+    chatbot.gate.set()
+    _wait_free(client)
+    assert client.get("/search", params={"q": "kajal"}).json()["results"][0]["document"] == "kajal"
+
+
+def test_stream_sends_chunks_then_done_and_frees_its_slot(api):
+    client, chatbot = api
+    chatbot.gate.set()
+    body = client.post("/chat/stream", json={"message": "kajal?"}).text
+    assert body.count("data: {\"content\"") == 3 and "event: done" in body
+    _wait_free(client)
+
+
+def test_stream_times_out_and_stops_the_producer(api):
+    client, chatbot = api
+    body = client.post("/chat/stream", json={"message": "kajal?"}).text
+    assert "Try " in body and "event: error" in body and "timed out" in body
+    assert client.get("/healthz").json()["saturated"]  # the thread is still waiting on the LLM
+    chatbot.gate.set()
+    assert chatbot.finished.wait(2)
+    _wait_free(client)
+
+
+def test_stream_slot_is_released_when_the_body_is_never_read(monkeypatch):
+    monkeypatch.setattr(config, "API_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(config, "API_REQUEST_TIMEOUT", 0.3)
+    chatbot = StubChatbot()
+    app = SimpleNamespace(state=SimpleNamespace())
+
+    async def abandon():
+        server.setup_state(app, chatbot)
+        # the client disconnects before Starlette starts iterating the body
+        await server.chat_stream(server.ChatRequest(message="kajal?"), SimpleNamespace(app=app))
+        assert app.state.slots.locked()
+        chatbot.gate.set()
+        for _ in range(200):
+            if not app.state.slots.locked():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    assert asyncio.run(abandon())
+    assert chatbot.finished.is_set()
+    app.state.executor.shutdown(wait=True)
@@ -0,0 +1,148 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.database.archiver import ConversationArchive, ConversationArchiver
+
+
+def turn(i, user_id, created_at):
+    return (i, user_id, f"question {i}", f"answer {i}", "product_inquiry", False, None, created_at, f"t{i}")
+
+
+def test_history_reads_newest_archived_turns_across_months(tmp_path):
+    archive = ConversationArchive(root=str(tmp_path))
+    archive.write([turn(1, "a", datetime(2024, 1, 5)), turn(2, "a", datetime(2024, 3, 1)),
+                   turn(3, "a", datetime(2024, 3, 9)), turn(4, "b", datetime(2024, 3, 2))])
+
+    assert archive.user_months("a") == ["2024-03", "2024-01"]
+    assert [r[0] for r in archive.get_conversation_history("a", 10)] == ["question 3", "question 2", "question 1"]
+    assert [r[0] for r in archive.get_conversation_history("a", 2)] == ["question 3", "question 2"]
+    assert [r[0] for r in archive.get_conversation_history("a", 10, before=datetime(2024, 3, 5))] == \
+        ["question 2", "question 1"]
+    assert archive.get_conversation_history("nobody", 10) == []
+
+
+def test_history_opens_only_the_users_months(tmp_path, monkeypatch):
+    archive = ConversationArchive(root=str(tmp_path))
+    archive.write([turn(1, "a", datetime(2023, 6, 1))] +
+                  [turn(10 + m, "b", datetime(2024, m, 1)) for m in range(1, 13)])
+    # a second batch for the same month appends nothing new to the user's index
+    archive.write([turn(2, "a", datetime(2023, 6, 2))])
+    assert archive.user_months("a") == ["2023-06"]
+
+    opened = []
+    read_table = pq.read_table
+    monkeypatch.setattr(pq, "read_table", lambda path, **kwargs: opened.append(path) or read_table(path, **kwargs))
+
+    assert len(archive.get_conversation_history("a", 10)) == 2
+    assert opened and all("month=2023-06" in path for path in opened)
+
+
+def test_hot_history_is_topped_up_from_the_archive(tmp_path):
+    from src.database.postgres_setup import PostgreSQLManager
+
+    hot = [("hot 2", "answer", datetime(2024, 6, 2)), ("hot 1", "answer", datetime(2024, 6, 1))]
+
+    class Cursor:
+        def execute(self, sql, params):
+            pass
+
+        def fetchall(self):
+            return hot
+
+    manager = PostgreSQLManager.__new__(PostgreSQLManager)
+    manager.cursor = contextmanager(lambda: (yield Cursor()))
+    manager.archive = ConversationArchive(root=str(tmp_path))
+    manager.archive.write([turn(1, "a", datetime(2024, 5, 1)), turn(2, "a", datetime(2024, 6, 3))])
+
+    assert manager.get_conversation_history("a", 5) == hot
+    # archived turns newer than the oldest hot row can't be missing from the hot table, so they're skipped
+    assert [r[0] for r in manager.get_conversation_history("a", 5, include_archive=True)] == \
+        ["hot 2", "hot 1", "question 1"]
+
+
+class ArchiveDB:
+    """Pooled cursors over a fake conversation table with an analytics watermark"""
+
+    def __init__(self, held):
+        self.held = held
+        self.statements = []
+
+    @contextmanager
+    def cursor(self):
+        db = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                db.statements.append(sql)
+                self.sql = sql
+
+            def fetchone(self):
+                if "to_regclass" in self.sql:
+                    return (True,)
+                if "LOCALTIMESTAMP" in self.sql:
+                    return (datetime(2024, 1, 1),)
+                if "COUNT(*)" in self.sql:
+                    return (db.held,)
+                return (0,)
+
+            def fetchall(self):
+                return []
+
+        yield Cursor()
+
+
+def test_run_refreshes_the_rollup_and_reports_turns_it_still_holds(tmp_path, monkeypatch, capsys):
+    from src.database import analytics
+
+    refreshed = []
+    monkeypatch.setattr(analytics.ConversationAnalytics, "refresh", lambda self: refreshed.append(True) or 0)
+    archiver = ConversationArchiver(ArchiveDB(held=7), ConversationArchive(root=str(tmp_path)))
+
+    assert archiver.run(older_than_days=30) == 0
+    assert refreshed == [True]
+    assert "7 older conversations are not in the analytics rollup yet" in capsys.readouterr().out
+
+
+class BatchDB:
+    """One archive batch: the SELECT returns ``rows``; the DELETE optionally fails"""
+
+    def __init__(self, rows, fail_delete=False):
+        self.rows = rows
+        self.fail_delete = fail_delete
+
+    @contextmanager
+    def cursor(self):
+        db = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                self.sql = sql
+                if sql.lstrip().startswith("DELETE") and db.fail_delete:
+                    raise RuntimeError("could not serialize access")
+
+            def fetchone(self):
+                return (False,)  # analytics isn't set up
+
+            def fetchall(self):
+                return db.rows
+
+        yield Cursor()
+
+
+def test_failed_delete_removes_the_batch_files_and_leaves_no_index(tmp_path):
+    archive = ConversationArchive(root=str(tmp_path))
+    rows = [turn(1, "a", datetime(2024, 1, 5)), turn(2, "b", datetime(2024, 2, 1))]
+    archiver = ConversationArchiver(BatchDB(rows, fail_delete=True), archive)
+
+    with pytest.raises(RuntimeError):
+        archiver.archive_batch(datetime(2024, 6, 1), 100)
+    assert list(tmp_path.rglob("*.parquet")) == []
+    assert archive.user_months("a") == [] and archive.user_months("b") == []
+
+    archiver.db_manager.fail_delete = False
+    assert archiver.archive_batch(datetime(2024, 6, 1), 100) == 2
+    assert archive.user_months("a") == ["2024-01"]
+    assert [r[0] for r in archive.get_conversation_history("b", 5)] == ["question 2"]
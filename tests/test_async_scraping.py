@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from async_scraping import HostRateLimiter, scrape_categories
+from benchmarks.fixture_site import FixtureSite
+
+
+def test_rate_limiter_backs_off_and_recovers():
+    limiter = HostRateLimiter(min_interval=1.0, max_interval=4.0)
+    for _ in range(5):
+        limiter.penalize("h")
+    assert limiter._interval["h"] == 4.0
+    for _ in range(20):
+        limiter.reward("h")
+    assert limiter._interval["h"] == 1.0
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(min_interval=0.05, max_interval=1.0)
+
+    async def hit(host, n):
+        for _ in range(n):
+            await limiter.wait(host)
+
+    async def both():
+        await asyncio.wait_for(asyncio.gather(hit("a", 4), hit("b", 4)), 5)
+
+    start = time.monotonic()
+    asyncio.run(both())
+    elapsed = time.monotonic() - start
+    # 3 gaps of ~0.05s per host, hosts in parallel
+    assert 0.1 < elapsed < 0.5
+
+
+def _crawl(site, tmp_path, categories, pages, name="out.csv"):
+    urls = [site.url(f"/personal-care?f=Categories%3A{c}") for c in categories]
+    output = str(tmp_path / name)
+    limiter = HostRateLimiter(min_interval=0.01, max_interval=0.05)
+    written = asyncio.run(scrape_categories(urls, pages, output=output, max_contexts=2,
+                                            checkpoint_path=str(tmp_path / "cp.sqlite"), limiter=limiter))
+    return written, output
+
+
+def test_crawls_categories_from_fixture_site_and_resumes(chromium_available, fixture_site, tmp_path):
+    written, output = _crawl(fixture_site, tmp_path, ["Lipstick", "Shampoo"], 2)
+    assert written == 80
+    df = pd.read_csv(output)
+    assert set(df["breadcrumbs"]) == {"Home / Personal Care / Lipstick", "Home / Personal Care / Shampoo"}
+    assert df["product_url"].is_unique
+
+    # every page is checkpointed, so a re-run fetches nothing
+    listing_requests = len([r for r in fixture_site.requests if r.startswith("/personal-care")])
+    assert _crawl(fixture_site, tmp_path, ["Lipstick", "Shampoo"], 2)[0] == 0
+    assert len([r for r in fixture_site.requests if r.startswith("/personal-care")]) == listing_requests
+
+
+def test_slow_api_responses_are_credited_to_their_own_page(chromium_available, tmp_path):
+    with FixtureSite(api_delay=0.3) as site:
+        written, output = _crawl(site, tmp_path, ["Lipstick"], 3)
+    assert written == 45
+    assert len(pd.read_csv(output)) == 45
+
+
+def test_pages_failing_every_retry_are_recorded(chromium_available, tmp_path):
+    from scrape_checkpoint import ScrapeCheckpoint
+
+    with FixtureSite(fail_pages={2}) as site:
+        written, _ = _crawl(site, tmp_path, ["Lipstick"], 3)
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "cp.sqlite"))
+    failed = checkpoint.failed_pages()
+    assert [(c, p) for c, p, _, _ in failed] == [("Home / Personal Care / Lipstick", 2)]
+    assert checkpoint.is_page_done("Home / Personal Care / Lipstick", 3)
+    assert not checkpoint.is_page_done("Home / Personal Care / Lipstick", 2)
+    checkpoint.close()
+    assert written == 25
+
+
+class FakeResponse:
+    def __init__(self, page, items, delay):
+        self.page, self.items, self.delay = page, items, delay
+        self.url = "https://shop.test/gateway/v2/search"
+        self.status = 200
+        self.headers = {"content-type": "application/json"}
+        self.request = type("Request", (), {"resource_type": "xhr"})()
+
+    async def json(self):
+        await asyncio.sleep(self.delay)
+        if self.page.closed:
+            raise RuntimeError("Target page, context or browser has been closed")
+        return {"products": self.items}
+
+
+class FakePage:
+    """Fires one listing XHR per navigation whose body arrives after networkidle"""
+
+    def __init__(self, listing):
+        self.listing = listing
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    async def goto(self, url, timeout=None):
+        pnum = int(url.rsplit("p=", 1)[1])
+        items, delay = self.listing(pnum)
+        if items is not None:
+            for handler in self.handlers:
+                handler(FakeResponse(self, items, delay))
+        return FakeResponse(self, [], 0)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+def _scrape_fake(tmp_path, listing, pages, monkeypatch):
+    import async_scraping
+    from scrape_checkpoint import ScrapeCheckpoint, open_sink
+
+    monkeypatch.setattr(async_scraping, "allowed_by_robots", lambda url: True)
+    monkeypatch.setattr(async_scraping, "MAX_RETRIES", 2)
+
+    class Context:
+        async def new_page(self):
+            return FakePage(listing)
+
+    async def run():
+        contexts = asyncio.Queue()
+        contexts.put_nowait(Context())
+        sink = open_sink(str(tmp_path / "out.csv"))
+        checkpoint = ScrapeCheckpoint(str(tmp_path / "cp.sqlite"))
+        limiter = HostRateLimiter(min_interval=0.0, max_interval=0.0)
+        written = await async_scraping.scrape_category(contexts, "https://shop.test/personal-care?f=Categories%3ALipstick",
+                                                       pages, limiter, sink, checkpoint)
+        return written, checkpoint
+
+    return asyncio.run(run())
+
+
+def _items(pnum, n=3):
+    return [{"productId": f"{pnum}-{i}", "productName": f"Lipstick {pnum}-{i}", "brand": "Lakme", "price": 100}
+            for i in range(n)]
+
+
+def test_late_listing_bodies_are_read_before_the_page_is_closed(tmp_path, monkeypatch):
+    written, checkpoint = _scrape_fake(tmp_path, lambda pnum: (_items(pnum), 0.05), 2, monkeypatch)
+    assert written == 6
+    assert checkpoint.is_page_done("Home / Personal Care / Lipstick", 2)
+    checkpoint.close()
+
+
+def test_page_without_a_listing_response_is_not_completed(tmp_path, monkeypatch):
+    written, checkpoint = _scrape_fake(tmp_path, lambda pnum: (None if pnum == 2 else _items(pnum), 0), 3, monkeypatch)
+    assert written == 6
+    assert not checkpoint.is_page_done("Home / Personal Care / Lipstick", 2)
+    assert [(p, attempts) for _, p, attempts, _ in checkpoint.failed_pages()] == [(2, 2)]
+    checkpoint.close()
@@ -0,0 +1,62 @@
+from src.utils.catalog_index import CatalogIndex
+from src.utils.data_loader import CSVDataLoader
+from tests.conftest import make_product
+
+
+def _price_keys(index, low, high):
+    return sorted(p.product_id for p in index.products_in_price_range(low, high))
+
+
+def test_range_queries_match_a_scan(products):
+    index = CatalogIndex.from_products(products)
+    assert _price_keys(index, 300, 600) == sorted(p.product_id for p in products if 300 <= p.price <= 600)
+    rated = sorted(p.product_id for p in index.products_with_rating(3.0))
+    assert rated == sorted(p.product_id for p in products if p.rating is not None and p.rating >= 3.0)
+    assert index.prices.values == sorted(index.prices.values)
+
+
+def test_incremental_updates_match_a_fresh_build(products):
+    index = CatalogIndex.from_products(products[:150])
+    changed = [make_product(i, price=5.0) for i in range(10)]
+    index.add_products(products[150:] + changed)
+    index.remove_product("P00020")
+
+    expected = {p.product_id: p for p in products}
+    expected.update({p.product_id: p for p in changed})
+    del expected["P00020"]
+    fresh = CatalogIndex.from_products(list(expected.values()))
+    assert index.summary() == fresh.summary()
+    assert _price_keys(index, None, None) == _price_keys(fresh, None, None)
+
+
+def test_repeated_key_in_one_batch_keeps_the_last_record():
+    index = CatalogIndex()
+    index.add_products([make_product(1, price=10.0), make_product(1, price=20.0)] + [make_product(i) for i in range(2, 60)])
+    assert [p.price for p in index.products_in_price_range(None, 50)] == [20.0]
+    assert len(index.prices.values) == len(index)
+
+
+def test_copy_is_independent(products):
+    index = CatalogIndex.from_products(products)
+    copy = index.copy()
+    copy.remove_product("P00001")
+    copy.add_products([make_product(999)])
+    assert "P00001" in index.products and "P00999" not in index.products
+    assert len(index.prices.values) == len(products)
+
+
+def test_save_and_load_keep_sorted_columns(tmp_path, products):
+    index = CatalogIndex.from_products(products)
+    path = str(tmp_path / "catalog_index.json")
+    index.save(path)
+    loaded = CatalogIndex.load(path)
+    assert loaded.summary() == index.summary()
+    assert loaded.prices.keys == index.prices.keys
+    assert loaded.ratings.keys == index.ratings.keys
+    assert loaded.brands() == index.brands()
+
+
+def test_loader_columns_are_case_insensitive():
+    rows = [{"Product_ID": "X1", "product_name": "Kajal", "BRAND": "Lakme", "Price": "₹1,299", "Rating": 4.1}]
+    product = CSVDataLoader().clean_product_data(rows)[0]
+    assert (product.product_id, product.brand, product.price, product.rating) == ("X1", "Lakme", 1299.0, 4.1)
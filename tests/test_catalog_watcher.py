@@ -0,0 +1,119 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.utils.catalog_index import CatalogIndex
+from src.utils.catalog_watcher import CatalogWatcher
+
+COLUMNS = ["Product_ID", "product_name", "brand", "price", "Rating", "Breadcrumbs", "Product_URL", "Description"]
+
+
+def _rows(ids, price=100):
+    return [[f"W{i}", f"Watch product {i}", "Lakme", price + i, 4.0, "Home/Personal Care/Kajal",
+             f"https://example.com/w/{i}", f"Kajal number {i}"] for i in ids]
+
+
+def _write(path, rows, mtime_bump=0):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    if mtime_bump:
+        # make sure the stat changes even on coarse-mtime filesystems
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + mtime_bump))
+
+
+@pytest.fixture
+def watched(tmp_path, vector_store, chroma_config, monkeypatch):
+    monkeypatch.setattr(chroma_config, "CATALOG_INDEX_PATH", str(tmp_path / "catalog_index.json"))
+    monkeypatch.setattr(chroma_config, "DEDUPE_ENABLED", False)
+    data = tmp_path / "data"
+    data.mkdir()
+    _write(data / "a.csv", _rows(range(0, 10)))
+    _write(data / "b.csv", _rows(range(10, 15)))
+
+    watcher = CatalogWatcher(vector_store, data_folder=str(data), interval=3600)
+    products = watcher.data_loader.load_all_products()
+    vector_store.add_products(products)
+    watcher.catalog_index = CatalogIndex.from_products(products)
+    watcher.seed()
+    return watcher, data
+
+
+def _ids(vector_store):
+    return set(vector_store.collection.get(include=[])["ids"])
+
+
+def _settled_poll(watcher):
+    """A change is ingested on the second poll that sees the same size and mtime"""
+    assert watcher.poll() == 0
+    return watcher.poll()
+
+
+def test_first_change_after_startup_detects_removed_rows(watched):
+    watcher, data = watched
+    rows = _rows(range(0, 10))
+    rows[3][3] = 999  # price change
+    _write(data / "a.csv", rows[:8], mtime_bump=10**9)  # W8, W9 removed
+
+    assert _settled_poll(watcher) == 3
+    assert _ids(watcher.vector_store) == {f"W{i}" for i in range(15)} - {"W8", "W9"}
+    assert watcher.catalog_index.products["W3"].price == 999
+    assert "W9" not in watcher.catalog_index.products
+    assert watcher.poll() == 0
+
+
+def test_deleted_file_removes_its_products(watched):
+    watcher, data = watched
+    os.remove(data / "b.csv")
+    assert watcher.poll() == 5
+    assert _ids(watcher.vector_store) == {f"W{i}" for i in range(10)}
+    assert len(watcher.catalog_index) == 10
+
+
+def test_product_moved_between_files_is_kept(watched):
+    watcher, data = watched
+    _write(data / "b.csv", _rows(range(11, 15)), mtime_bump=10**9)
+    _write(data / "a.csv", _rows(range(0, 11)), mtime_bump=10**9)
+    _settled_poll(watcher)
+    assert "W10" in _ids(watcher.vector_store)
+    assert "W10" in watcher.catalog_index.products
+
+
+def test_listeners_get_the_new_index_and_old_snapshot_is_untouched(watched):
+    watcher, data = watched
+    seen = []
+    watcher.add_listener(seen.append)
+    before = watcher.catalog_index
+    _write(data / "c.csv", _rows(range(20, 23)))
+    assert _settled_poll(watcher) == 3
+    assert seen == [watcher.catalog_index] and len(seen[0]) == 18
+    assert len(before) == 15
+
+
+def test_file_still_being_written_waits_until_its_stat_settles(watched):
+    watcher, data = watched
+    _write(data / "c.csv", _rows(range(20, 21)))
+    assert watcher.poll() == 0
+    _write(data / "c.csv", _rows(range(20, 23)), mtime_bump=10**9)  # grew since the last poll
+    assert watcher.poll() == 0
+    assert watcher.poll() == 3
+    assert {"W20", "W21", "W22"} <= _ids(watcher.vector_store)
+
+
+def test_unreadable_file_keeps_its_products(watched, monkeypatch):
+    watcher, data = watched
+    _write(data / "a.csv", _rows(range(0, 5)), mtime_bump=10**9)
+
+    def locked(path):
+        raise PermissionError("file is locked")
+
+    monkeypatch.setattr(watcher.data_loader, "read_products", locked)
+    assert _settled_poll(watcher) == 0
+    assert watcher.poll() == 0  # not retried until the file changes again
+    assert _ids(watcher.vector_store) == {f"W{i}" for i in range(15)}
+    assert len(watcher.catalog_index) == 15
+
+    monkeypatch.delattr(watcher.data_loader, "read_products")
+    _write(data / "a.csv", _rows(range(0, 5)), mtime_bump=2 * 10**9)
+    assert _settled_poll(watcher) == 5
+    assert _ids(watcher.vector_store) == {f"W{i}" for i in range(15)} - {f"W{i}" for i in range(5, 10)}
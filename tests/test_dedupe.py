@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import config
+from src.utils.data_loader import CSVDataLoader
+from src.utils.dedupe import dedupe_products, find_duplicate_clusters
+from src.utils.product_record import ProductRecord
+
+from tests.conftest import ROOT
+
+LIPSTICK = dict(product_name="Nykaa Intense Lipstick", brand="Nykaa", price=450.0,
+                breadcrumbs="Home/Personal Care/Lipstick", description="Long-lasting formula with smooth application.")
+
+
+def test_bundled_catalog_keeps_distinct_listings(tmp_path, monkeypatch):
+    # PROD0004 / PROD0073 share name, brand and description but are separate listings
+    shutil.copy(os.path.join(ROOT, "data", "personal_care_products_large_dataset.csv"), tmp_path)
+    monkeypatch.setattr(config, "DATA_FOLDER", str(tmp_path))
+    monkeypatch.setattr(config, "DEDUPE_ENABLED", True)
+    loader = CSVDataLoader()
+    products = loader.load_all_products()
+    ids = {p.product_id for p in products}
+    assert len(products) == 800 and {"PROD0004", "PROD0073"} <= ids and loader.merged_ids == {}
+
+
+def test_same_product_from_two_sources_is_merged():
+    a = ProductRecord(product_id="A1", product_url="https://shop-a.test/1", rating=4.2, **LIPSTICK)
+    b = ProductRecord(product_id="B9", product_url="https://shop-b.test/9", **LIPSTICK)
+    deduped, report = dedupe_products([a, b], sources=["a.csv", "b.csv"])
+    assert [p.product_id for p in deduped] == ["A1"] and report["merged_ids"] == {"B9": "A1"}
+
+
+def test_one_source_never_merges_different_ids_even_through_another_source():
+    first = ProductRecord(product_id="A1", product_url="https://shop-a.test/1", **LIPSTICK)
+    other = ProductRecord(product_id="B9", product_url="https://shop-b.test/9", **LIPSTICK)
+    second = ProductRecord(product_id="A2", product_url="https://shop-a.test/2", **LIPSTICK)
+    clusters = find_duplicate_clusters([first, other, second], sources=["a.csv", "b.csv", "a.csv"])
+    assert all(not {0, 2} <= set(c) for c in clusters)
+    assert find_duplicate_clusters([first, second]) == []
+
+
+def test_rows_without_ids_merge_with_bounded_bucket_comparisons():
+    # scraped rows: no id column, no URL; identical text lands in one LSH bucket per band
+    rows = [ProductRecord(**LIPSTICK) for _ in range(300)]
+    clusters = find_duplicate_clusters(rows, bucket_window=8)
+    assert [sorted(c) for c in clusters] == [list(range(300))]
+
+
+def test_setup_removes_merged_away_ids_from_the_vector_store(tmp_path, chroma_config, monkeypatch):
+    import main
+
+    data = tmp_path / "data"
+    data.mkdir()
+    header = "Product_ID,product_name,brand,price,Breadcrumbs,Product_URL,Description\n"
+    row = "{id},Nykaa Intense Lipstick,Nykaa,450,Home/Personal Care/Lipstick,{url},Long-lasting formula with smooth application.\n"
+    (data / "a.csv").write_text(header + row.format(id="A1", url="https://shop-a.test/1"))
+    (data / "b.csv").write_text(header + row.format(id="B9", url="https://shop-b.test/9"))
+    monkeypatch.setattr(config, "DATA_FOLDER", str(data))
+    monkeypatch.setattr(config, "CATALOG_INDEX_PATH", str(tmp_path / "catalog_index.json"))
+    monkeypatch.setattr(config, "DEDUPE_ENABLED", False)
+    main.setup_system()
+
+    monkeypatch.setattr(config, "DEDUPE_ENABLED", True)
+    main.setup_system()
+    from src.vector_store.chroma_manager import ChromaDBManager
+    assert ChromaDBManager().collection.get()["ids"] == ["A1"]
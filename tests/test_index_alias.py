@@ -0,0 +1,56 @@
+from src.vector_store.chroma_manager import ChromaDBManager
+
+
+def test_rebuild_switches_alias_and_searches_follow(vector_store, products):
+    vector_store.add_products(products[:50])
+    assert vector_store.rebuild_index(products)
+    assert vector_store.collection_name != vector_store.collection_name.split("_v")[0]
+    assert vector_store.get_product_count() == len(products)
+
+    # another process picks the new version up through the alias file
+    other = ChromaDBManager()
+    assert other.collection_name == vector_store.collection_name
+    assert other.search_products("Product 123", n_results=1)[0]["metadata"]["product_id"] == "P00123"
+
+
+def test_back_to_back_rebuilds_get_distinct_collections(vector_store, products):
+    assert vector_store.rebuild_index(products)
+    first = vector_store.collection_name
+    assert vector_store.rebuild_index(products[:100])
+    assert vector_store.collection_name != first
+    assert vector_store.get_product_count() == 100
+    assert vector_store.rollback_index()
+    assert vector_store.collection_name == first
+    assert vector_store.get_product_count() == len(products)
+
+
+def test_failed_validation_keeps_the_active_index(vector_store, products, monkeypatch):
+    assert vector_store.rebuild_index(products)
+    active = vector_store.collection_name
+    monkeypatch.setattr(vector_store, "_validate_collection", lambda collection, records: False)
+
+    assert not vector_store.rebuild_index(products[:10])
+    assert vector_store.collection_name == active
+    assert vector_store._read_alias()["active"] == active
+    assert vector_store.get_product_count() == len(products)
+    assert len([c for c in vector_store.client.list_collections() if c.name.startswith(active.split("_v")[0] + "_v")]) == 1
+
+
+def test_dropping_the_active_version_is_refused(vector_store, products):
+    assert vector_store.rebuild_index(products)
+    vector_store._drop_version(vector_store.collection_name)
+    assert vector_store.get_product_count() == len(products)
+
+
+def test_validation_queries_by_name_not_by_document(vector_store, products, monkeypatch):
+    queries = []
+    original = vector_store._query
+
+    def spy(collection, texts, **kwargs):
+        queries.extend(texts)
+        return original(collection, texts, **kwargs)
+
+    monkeypatch.setattr(vector_store, "_query", spy)
+    assert vector_store.rebuild_index(products)
+    names = {p.product_name for p in products}
+    assert queries and all(q in names for q in queries)
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+
+from benchmarks.common import DEMO_QUERIES
+from benchmarks.load_test import load_question_mix
+
+
+class PooledManager:
+    """PostgreSQLManager's interface: pooled cursors only, no shared connection attribute"""
+
+    def __init__(self, messages=(), error=None):
+        self.messages = list(messages)
+        self.error = error
+        self.queries = []
+
+    @contextmanager
+    def cursor(self):
+        manager = self
+
+        class Cursor:
+            def execute(self, sql, params):
+                if manager.error:
+                    raise manager.error
+                manager.queries.append((sql, params))
+
+            def fetchall(self):
+                return [(m,) for m in manager.messages]
+
+        yield Cursor()
+
+
+def test_question_mix_reads_recent_messages_through_a_pooled_cursor():
+    db = PooledManager(["do you have kajal?", "sunscreen for oily skin"])
+    assert load_question_mix(db, 2) == DEMO_QUERIES + ["do you have kajal?", "sunscreen for oily skin"]
+    assert db.queries[0][1] == (2,)
+
+
+def test_question_mix_falls_back_to_demo_queries():
+    assert load_question_mix(PooledManager(error=RuntimeError("pool exhausted")), 5) == DEMO_QUERIES
+    db = PooledManager(["unused"])
+    assert load_question_mix(db, 0) == DEMO_QUERIES and not db.queries
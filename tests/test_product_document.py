@@ -0,0 +1,27 @@
+import pytest
+
+from tests.conftest import make_product
+
+
+@pytest.fixture
+def template(chroma_config, monkeypatch):
+    def use(name):
+        monkeypatch.setattr(chroma_config, "DOCUMENT_TEMPLATE", name)
+    return use
+
+
+def test_empty_fields_take_their_separator_along(vector_store, template):
+    template("compact")
+    product = make_product(1, breadcrumbs="Home / Personal Care / Kajal", description="")
+    assert vector_store.create_product_document(product) == "Product 1 by Brand 1. Kajal."
+    template("{product_name} | {description} | {brand}")
+    assert vector_store.create_product_document(product) == "Product 1 | Brand 1"
+
+
+def test_punctuation_and_prices_are_kept_as_written(vector_store, template):
+    template("detailed")
+    product = make_product(2, price=1250000, rating=4.5, description="Smudge-proof... lasts   all day!")
+    assert vector_store.create_product_document(product) == (
+        "Product 2 by Brand 2. Home / Personal Care / Category 2. Price 1250000.00. Rating 4.5. "
+        "Smudge-proof... lasts all day!"
+    )
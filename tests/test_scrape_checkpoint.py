@@ -0,0 +1,46 @@
+import config
+from scrape_checkpoint import CSVSink, ParquetSink, ScrapeCheckpoint
+from src.utils.data_loader import CSVDataLoader
+
+
+def _rec(i, price=100.0):
+    return {"product_name": f"Lipstick {i}", "brand": "Lakme", "price": price, "product_url": f"https://example.com/{i}"}
+
+
+def test_new_or_changed_and_page_completion(tmp_path):
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "cp.sqlite"))
+    assert len(checkpoint.new_or_changed([_rec(1), _rec(2)])) == 2
+    checkpoint.complete_page("Lipstick", 1)
+    assert checkpoint.new_or_changed([_rec(1), _rec(2, price=90.0)]) == [_rec(2, price=90.0)]
+    assert checkpoint.is_page_done("Lipstick", 1) and not checkpoint.is_page_done("Lipstick", 2)
+    checkpoint.close()
+
+
+def test_failed_pages_are_recorded_and_cleared_on_success(tmp_path):
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "cp.sqlite"))
+    checkpoint.record_failure("Lipstick", 2, RuntimeError("HTTP 503"), attempts=3)
+    checkpoint.record_failure("Lipstick", 2, RuntimeError("HTTP 429"), attempts=3)
+    assert checkpoint.failed_pages() == [("Lipstick", 2, 6, "HTTP 429")]
+    assert not checkpoint.is_page_done("Lipstick", 2)
+    checkpoint.complete_page("Lipstick", 2)
+    assert checkpoint.failed_pages("Lipstick") == []
+    checkpoint.close()
+
+
+def test_csv_sink_appends_with_one_header(tmp_path):
+    path = str(tmp_path / "out.csv")
+    CSVSink(path).write([_rec(1)])
+    CSVSink(path).write([_rec(2)])
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("product_name,") and len(lines) == 3
+
+
+def test_parquet_sink_output_loads_like_a_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATA_FOLDER", str(tmp_path))
+    CSVSink(str(tmp_path / "lipstick.csv")).write([_rec(1)])
+    sink = ParquetSink(str(tmp_path / "shampoo.parquet"))
+    sink.write([_rec(2)])
+    sink.write([_rec(3), _rec(4)])
+    products = CSVDataLoader().load_all_products()
+    assert sorted(p.product_name for p in products) == [f"Lipstick {i}" for i in range(1, 5)]
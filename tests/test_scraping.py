@@ -0,0 +1,189 @@
+import json
+import re
+import urllib.request
+from contextlib import contextmanager
+
+import pytest
+
+import scraping
+from scraping import PageStats, api_paged_url, api_paging, paged_url, scrape_myntra
+from scrape_checkpoint import ScrapeCheckpoint
+
+
+def test_paged_url_only_rewrites_the_p_parameter():
+    assert paged_url("https://x.test/list?f=a&sp=3", 2) == "https://x.test/list?f=a&sp=3&p=2"
+    assert paged_url("https://x.test/list?sp=3&p=1", 4) == "https://x.test/list?sp=3&p=4"
+    assert paged_url("https://x.test/list?p=7&f=a", 2) == "https://x.test/list?p=2&f=a"
+    assert paged_url("https://x.test/list", 2) == "https://x.test/list?p=2"
+
+
+def test_api_paging_detects_offset_and_page_parameters():
+    assert api_paging("https://x.test/api?rows=50&o=0&sp=1") == ("offset", "o", 50)
+    assert api_paging("https://x.test/api?offset=0", page_size=24) == ("offset", "offset", 24)
+    assert api_paging("https://x.test/api?page=1&size=40") == ("page", "page", None)
+    assert api_paging("https://x.test/api?q=kajal") == ("page", "p", None)
+    assert api_paged_url("https://x.test/api?rows=50&o=0&sp=1", 3) == "https://x.test/api?rows=50&o=100&sp=1"
+    assert api_paged_url("https://x.test/api?sp=1&page=1", 3) == "https://x.test/api?sp=1&page=3"
+
+
+def test_api_paged_urls_walk_the_fixture_listing_api(fixture_site):
+    api = fixture_site.url("/gateway/v2/search/personal-care?f=Categories:Shampoo&rows=20&o=0")
+    ids = []
+    for pnum in (1, 2, 3):
+        with urllib.request.urlopen(api_paged_url(api, pnum)) as response:
+            ids += [p["productId"] for p in json.load(response)["products"]]
+    assert ids == [p["productId"] for p in fixture_site.category_products("Shampoo")]
+
+
+def test_direct_api_mode_fetches_every_page_once(chromium_available, fixture_site, tmp_path):
+    stats = PageStats()
+    collected = scrape_myntra(fixture_site.url("/personal-care?f=Categories%3ALipstick"), 3, output=None,
+                              checkpoint_path=str(tmp_path / "cp.sqlite"), direct_api=True, page_stats=stats)
+    assert len(collected) == 45
+    listing_pages = [r for r in fixture_site.requests if r.startswith("/personal-care")]
+    assert len(listing_pages) == 1  # only the initial load; pages 1-3 came from the API
+
+
+class FakeListing:
+    """Stands in for sync Playwright: listing page p fires one search XHR unless ``silent`` says otherwise"""
+
+    API = "https://shop.test/gateway/v2/search/personal-care?rows=3&o=0"
+
+    def __init__(self, silent=(), api_statuses=None):
+        self.silent = set(silent)
+        self.api_statuses = {p: list(statuses) for p, statuses in (api_statuses or {}).items()}
+        self.visits = []
+        self.api_calls = []
+        self.waits = []
+
+    @staticmethod
+    def items(pnum):
+        return [{"productId": f"{pnum}-{i}", "productName": f"Lipstick {pnum}-{i}", "brand": "Lakme", "price": 99}
+                for i in range(3)]
+
+    def response(self, url, status=200, body=None):
+        fake = type("Response", (), {})()
+        fake.url, fake.status, fake.ok = url, status, 200 <= status < 300
+        fake.headers = {"content-type": "application/json"}
+        fake.request = type("Request", (), {"resource_type": "xhr", "headers": {}})()
+        fake.json = lambda: body
+        fake.body = lambda: json.dumps(body).encode()
+        return fake
+
+    def page(self):
+        listing = self
+
+        class Page:
+            def __init__(self):
+                self.handlers = []
+
+            def on(self, event, handler):
+                self.handlers.append(handler)
+
+            def goto(self, url, timeout=None):
+                match = re.search(r"[?&]p=(\d+)", url)
+                pnum = int(match.group(1)) if match else 1
+                listing.visits.append(pnum)
+                if pnum in listing.silent:
+                    raise scraping.PWTimeoutError("Timeout 60000ms exceeded")
+                for handler in self.handlers:
+                    handler(listing.response(listing.API, body={"products": listing.items(pnum)}))
+                return listing.response(url)
+
+            def wait_for_load_state(self, state, timeout=None):
+                pass
+
+            def wait_for_timeout(self, ms):
+                listing.waits.append(ms)
+
+            def evaluate(self, script, arg=None):
+                return []
+
+        return Page()
+
+    def api_get(self, url, headers=None, timeout=None):
+        pnum = int(re.search(r"[?&]o=(\d+)", url).group(1)) // 3 + 1
+        self.api_calls.append(pnum)
+        statuses = self.api_statuses.get(pnum)
+        status = statuses.pop(0) if statuses else 200
+        body = {"products": self.items(pnum)} if status == 200 else {"error": "blocked"}
+        return self.response(url, status, body)
+
+    @contextmanager
+    def playwright(self):
+        listing = self
+
+        class Context:
+            request = type("Request", (), {"get": staticmethod(listing.api_get)})()
+
+            def route(self, pattern, handler):
+                pass
+
+            def on(self, event, handler):
+                pass
+
+            def new_page(self):
+                return listing.page()
+
+        class Browser:
+            def new_context(self, **kwargs):
+                return Context()
+
+            def close(self):
+                pass
+
+        yield type("Playwright", (), {"chromium": type("Chromium", (), {"launch": lambda self, **kw: Browser()})()})()
+
+
+@pytest.fixture
+def fake_listing(monkeypatch):
+    def install(**kwargs):
+        listing = FakeListing(**kwargs)
+        monkeypatch.setattr(scraping, "sync_playwright", listing.playwright)
+        monkeypatch.setattr(scraping, "allowed_by_robots", lambda url: True)
+        return listing
+    return install
+
+
+def _checkpoint_state(tmp_path):
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "cp.sqlite"))
+    done = [pnum for pnum in range(1, 4) if checkpoint.is_page_done("Home / Personal Care / Lipstick", pnum)]
+    failed = [pnum for _, pnum, _, _ in checkpoint.failed_pages()]
+    checkpoint.close()
+    return done, failed
+
+
+def test_page_that_times_out_without_a_listing_is_not_completed(fake_listing, tmp_path):
+    fake_listing(silent={2})
+    collected = scrape_myntra("https://shop.test/personal-care?f=Categories%3ALipstick", 3, output=None,
+                              checkpoint_path=str(tmp_path / "cp.sqlite"))
+    assert len(collected) == 6
+    assert _checkpoint_state(tmp_path) == ([1, 3], [2])
+
+
+def test_direct_api_errors_fail_the_page_and_only_throttling_is_retried(fake_listing, tmp_path):
+    listing = fake_listing(api_statuses={2: [403], 3: [429, 200]})
+    collected = scrape_myntra("https://shop.test/personal-care?f=Categories%3ALipstick", 3, output=None,
+                              checkpoint_path=str(tmp_path / "cp.sqlite"), direct_api=True)
+    assert listing.api_calls == [1, 2, 3, 3]
+    assert {r["product_url"].rsplit("/", 1)[1][0] for r in collected} == {"1", "3"}
+    assert _checkpoint_state(tmp_path) == ([1, 3], [2])
+
+
+def test_backoff_follows_consecutive_failures_not_the_page_number(fake_listing, tmp_path, monkeypatch):
+    monkeypatch.setattr(scraping.random, "uniform", lambda low, high: (low + high) / 2)
+    assert [scraping.backoff_ms(n) for n in (1, 2, 3, 10)] == [2000, 4000, 8000, 1000 * scraping.MAX_BACKOFF_SECONDS]
+
+    # healthy pages only wait the polite pause, however far into the listing they are
+    listing = fake_listing()
+    scrape_myntra("https://shop.test/personal-care?f=Categories%3ALipstick", 3, output=None,
+                  checkpoint_path=str(tmp_path / "cp.sqlite"))
+    assert max(listing.waits) <= (1500 + 4000) / 2
+
+    # a silent page is retried with growing waits, and the next success resets them
+    listing = fake_listing(silent={2})
+    scrape_myntra("https://shop.test/personal-care?f=Categories%3ALipstick", 3, output=None,
+                  checkpoint_path=str(tmp_path / "cp2.sqlite"))
+    assert listing.visits == [1, 1, 2, 2, 2, 3]
+    pauses = {(1500 + 3000) / 2, (1500 + 4000) / 2}  # the polite pauses, with uniform() pinned to the midpoint
+    assert [ms for ms in listing.waits if ms not in pauses] == [2000, 4000, 8000]
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from tests.conftest import make_product
+
+
+@pytest.fixture
+def sharded_store(chroma_config, monkeypatch):
+    from src.vector_store.chroma_manager import ChromaDBManager
+
+    monkeypatch.setattr(chroma_config, "SHARDED_COLLECTIONS", True)
+    return ChromaDBManager()
+
+
+def test_shards_hold_vectors_only_and_searches_return_full_products(sharded_store, products):
+    sharded_store.add_products(products)
+    shards = sharded_store._get_shards(sharded_store.collection_name)
+    assert sorted(shards) == [f"Category {i}" for i in range(4)]
+    stored = shards["Category 1"].get(include=["documents", "metadatas"])
+    assert len(stored["ids"]) == 50
+    assert not any(stored["documents"]) and not any(stored["metadatas"])
+
+    hit = sharded_store.search_products("Product 121 Category 1", n_results=1)[0]
+    assert hit["metadata"]["product_id"] == "P00121"
+    assert hit["document"] == "Description of product 121"
+
+
+def test_only_a_changed_category_is_deleted_from_its_old_shard(sharded_store, products, monkeypatch):
+    sharded_store.add_products(products)
+    shards = sharded_store._get_shards(sharded_store.collection_name)
+    deleted = []
+    for category, shard in shards.items():
+        monkeypatch.setattr(shard, "delete", lambda ids, category=category: deleted.append((category, list(ids))))
+
+    # re-ingesting unchanged products touches no other shard
+    sharded_store.add_products(products)
+    assert deleted == []
+
+    sharded_store.add_products([make_product(1, breadcrumbs="Home / Personal Care / Category 2")])
+    assert deleted == [("Category 1", ["P00001"])]
+
+
+def test_new_shards_do_not_mutate_a_dict_a_search_is_iterating(sharded_store, products):
+    sharded_store.add_products(products[:20])
+    base = sharded_store.collection_name
+    snapshot = sharded_store._get_shards(base)
+    before = dict(snapshot)
+
+    errors = []
+
+    def ingest():
+        try:
+            sharded_store.add_products([make_product(1000 + i, breadcrumbs=f"Home / Personal Care / Extra {i}")
+                                        for i in range(5)])
+        except Exception as e:  # pragma: no cover - surfaced by the assert below
+            errors.append(e)
+
+    worker = threading.Thread(target=ingest)
+    worker.start()
+    for _ in snapshot.items():
+        worker.join()
+    assert errors == []
+    assert snapshot == before
+    assert len(sharded_store._get_shards(base)) == len(before) + 5
@@ -0,0 +1,68 @@
+import threading
+
+
+from src.chatbot.groq_chatbot import PersonalCareChatbot
+from src.utils.catalog_index import CatalogIndex
+from src.vector_store.similarity_graph import SimilarityGraph
+
+from tests.conftest import make_product
+
+
+def _neighbor_scores(graph):
+    # scores rather than ids: equally similar neighbours may come back in either order
+    return {pid: [round(score, 5) for _, score in graph.similar(pid)] for pid in graph.ids}
+
+
+def test_incremental_update_reads_only_changed_embeddings(vector_store, products, monkeypatch):
+    vector_store.add_products(products)
+    vector_store.build_similarity_graph(k=5)
+
+    changed = [make_product(i, description=f"Fresh formula {i} with aloe") for i in (3, 50)]
+    added = [make_product(500, product_name="Product 7 refill", description="Description of product 7")]
+    vector_store.add_products(changed + added)
+    vector_store.delete_products(["P00011"])
+
+    def full_scan(*args, **kwargs):
+        raise AssertionError("update read every embedding")
+
+    monkeypatch.setattr(vector_store, "_all_embeddings", full_scan)
+    graph = vector_store.update_similarity_graph(["P00003", "P00050", "P00500"], ["P00011"])
+    monkeypatch.undo()
+
+    ids, embeddings = vector_store._all_embeddings()
+    rebuilt = SimilarityGraph.build(ids, embeddings, k=5)
+    assert "P00011" not in graph.row_of and "P00500" in graph.row_of
+    assert _neighbor_scores(graph) == _neighbor_scores(rebuilt)
+
+
+def test_first_update_after_load_seeds_embeddings_once(vector_store, products):
+    vector_store.add_products(products)
+    vector_store.build_similarity_graph(k=5)
+    vector_store.similarity_graph = SimilarityGraph.load()  # as a fresh process would see it
+    assert vector_store.similarity_graph.embeddings is None
+    graph = vector_store.update_similarity_graph(["P00003"])
+    assert graph.embeddings is not None and len(graph.embeddings) == len(products)
+
+
+class _NoLLM:
+    pass
+
+
+def test_last_shown_is_safe_under_concurrent_turns(threads=8):
+    chatbot = PersonalCareChatbot(llm=_NoLLM(), vector_store=object(), db_manager=object(), catalog_index=CatalogIndex())
+    results = [{"metadata": {"product_id": "P00001"}}]
+    errors = []
+
+    def turns(t):
+        try:
+            for i in range(3000):
+                chatbot.remember_shown(f"user_{t}_{i % 50}", results, max_users=5)
+        except Exception as e:  # KeyError from move_to_end after another thread's popitem
+            errors.append(e)
+
+    workers = [threading.Thread(target=turns, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert not errors and len(chatbot.last_shown) == 5